@@ -1,11 +1,12 @@
 import streamlit as st
 import pandas as pd
-import plotly.graph_objects as go
-from src.data_loader import BinanceLoader
-from src.features import FeatureEngineer
-from src.model import SignalModel
-from src.trader import Trader
+from src import services
+from src.pipeline import AnalysisPipeline
+from src.scanner import scan_status
+from src.metrics import METRICS, profiled
 import time
+import contextlib
+from datetime import datetime, timedelta
 import os
 import base64
 
@@ -66,12 +67,14 @@ st.markdown("""
 st.title("AI Crypto Trading Bot - High Risk/Reward")
 
 # --- DISCOVERY & WATCHLIST (Main Page) ---
+# Loader, API client, DB engine and caches are shared by all sessions
 if 'loader' not in st.session_state:
-    st.session_state['loader'] = BinanceLoader()
+    st.session_state['loader'] = services.get_loader()
     st.session_state['db'] = st.session_state['loader'].db
+    st.session_state['writer'] = services.get_writer()
 
-if 'all_symbols' not in st.session_state:
-    st.session_state['all_symbols'] = st.session_state['loader'].get_all_symbols()
+# Served from the persisted metadata cache (refreshed in the background), so no API wait
+st.session_state['all_symbols'] = st.session_state['loader'].get_all_symbols()
 
 if 'watchlist' not in st.session_state:
     saved_watchlist = st.session_state['db'].get_watchlist()
@@ -114,15 +117,27 @@ with st.sidebar:
     st.markdown("---")
     # st.header("System Status")
     
-    # Automatic Self-Healing Connection Check
+    # Automatic Self-Healing Connection Check (probing runs in a background monitor)
     if 'db' in st.session_state:
-        if st.session_state['db'].check_and_upgrade_connection():
-            st.toast("🚀 MySQL Connection Restored!", icon="✅")
-            # Refresh data that might have changed since fallback
-            st.session_state['watchlist'] = st.session_state['db'].get_watchlist()
-            st.session_state['saved_params'] = st.session_state['db'].get_settings()
+        db = st.session_state['db']
+        db.start_health_monitor()
+        seen_generation = st.session_state.setdefault('db_generation', db.generation)
+        if seen_generation != db.generation:
+            st.session_state['db_generation'] = db.generation
+            if db.connection_type == "MySQL":
+                st.toast("🚀 MySQL Connection Restored!", icon="✅")
+            # Refresh data that might have changed since the switch
+            st.session_state['watchlist'] = db.get_watchlist()
+            st.session_state['saved_params'] = db.get_settings()
             st.rerun()
 
+        health = db.health_state()
+        if db.fallback_active:
+            st.caption(
+                f"DB: {health['connection']} · next MySQL probe in {health.get('next_probe_in', 0):.0f}s"
+                f" · {health['pending_replay']} writes pending sync"
+            )
+
     db_type = st.session_state['db'].connection_type if 'db' in st.session_state else "Unknown"
     binance_connected = st.session_state['loader'].connected
     
@@ -134,7 +149,9 @@ with st.sidebar:
     #     api_status = "Connected" if binance_connected else "Disconnected"
     #     st.metric("Binance API", api_status, delta=None, delta_color="normal" if binance_connected else "inverse")
 
-    if not binance_connected:
+    if st.session_state['loader'].connecting:
+        st.info("Connecting to Binance API...")
+    elif not binance_connected:
         st.error(f"Binance API is not connected.")
         if st.session_state['loader'].error_message:
             st.warning(f"Error: {st.session_state['loader'].error_message}")
@@ -154,14 +171,36 @@ with st.sidebar:
         else:
             st.error("Failed to clear database cache.")
 
+    with st.expander("🩺 Diagnostics", expanded=False):
+        # Process-wide switch (the scanner reads it too): shown as it currently
+        # is and only changed when flipped here, not re-applied on every rerun
+        st.session_state['instrumentation'] = METRICS.enabled
+        st.toggle("Instrumentation (all sessions)", key="instrumentation",
+                  on_change=lambda: setattr(METRICS, 'enabled', st.session_state['instrumentation']),
+                  help="Span timers around data loading, features, training, prediction and backtest")
+        if st.button("Profile next analysis run (cProfile)"):
+            st.session_state['profile_requested'] = True
+        stage_stats = METRICS.snapshot()
+        if stage_stats:
+            st.dataframe(pd.DataFrame(stage_stats), use_container_width=True, hide_index=True)
+            counters = METRICS.counters()
+            if counters:
+                st.caption(" · ".join(f"{name}: {value:,}" for name, value in sorted(counters.items())))
+            if st.button("Export Prometheus metrics"):
+                st.success(f"Written to {METRICS.export()}")
+            if st.button("Reset metrics"):
+                METRICS.reset()
+                st.rerun()
+        else:
+            st.caption("No instrumented calls recorded yet.")
+
 # --- PAGE: ANALYSIS ---
 if page == "Analysis":
     # Top Row: Discovery
     col_d1, col_d2 = st.columns(2)
     with col_d1:
         with st.expander("🔥 Discover Trending Coins", expanded=False):
-            if 'trending_list' not in st.session_state:
-                st.session_state['trending_list'] = st.session_state['loader'].get_top_symbols(limit=10)
+            st.session_state['trending_list'] = st.session_state['loader'].get_top_symbols(limit=10)
             
             st.write("Top Volume (24h):")
             for symbol_name in st.session_state['trending_list']:
@@ -176,7 +215,7 @@ if page == "Analysis":
                     c2.write("✅")
             
             if st.button("Refresh Trending",type="primary"):
-                st.session_state['trending_list'] = st.session_state['loader'].get_top_symbols(limit=10)
+                st.session_state['trending_list'] = st.session_state['loader'].get_top_symbols(limit=10, refresh=True)
                 st.rerun()
 
     with col_d2:
@@ -194,6 +233,38 @@ if page == "Analysis":
                     st.session_state['db'].update_watchlist(st.session_state['watchlist'])
                     st.rerun()
 
+    # Precomputed signals from the headless scanner (python -m src.scanner)
+    with st.expander("🛰️ Scanner Signals", expanded=False):
+        scans = scan_status(st.session_state['db'])
+        if not scans.empty:
+            st.dataframe(scans, use_container_width=True, hide_index=True)
+            st.caption("'Lag (s)' is the time from candle close to logged signal; "
+                       "'Behind (candles)' counts closes not scanned yet.")
+        else:
+            st.info("No scans yet. Start the scanner with `python -m src.scanner`.")
+
+    with st.expander("🌐 Market Scan (all USDT pairs)", expanded=False):
+        st.caption("Scores the latest candle of every USDT pair with one pooled model, "
+                   "ranked by confidence and expected return.")
+        scan_interval = st.selectbox("Scan Interval", ["1h", "4h", "1d", "15m"], key="market_scan_interval")
+        if st.button("Scan Market", key="market_scan_button"):
+            from src.market_scan import MarketScanner
+            bar = st.progress(0.0)
+            scanner = MarketScanner(st.session_state['loader'])
+            try:
+                ranked = scanner.scan(scan_interval, int(saved_settings.get('lookback', 30)),
+                                      saved_settings.get('sensitivity', 0.5) / 100,
+                                      progress=lambda fraction, text: bar.progress(fraction, text=text))
+                st.session_state['market_scan'] = (scan_interval, ranked, dict(scanner.timings), len(scanner.failed))
+            except ValueError as e:
+                st.error(str(e))
+
+        if 'market_scan' in st.session_state:
+            scanned_interval, ranked, timings, failed = st.session_state['market_scan']
+            st.dataframe(ranked, use_container_width=True, hide_index=True, height=350)
+            st.caption(f"{len(ranked)} pairs on {scanned_interval} in {sum(timings.values()):.1f}s"
+                       + (f", {failed} skipped" if failed else ""))
+
     # Main Settings Section
     st.subheader("Analysis & Risk Configuration")
     col_c1, col_c2 = st.columns(2)
@@ -210,8 +281,13 @@ if page == "Analysis":
         lookback = st.slider("Training Days Lookback", 10, 365, def_lookback)
         sensitivity = st.slider("Signal Sensitivity (%)", 0.1, 5.0, def_sensitivity) / 100
         
+        def_market = bool(saved_settings.get('market_features', 0))
+        market_features = st.checkbox("Add BTC correlation & beta features", value=def_market,
+                                      help="Rolling correlation and beta to BTC as extra model inputs")
+
         if lookback != def_lookback: st.session_state['db'].save_setting('lookback', lookback)
         if sensitivity * 100 != def_sensitivity: st.session_state['db'].save_setting('sensitivity', sensitivity * 100)
+        if market_features != def_market: st.session_state['db'].save_setting('market_features', int(market_features))
 
     with col_c2:
         st.markdown("### Risk Management")
@@ -228,59 +304,89 @@ if page == "Analysis":
         if sl_pct * 100 != def_sl * 100: st.session_state['db'].save_setting('sl_pct', sl_pct * 100)
         if tp_pct * 100 != def_tp * 100: st.session_state['db'].save_setting('tp_pct', tp_pct * 100)
 
+    with st.expander("🔗 Watchlist Correlation & Beta to BTC", expanded=False):
+        st.caption("Highly correlated coins move together: position sizes add up across them.")
+        if st.checkbox("Compute from stored candles", key="show_correlation"):
+            from src.correlation import RollingCorrelation
+            stored = tuple(s for s in st.session_state['watchlist']
+                           if st.session_state['db'].get_last_timestamp(s, interval) is not None)
+            # Kept across reruns: each refresh only adds the candles stored since the last one
+            corr_key = (stored, interval)
+            if st.session_state.get('correlation_key') != corr_key:
+                st.session_state['correlation'] = RollingCorrelation(stored)
+                st.session_state['correlation_key'] = corr_key
+            rolling = st.session_state['correlation']
+
+            if len(stored) < 2:
+                st.info("Analyze at least two watchlist coins on this interval to store their candles.")
+            else:
+                rolling.refresh(st.session_state['db'], interval)
+                if rolling.count < 2:
+                    st.info("Not enough aligned candles yet.")
+                else:
+                    import plotly.graph_objects as go
+                    corr = rolling.correlation()
+                    heatmap = go.Figure(go.Heatmap(z=corr.values, x=corr.columns, y=corr.index, zmin=-1, zmax=1,
+                                                   colorscale='RdBu', reversescale=True,
+                                                   text=corr.round(2).values, texttemplate="%{text}"))
+                    heatmap.update_layout(template="plotly_dark", height=400, margin=dict(l=0, r=0, t=20, b=0))
+                    st.plotly_chart(heatmap, use_container_width=True)
+                    st.dataframe(pd.DataFrame({'Beta to BTC': rolling.betas().round(2)}), use_container_width=True)
+                    st.caption(f"Last {rolling.count} aligned {interval} candles, up to {rolling.last_timestamp}")
+
     # Action Button
+    if 'pipeline' not in st.session_state:
+        st.session_state['pipeline'] = AnalysisPipeline(st.session_state['loader'])
+    pipeline = st.session_state['pipeline']
+
     if st.button("Fetch Data & Run AI Prediction", use_container_width=True, type="primary"):
-        with st.spinner(f"Analyzing {symbol}..."):
-            loader = st.session_state['loader']
-            
-            if not loader.connected:
-                st.error("Cannot fetch data: Binance API is not connected. See sidebar for details.")
-                st.stop()
+        if not st.session_state['loader'].wait_until_ready():
+            st.error("Cannot fetch data: Binance API is not connected. See sidebar for details.")
+            st.stop()
+        # Explicit fetch always pulls fresh candles; everything else is memoized
+        pipeline.invalidate('load')
+        st.session_state['analysis_active'] = True
 
-            df = loader.get_data(symbol, interval, lookback)
-            
-            if df is None or df.empty:
-                st.error("Failed to fetch data.")
-                st.stop()
-            
-        with st.spinner("Calculating indicators..."):
-            fe = FeatureEngineer()
-            df = fe.add_technical_indicators(df)
-            df = fe.create_labels(df, threshold=sensitivity)
-            df.dropna(inplace=True)
-            
-        with st.spinner("Generating AI Signals..."):
+    # Main Display (Analysis Results)
+    if st.session_state.get('analysis_active'):
+        profile = contextlib.nullcontext({})
+        if st.session_state.pop('profile_requested', False):
+            # Profile a full run, not one served from the stage cache
+            pipeline.invalidate('load')
+            profile = profiled()
+        with st.spinner(f"Analyzing {symbol}..."):
             try:
-                model = SignalModel()
-                acc = model.train(df)
-                st.session_state['model'] = model
-                st.session_state['data'] = df
-                st.session_state['accuracy'] = acc
-                st.session_state['last_symbol'] = symbol
-                st.session_state['last_interval'] = interval
+                with profile as capture:
+                    result = pipeline.run(symbol, interval, lookback, sensitivity, risk_size, sl_pct, tp_pct,
+                                          market_features=market_features)
             except ValueError as e:
                 st.error(str(e))
                 st.stop()
+        if capture.get('report'):
+            st.session_state['profile_report'] = capture['report']
 
-    # Main Display (Analysis Results)
-    if 'data' in st.session_state:
-        df = st.session_state['data']
-        model = st.session_state['model']
-        current_symbol = st.session_state.get('last_symbol', symbol)
-        current_interval = st.session_state.get('last_interval', interval)
-        
-        # Run prediction
-        df_pred = model.predict(df)
+        df = result['data']
+        df_pred = result['predictions']
+        current_symbol = symbol
+        current_interval = interval
         last_row = df_pred.iloc[-1]
         
-        # Log signal to DB
-        st.session_state['db'].log_signal(
-            symbol=current_symbol,
-            signal=last_row['signal'],
-            confidence=last_row['confidence'],
-            price=last_row['close'],
-            interval=current_interval
-        )
+        from src.resample import interval_delta
+
+        # Log signal to DB (only when the prediction was actually recomputed).
+        # Only closed candles are logged: a guess on the still-forming candle
+        # would take the (candle, model) key ahead of the scanner's final call.
+        candle_closed = last_row.name + interval_delta(current_interval) <= pd.Timestamp(datetime.utcnow())
+        if 'predict' in result['fresh'] and candle_closed:
+            st.session_state['writer'].log_signal(
+                symbol=current_symbol,
+                signal=last_row['signal'],
+                confidence=last_row['confidence'],
+                price=last_row['close'],
+                interval=current_interval,
+                candle_time=last_row.name.to_pydatetime(),
+                model_version=result['model'].version
+            )
         
         # ADVICE SECTION
         st.markdown("---")
@@ -320,49 +426,37 @@ if page == "Analysis":
         # Chart
         st.subheader(f"Price Action & Signals: {current_symbol}")
         
-        # Create valid indices for markers
-        buy_signals = df_pred[df_pred['signal'] == 'BUY']
-        sell_signals = df_pred[df_pred['signal'] == 'SELL']
-        
-        fig = go.Figure()
-        fig.add_trace(go.Candlestick(x=df.index,
-                        open=df['open'], high=df['high'],
-                        low=df['low'], close=df['close'], name='OHLC'))
-        
-        # Add simple moving averages
-        fig.add_trace(go.Scatter(x=df.index, y=df['sma_20'], line=dict(color='blue', width=1), name='SMA 20'))
-        
-        # Add Markers
-        fig.add_trace(go.Scatter(mode='markers', x=buy_signals.index, y=buy_signals['close'], 
-                                 marker=dict(symbol='triangle-up', color='green', size=10), name='Buy Signal'))
-        fig.add_trace(go.Scatter(mode='markers', x=sell_signals.index, y=sell_signals['close'], 
-                                 marker=dict(symbol='triangle-down', color='red', size=10), name='Sell Signal'))
-        
-        fig.update_layout(xaxis_rangeslider_visible=False, height=500)
+        from src import charting
+
+        # Long histories are decimated to the chart's pixel budget; narrowing
+        # the window to CANDLE_BUDGET candles or fewer shows full resolution
+        zoom_start, zoom_end = None, None
+        if len(df) > charting.CANDLE_BUDGET:
+            zoom_start, zoom_end = st.slider(
+                "Zoom window",
+                min_value=df.index[0].to_pydatetime(), max_value=df.index[-1].to_pydatetime(),
+                value=(df.index[0].to_pydatetime(), df.index[-1].to_pydatetime()),
+                step=interval_delta(current_interval).to_pytimedelta(), format="YYYY-MM-DD HH:mm"
+            )
+
+        fig, chart_info = charting.price_chart(df, df_pred, zoom_start, zoom_end)
         st.plotly_chart(fig, use_container_width=True)
+        if chart_info['per_bucket'] > 1:
+            st.caption(f"Showing {chart_info['rows']:,} candles as {chart_info['candles']:,} "
+                       f"({chart_info['per_bucket']} per bar). Narrow the zoom window for full resolution.")
         
         # Simulation / Backtest View
         st.subheader("Paper Performance (Backtest)")
-        trader = Trader(initial_capital=10000)
-        trader.set_risk_params(risk_size, sl_pct, tp_pct)
-        
-        # Simple loop simulation
-        trade_count = 0
-        wins = 0
-        pnl_total = 0.0
+        trader = result['trader']
         
-        for time_idx, row in df_pred.iterrows():
-            result = trader.execute_trade(row['signal'], current_symbol, row['close'], time_idx)
-            if result:
-                trade_count += 1
-                pnl_total += result['pnl']
-                is_win = result['pnl'] > 0
-                if is_win:
-                    wins += 1
-                # Save each trade result to database
-                st.session_state['db'].update_performance(current_symbol, is_win, result['pnl'])
+        # Book closed trades in the ledger; trades booked by an earlier run are ignored
+        if 'backtest' in result['fresh']:
+            strategy = trader.strategy_key(result['model'].version)
+            st.session_state['writer'].log_trades(trader.ledger_rows(current_interval, strategy))
+            # A Monte Carlo run belongs to the backtest it resampled
+            st.session_state.pop('monte_carlo', None)
             
-        final_val = trader.get_portfolio_value({current_symbol: df_pred.iloc[-1]['close']})
+        final_val = result['final_value']
         st.metric("Final Portfolio Value", f"${final_val:.2f}", delta=f"{final_val-10000:.2f}")
         
         if trader.trades:
@@ -371,12 +465,59 @@ if page == "Analysis":
         else:
             st.info("No trades executed in this period based on signals/risk.")
 
+        with st.expander("🎲 Monte Carlo Robustness", expanded=False):
+            st.caption("Resamples the backtest into thousands of synthetic equity curves to show how fragile the result is.")
+            mc_c1, mc_c2 = st.columns(2)
+            mc_method = mc_c1.radio("Resampling", ["Resample trades", "Block bootstrap candles"], key="mc_method")
+            mc_paths = mc_c2.select_slider("Paths", [1000, 5000, 10000, 20000], value=10000, key="mc_paths")
+            if st.button("Run Monte Carlo", key="mc_run"):
+                from src import monte_carlo
+                from src.resample import INTERVAL_MINUTES
+                years = max((df_pred.index[-1] - df_pred.index[0]).total_seconds() / (365 * 86400), 1e-9)
+                if mc_method == "Resample trades":
+                    returns = monte_carlo.trade_returns(result['results'], pipeline.initial_capital)
+                    method, periods_per_year = 'trades', len(returns) / years
+                else:
+                    returns = trader.equity_curve.pct_change().dropna().to_numpy()
+                    method, periods_per_year = 'block', 365 * 1440 / INTERVAL_MINUTES[current_interval]
+                if len(returns) < 2:
+                    st.warning("Not enough trades/candles to resample.")
+                else:
+                    start = time.perf_counter()
+                    mc = monte_carlo.simulate(returns, n_paths=mc_paths, method=method,
+                                              initial_capital=pipeline.initial_capital,
+                                              periods_per_year=periods_per_year)
+                    st.session_state['monte_carlo'] = (mc, time.perf_counter() - start)
+
+            if 'monte_carlo' in st.session_state:
+                import plotly.graph_objects as go
+                from src.monte_carlo import summarize
+                mc, mc_seconds = st.session_state['monte_carlo']
+                table, prob_loss = summarize(mc, pipeline.initial_capital)
+                st.dataframe(table, use_container_width=True, hide_index=True)
+                st.caption(f"{len(mc['final_value']):,} paths in {mc_seconds:.2f}s · "
+                           f"probability of ending below the starting capital: {prob_loss:.1%}")
+                fan = go.Figure()
+                for path in mc['paths']:
+                    fan.add_trace(go.Scatter(y=path, mode='lines', line=dict(width=1), opacity=0.3, showlegend=False))
+                fan.update_layout(template="plotly_dark", height=300, margin=dict(l=0, r=0, t=20, b=0),
+                                  yaxis_title="Equity ($)")
+                st.plotly_chart(fan, use_container_width=True)
+
+        with st.expander("⏱️ Pipeline Stage Timings", expanded=False):
+            st.dataframe(pd.DataFrame(pipeline.timings_table()), use_container_width=True, hide_index=True)
+            if 'profile_report' in st.session_state:
+                st.markdown("**cProfile of the last profiled run**")
+                st.code(st.session_state['profile_report'], language=None)
+
     else:
         st.info("Please click 'Fetch Data & Run AI Prediction' above to start.")
 
 # --- PAGE: PERFORMANCE ---
 else:
     st.header("Global Model Performance")
+    # Make buffered signal/performance writes visible before reading
+    st.session_state['writer'].flush()
     
     if st.button("Reset Performance Stats"):
         if st.session_state['db'].clear_performance():
@@ -387,28 +528,49 @@ else:
 
     perf_df = st.session_state['db'].get_performance()
     if not perf_df.empty:
+        st.caption("Closed paper trades from the trade ledger, each counted once, per symbol, interval and "
+                   "strategy (model version / risk / SL / TP %); P/L and drawdown in exit order.")
         st.dataframe(perf_df, use_container_width=True, hide_index=True)
+        equity_key = st.selectbox("Equity curve", list(perf_df[['Symbol', 'Interval', 'Strategy']].itertuples(
+            index=False, name=None)), format_func=" · ".join, key="equity_strategy")
+        equity = st.session_state['db'].get_equity_curve(*equity_key, limit=500)
+        if len(equity) > 1:
+            st.line_chart(equity.reset_index(drop=True), height=250)
+            st.caption(f"Cumulative P/L ($) after each of the last {len(equity)} trades.")
     else:
         st.info("No performance data yet. Run analysis to build stats.")
 
+    st.markdown("---")
+    st.header("Realized Signal Outcomes")
+    st.caption("BUY/SELL signals scored against the candles that followed them, aggregated in the database.")
+    o_c1, o_c2 = st.columns(2)
+    # Horizons kept in the daily rollup, so older periods stay complete past retention
+    from src.database import OUTCOME_HORIZONS
+    horizon = o_c1.selectbox("Scored after (candles)", list(OUTCOME_HORIZONS), key="outcome_horizon")
+    lookback_days = o_c2.selectbox("Signals from the last", [7, 30, 90, 365], index=1,
+                                   format_func=lambda d: f"{d} days", key="outcome_days")
+    outcomes = st.session_state['db'].get_signal_outcomes(
+        horizon=horizon, since=datetime.utcnow() - timedelta(days=lookback_days))
+    if not outcomes.empty:
+        st.dataframe(outcomes, use_container_width=True, hide_index=True)
+    else:
+        st.info("No BUY/SELL signals in this period.")
+
     st.markdown("---")
     st.header("Signal History Audit")
-    # Query last 20 signals from DB
-    session = st.session_state['db'].get_session()
-    try:
-        from src.database import SignalLog
-        history = session.query(SignalLog).order_by(SignalLog.timestamp.desc()).limit(20).all()
-        if history:
-            h_df = pd.DataFrame([{
-                'Time': history_log.timestamp.strftime("%Y-%m-%d %H:%M"),
-                'Symbol': history_log.symbol,
-                'Interval': history_log.interval,
-                'Signal': history_log.signal,
-                'Price': f"${history_log.price:.4f}",
-                'Confidence': f"{history_log.confidence*100:.1f}%"
-            } for history_log in history])
-            st.dataframe(h_df, use_container_width=True, hide_index=True)
-        else:
-            st.info("No signal history found in database.")
-    finally:
-        session.close()
+    # Stack of page cursors: the last one is the current page, [None] is the newest page
+    cursors = st.session_state.setdefault('history_cursors', [None])
+    h_df, next_cursor = st.session_state['db'].get_signal_history(limit=20, cursor=cursors[-1], horizon=horizon)
+    if not h_df.empty:
+        h_df['Time'] = h_df['Time'].dt.strftime("%Y-%m-%d %H:%M")
+        st.dataframe(h_df, use_container_width=True, hide_index=True)
+        h_c1, h_c2, h_c3 = st.columns([1, 1, 3])
+        if h_c1.button("← Newer", disabled=len(cursors) == 1, key="history_newer"):
+            cursors.pop()
+            st.rerun()
+        if h_c2.button("Older →", disabled=next_cursor is None, key="history_older"):
+            cursors.append(next_cursor)
+            st.rerun()
+        h_c3.caption(f"Page {len(cursors)}")
+    else:
+        st.info("No signal history found in database.")
@@ -0,0 +1,46 @@
+"""
+Analysis chart payload: every candle versus the decimated chart data layer.
+Reports figure JSON size and build + serialize time per history length.
+
+    python benchmarks/bench_charting.py --rows 1000 10000 100000
+"""
+import argparse
+import time
+
+import numpy as np
+import common  # noqa: F401  (puts the repo root on sys.path)
+from common import INTERVAL_MS
+import synthetic
+
+from src import charting
+
+def full_resolution(df, signals):
+    """The chart as drawn before decimation: one point per candle and signal."""
+    import plotly.graph_objects as go
+    fig = go.Figure()
+    fig.add_trace(go.Candlestick(x=df.index, open=df['open'], high=df['high'], low=df['low'], close=df['close']))
+    fig.add_trace(go.Scatter(x=df.index, y=df['sma_20']))
+    for kind in ['BUY', 'SELL']:
+        hits = signals[signals['signal'] == kind]
+        fig.add_trace(go.Scatter(mode='markers', x=hits.index, y=hits['close']))
+    return fig
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 100000])
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        df = synthetic.ohlcv_frame("BTCUSDT", INTERVAL_MS['15m'], rows)
+        df['sma_20'] = df['close'].rolling(20).mean()
+        rng = np.random.default_rng(0)
+        signals = df[['close']].assign(signal=rng.choice(['BUY', 'SELL', 'HOLD'], rows, p=[0.1, 0.1, 0.8]))
+        for name, build in [('full', lambda: full_resolution(df, signals)),
+                            ('decimated', lambda: charting.price_chart(df, signals)[0])]:
+            start = time.perf_counter()
+            payload = build().to_json()
+            elapsed = time.perf_counter() - start
+            print(f"{rows:>7} candles  {name:<9} {len(payload) / 1024:>10,.0f} KiB  {elapsed * 1000:8.0f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Whole-market scan time against the candle interval it has to fit in.
+
+    python benchmarks/bench_market_scan.py --symbols 300 --interval 1h --latency 0.05
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from common import FakeClient
+
+from src.data_loader import BinanceLoader
+from src.database import DatabaseManager
+from src.market_scan import MarketScanner
+from src.resample import INTERVAL_MINUTES
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", type=int, default=300)
+    parser.add_argument("--interval", default="1h", choices=list(INTERVAL_MINUTES))
+    parser.add_argument("--lookback", type=int, default=30)
+    parser.add_argument("--latency", type=float, default=0.05, help="fake API latency per call (s)")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    client = FakeClient(latency=args.latency, symbols=[f"C{i:03d}USDT" for i in range(args.symbols)])
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(db_url=f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        loader = BinanceLoader(client=client, db=db)
+        scanner = MarketScanner(loader, processes=args.processes)
+
+        start = time.perf_counter()
+        ranked = scanner.scan(args.interval, args.lookback)
+        total = time.perf_counter() - start
+        db.engine.dispose()
+
+    budget = INTERVAL_MINUTES[args.interval] * 60
+    print(f"Scanned {len(ranked)} of {args.symbols} symbols ({len(scanner.failed)} failed) "
+          f"with {args.processes} process(es)")
+    for stage, seconds in scanner.timings.items():
+        print(f"  {stage:<9} {seconds:8.2f} s")
+    print(f"  {'total':<9} {total:8.2f} s  ({total / budget:.1%} of one {args.interval} candle)")
+    print(ranked.head(10).to_string(index=False))
+
+if __name__ == "__main__":
+    main()
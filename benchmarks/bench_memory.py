@@ -0,0 +1,63 @@
+"""
+Peak and retained memory per symbol for the DataFrame feature path versus
+the compact float32/int8 path (FeatureEngineer.compact_features).
+
+    python benchmarks/bench_memory.py --rows 35000 --symbols 5
+"""
+import argparse
+import gc
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+from common import make_klines, INTERVAL_MS
+
+from src.data_loader import BinanceLoader
+from src.features import FeatureEngineer
+from src.model import SignalModel
+
+def load_candles(symbol, rows):
+    open_times = np.arange(rows, dtype=np.int64) * INTERVAL_MS['15m'] + 1_700_000_000_000
+    return BinanceLoader._process_candles(make_klines(symbol, open_times))
+
+def dataframe_path(raw):
+    fe = FeatureEngineer()
+    df = fe.add_technical_indicators(raw)
+    df = fe.create_labels(df, threshold=0.005)
+    df.dropna(inplace=True)
+    X, y = SignalModel().prepare_data(df)
+    return df, X, y
+
+def compact_path(raw):
+    frame = FeatureEngineer().compact_features(raw, threshold=0.005)
+    X, y = SignalModel().prepare_data(frame)
+    return frame, X, y
+
+def measure(path, candles):
+    gc.collect()
+    tracemalloc.start()
+    kept = [path(raw) for raw in candles]
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return retained, peak
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=35000, help="Candles per symbol (35k ~ 1 year of 15m)")
+    parser.add_argument("--symbols", type=int, default=5)
+    args = parser.parse_args()
+
+    candles = [load_candles(f"S{i}USDT", args.rows) for i in range(args.symbols)]
+    for name, path in [('dataframe', dataframe_path), ('compact', compact_path)]:
+        retained, peak = measure(path, candles)
+        print({
+            'path': name,
+            'rows': args.rows,
+            'symbols': args.symbols,
+            'retained_mb_per_symbol': round(retained / 1e6 / args.symbols, 2),
+            'peak_mb_per_symbol': round(peak / 1e6 / args.symbols, 2),
+        })
+
+if __name__ == "__main__":
+    main()
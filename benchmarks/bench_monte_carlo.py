@@ -0,0 +1,36 @@
+"""
+Monte Carlo throughput: 10k equity paths, serial versus the process pool.
+
+    python benchmarks/bench_monte_carlo.py --paths 10000 --bars 2000
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import common  # noqa: F401  (puts the repo root on sys.path)
+
+from src.monte_carlo import simulate
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--paths", type=int, default=10000)
+    parser.add_argument("--bars", type=int, default=2000, help="returns per path (block bootstrap)")
+    parser.add_argument("--trades", type=int, default=150, help="returns per path (trade resampling)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    sources = {
+        'trades': rng.normal(0.002, 0.03, args.trades),
+        'block': rng.normal(0.0001, 0.01, args.bars),
+    }
+    for method, returns in sources.items():
+        for processes in sorted({1, os.cpu_count() or 1}):
+            start = time.perf_counter()
+            result = simulate(returns, n_paths=args.paths, method=method, seed=1, processes=processes)
+            elapsed = time.perf_counter() - start
+            print(f"{method:<6} {len(returns):>5} returns x {args.paths} paths, {processes} process(es): "
+                  f"{elapsed:6.2f} s  (median final ${np.median(result['final_value']):,.0f})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Training on a long multi-symbol history: the in-memory path (load all
+candles, build the feature DataFrame, GradientBoosting) versus out-of-core
+training streamed from the store (src/out_of_core.py). Reports time,
+rows/s, peak traced memory and holdout accuracy.
+
+    python benchmarks/bench_out_of_core.py --rows 100000 --symbols 3 --budget-mb 64
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+import tracemalloc
+import warnings
+
+import pandas as pd
+from common import INTERVAL_MS
+import synthetic
+
+from src.database import DatabaseManager
+from src.features import FeatureEngineer
+from src.market_scan import POOLED_FEATURES, relative_features
+from src.model import SignalModel
+from src.out_of_core import OutOfCoreTrainer
+
+def in_memory(db, symbols):
+    fe = FeatureEngineer()
+    frames = []
+    for symbol in symbols:
+        df = relative_features(fe.add_technical_indicators(db.get_ohlcv(symbol, '15m', limit=None)))
+        frames.append(fe.create_labels(df, threshold=0.005).dropna())
+    data = pd.concat(frames).sort_index()
+    model = SignalModel()
+    model.feature_cols = POOLED_FEATURES
+    model.model_path = None
+    with contextlib.redirect_stdout(io.StringIO()):
+        accuracy = model.train(data)
+    return len(data), accuracy
+
+def out_of_core(db, symbols, method, budget_mb, cutoff):
+    trainer = OutOfCoreTrainer(db, symbols, '15m', method=method, memory_budget_mb=budget_mb)
+    model = trainer.fit(end=cutoff)
+    return trainer.stats['rows'], trainer.score(model, start=cutoff)
+
+def measure(label, run):
+    tracemalloc.start()
+    start = time.perf_counter()
+    rows, accuracy = run()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<22} {rows:>10,} rows  {elapsed:7.1f} s  {rows / elapsed:>9,.0f} rows/s  "
+          f"peak {peak / 2**20:7.1f} MiB  holdout acc {accuracy:.3f}", flush=True)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000, help="15m candles per symbol (35k ~ 1 year)")
+    parser.add_argument("--symbols", type=int, default=3)
+    parser.add_argument("--budget-mb", type=float, default=64)
+    parser.add_argument("--skip-in-memory", action="store_true")
+    args = parser.parse_args()
+    warnings.simplefilter("ignore")
+
+    symbols = ["BTCUSDT"] + [f"S{i:03d}USDT" for i in range(1, args.symbols)]
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(db_url=f"sqlite:///{os.path.join(tmp, 'history.db')}")
+        for symbol in symbols:
+            db.save_ohlcv(symbol, '15m', synthetic.ohlcv_frame(symbol, INTERVAL_MS['15m'], args.rows))
+
+        # Same chronological 80/20 split as SignalModel.train
+        cutoff = synthetic.ohlcv_frame(symbols[0], INTERVAL_MS['15m'], args.rows).index[int(args.rows * 0.8)]
+
+        if not args.skip_in_memory:
+            measure("in-memory (GB)", lambda: in_memory(db, symbols))
+        measure(f"out-of-core hist {args.budget_mb:g}MB", lambda: out_of_core(db, symbols, 'hist', args.budget_mb, cutoff))
+        measure(f"out-of-core sgd {args.budget_mb:g}MB", lambda: out_of_core(db, symbols, 'sgd', args.budget_mb, cutoff))
+        db.engine.dispose()
+        db.read_engine.dispose()
+
+if __name__ == "__main__":
+    main()
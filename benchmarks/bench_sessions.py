@@ -0,0 +1,86 @@
+"""
+Simulates many concurrent Streamlit sessions starting up and loading one
+symbol, comparing a private loader per session with the shared services.
+
+    python benchmarks/bench_sessions.py --sessions 50 --latency 0.05
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+import tracemalloc
+
+from common import FakeClient
+
+from src import services
+from src.data_loader import BinanceLoader
+from src.database import DatabaseManager
+
+def session_private(db_url, client):
+    loader = BinanceLoader(client=client, db=DatabaseManager(db_url=db_url))
+    loader.get_all_symbols()
+    loader.get_data("BTCUSDT", "1h", 30)
+
+def session_shared():
+    loader = services.get_loader()
+    loader.get_all_symbols()
+    loader.get_data("BTCUSDT", "1h", 30)
+
+def run(mode, sessions, db_url, client):
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def worker():
+        start = time.perf_counter()
+        try:
+            if mode == 'private':
+                session_private(db_url, client)
+            else:
+                session_shared()
+        except Exception as e:
+            with lock: errors.append(type(e).__name__)
+        with lock:
+            latencies.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(sessions)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    wall = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        'mode': mode,
+        'sessions': sessions,
+        'wall_s': round(wall, 3),
+        'p50_ms': round(latencies[len(latencies) // 2] * 1000, 1),
+        'p95_ms': round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 1),
+        'peak_kb_per_session': round(peak / 1024 / sessions, 1),
+        'api_calls': sum(client.calls.values()),
+        'errors': len(errors),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake API latency per call (s)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in ['private', 'shared']:
+            db_url = f"sqlite:///{os.path.join(tmp, mode + '.db')}"
+            client = FakeClient(latency=args.latency)
+            services.reset()
+            # Point the shared services at the same fake backends
+            services._instances['db'] = DatabaseManager(db_url=db_url)
+            services._instances['loader'] = BinanceLoader(client=client, db=services.get_database(), cache=services.get_cache())
+            client.calls.clear()
+            print(run(mode, args.sessions, db_url, client))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Mixed read/write load against the SQLite store: the plain single-engine
+setup versus the tuned WAL mode (one writer connection, read-only pool).
+Reports throughput, p50/p99 latency and lock errors per operation type.
+
+    python benchmarks/bench_sqlite_concurrency.py --readers 8 --writers 4 --seconds 5
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from common import INTERVAL_MS
+import synthetic
+import numpy as np
+from sqlalchemy import create_engine
+
+from src.database import Base, DatabaseManager
+
+def make_db(mode, path):
+    if mode == 'tuned':
+        return DatabaseManager(db_url=f"sqlite:///{path}")
+    # What _fallback_to_sqlite used to build: one untuned engine for everything
+    db = DatabaseManager(db_url="sqlite:///:memory:")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    db._swap_engine(engine, "sqlite")
+    return db
+
+def seed(db, rows=2000):
+    db.save_ohlcv("BTCUSDT", "1h", synthetic.ohlcv_frame("BTCUSDT", INTERVAL_MS['1h'], rows))
+
+def run(mode, readers, writers, seconds):
+    with tempfile.TemporaryDirectory() as tmp:
+        db = make_db(mode, os.path.join(tmp, "bench.db"))
+        seed(db)
+        stop = time.monotonic() + seconds
+        lock = threading.Lock()
+        latencies = {'read': [], 'write': []}
+        errors = {'read': 0, 'write': 0}
+
+        def reader():
+            while time.monotonic() < stop:
+                start = time.perf_counter()
+                try:
+                    db.get_ohlcv("BTCUSDT", "1h", limit=500)
+                    db.get_performance()
+                    with lock: latencies['read'].append(time.perf_counter() - start)
+                except Exception:
+                    with lock: errors['read'] += 1
+
+        def writer(n):
+            while time.monotonic() < stop:
+                start = time.perf_counter()
+                try:
+                    db.log_signal(f"W{n}USDT", "BUY", 0.6, 100.0, "1h")
+                    exit_time = datetime.utcnow()
+                    db.log_trades([{'symbol': f"W{n}USDT", 'interval': "1h", 'entry_time': exit_time,
+                                    'exit_time': exit_time, 'exit_price': 101.0, 'pnl': 1.0}])
+                    with lock: latencies['write'].append(time.perf_counter() - start)
+                except Exception:
+                    with lock: errors['write'] += 1
+
+        threads = [threading.Thread(target=reader) for _ in range(readers)]
+        threads += [threading.Thread(target=writer, args=(n,)) for n in range(writers)]
+        for t in threads: t.start()
+        for t in threads: t.join()
+        db.engine.dispose()
+        db.read_engine.dispose()
+
+    result = {'mode': mode}
+    for kind, values in latencies.items():
+        ms = np.array(values) * 1000 if values else np.array([np.nan])
+        result[f'{kind}_ops_s'] = round(len(values) / seconds, 1)
+        result[f'{kind}_p50_ms'] = round(float(np.percentile(ms, 50)), 2)
+        result[f'{kind}_p99_ms'] = round(float(np.percentile(ms, 99)), 2)
+        result[f'{kind}_errors'] = errors[kind]
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    for mode in ['default', 'tuned']:
+        print(run(mode, args.readers, args.writers, args.seconds))
+
+if __name__ == "__main__":
+    main()
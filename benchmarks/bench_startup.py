@@ -0,0 +1,65 @@
+"""
+Cold-start measurements, each in a fresh interpreter:
+  * import time of the heavy dependencies and of what app.py imports,
+  * time to first render of app.py (Streamlit AppTest), with the app's lazy
+    imports versus all heavy modules imported up front (the old behaviour).
+The app runs in a temporary working directory so the repo database is untouched.
+
+    python benchmarks/bench_startup.py --runs 3
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+HEAVY = ['pandas', 'sqlalchemy', 'sklearn.ensemble', 'ta', 'plotly.graph_objects', 'binance.client', 'streamlit']
+EAGER = "import sklearn.ensemble, sklearn.model_selection, sklearn.metrics, ta, plotly.graph_objects, binance.client"
+
+IMPORT_SNIPPET = """
+import time
+t = time.perf_counter()
+import {module}
+print(time.perf_counter() - t)
+"""
+
+RENDER_SNIPPET = """
+import time
+t = time.perf_counter()
+{preload}
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({app!r}, default_timeout=120)
+at.run()
+assert not at.exception, at.exception
+print(time.perf_counter() - t)
+"""
+
+def run_python(code, cwd):
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    out = subprocess.run([sys.executable, "-c", code], cwd=cwd, env=env, capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+def median_of(runs, code, cwd):
+    return round(statistics.median(run_python(code, cwd) for _ in range(runs)) * 1000, 1)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    results = {'import_ms': {}, 'first_render_ms': {}}
+    with tempfile.TemporaryDirectory() as tmp:
+        for module in HEAVY + ['src.pipeline', 'src.services']:
+            results['import_ms'][module] = median_of(args.runs, IMPORT_SNIPPET.format(module=module), tmp)
+
+        app = os.path.join(ROOT, "app.py")
+        for mode, preload in [('lazy', ''), ('eager', EAGER)]:
+            results['first_render_ms'][mode] = median_of(args.runs, RENDER_SNIPPET.format(preload=preload, app=app), tmp)
+
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
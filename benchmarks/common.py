@@ -0,0 +1,110 @@
+"""
+Shared helpers for the offline benchmarks: a deterministic fake Binance
+client so nothing here touches the network.
+"""
+import sys
+import os
+import threading
+import time
+from collections import deque
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from binance.helpers import date_to_milliseconds
+
+import synthetic
+from src.resample import INTERVAL_MINUTES
+
+INTERVAL_MS = {k: v * 60 * 1000 for k, v in INTERVAL_MINUTES.items()}
+
+# Request weights as documented by Binance (spot REST API)
+WEIGHTS = {'ping': 1, 'get_exchange_info': 20, 'get_ticker': 80, 'get_historical_klines': 2}
+KLINES_PAGE = 1000
+
+class RateLimitExceeded(Exception):
+    """What the fake raises instead of an HTTP 429 when on_limit='raise'."""
+
+
+class FakeClient:
+    """
+    Stand-in for binance.client.Client with a fixed per-request latency and
+    an optional request-weight limit per rolling minute (Binance: 6000).
+    Klines come from benchmarks/synthetic.py and are paginated like the
+    real client: one request per KLINES_PAGE candles.
+    """
+    def __init__(self, latency=0.05, symbols=None, weight_limit=None, on_limit='wait', seed=0):
+        self.latency = latency
+        self.symbols = symbols or [f"C{i:03d}USDT" for i in range(300)] + ["BTCUSDT", "ETHUSDT", "SOLUSDT", "BNBUSDT"]
+        self.weight_limit = weight_limit
+        self.on_limit = on_limit
+        self.seed = seed
+        self.calls = {}
+        self.throttled_s = 0.0
+        self._lock = threading.Lock()
+        self._spent = deque()  # (monotonic time, weight) in the last minute
+
+    def _call(self, name, requests=1):
+        for _ in range(requests):
+            self._acquire(WEIGHTS[name])
+            with self._lock:
+                self.calls[name] = self.calls.get(name, 0) + 1
+            if self.latency:
+                time.sleep(self.latency)
+
+    def _acquire(self, weight):
+        if self.weight_limit is None:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._spent and now - self._spent[0][0] >= 60:
+                    self._spent.popleft()
+                used = sum(w for _, w in self._spent)
+                if used + weight <= self.weight_limit:
+                    self._spent.append((now, weight))
+                    return
+                if self.on_limit == 'raise':
+                    raise RateLimitExceeded(f"Request weight {used + weight} over {self.weight_limit}/min")
+                wait = 60 - (now - self._spent[0][0])
+            self.throttled_s += wait
+            time.sleep(wait)
+
+    def ping(self):
+        self._call('ping')
+        return {}
+
+    def get_exchange_info(self):
+        self._call('get_exchange_info')
+        return {'symbols': [{'symbol': s, 'status': 'TRADING'} for s in self.symbols]}
+
+    def get_ticker(self):
+        self._call('get_ticker')
+        return [{'symbol': s, 'quoteVolume': str(1e6 * (i + 1))} for i, s in enumerate(self.symbols)]
+
+    def get_historical_klines(self, symbol, interval, start_str, end_str=None, limit=KLINES_PAGE):
+        step = INTERVAL_MS[interval]
+        start = date_to_milliseconds(start_str)
+        end = date_to_milliseconds(end_str) + 1 if end_str else int(time.time() * 1000)
+        # Only closed candles and the one currently forming
+        series = synthetic.window(symbol, step, start, end, self.seed)
+        self._call('get_historical_klines', requests=max(1, -(-len(series['open_time']) // limit)))
+        return _rows(series, step)
+
+def make_klines(symbol, open_times, interval_ms=None, seed=0):
+    """Kline rows (Binance list layout) of the synthetic series at the given open times."""
+    open_times = np.asarray(open_times, dtype=np.int64)
+    if not len(open_times):
+        return []
+    step = interval_ms or (int(np.diff(open_times).min()) if len(open_times) > 1 else INTERVAL_MS['1h'])
+    positions = (open_times - synthetic.ORIGIN_MS) // step
+    series = synthetic.generate(symbol, step, int(positions.max()) + 1, seed)
+    picked = {k: v[positions] for k, v in series.items()}
+    picked['open_time'] = open_times
+    return _rows(picked, step)
+
+def _rows(series, step):
+    return [
+        [int(t), str(o), str(h), str(l), str(c), str(v), int(t) + step - 1, '0', 0, '0', '0', '0']
+        for t, o, h, l, c, v in zip(series['open_time'], series['open'], series['high'], series['low'],
+                                    series['close'], series['volume'])
+    ]
@@ -0,0 +1,248 @@
+"""
+Offline benchmark suite: ingestion, DB write/read, features, training,
+prediction and backtesting on synthetic market data at growing sizes.
+Results are written as JSON so two commits can be compared.
+
+    python benchmarks/run_suite.py run --rows 1000 5000 20000 --symbols 1 10
+    python benchmarks/run_suite.py compare results/abc123.json results/def456.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+from datetime import datetime
+
+from common import FakeClient, INTERVAL_MS
+import synthetic
+
+from src.candle_io import import_file
+from src.data_loader import BinanceLoader
+from src.database import DatabaseManager
+from src.features import FeatureEngineer
+from src.model import SignalModel
+from src.trader import Trader
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+def symbols_for(n):
+    return ["BTCUSDT"] + [f"S{i:03d}USDT" for i in range(1, n)]
+
+def frames_for(rows, symbols, seed):
+    return {s: synthetic.ohlcv_frame(s, INTERVAL_MS['1h'], rows, seed) for s in symbols_for(symbols)}
+
+def labeled(frame):
+    fe = FeatureEngineer()
+    df = fe.create_labels(fe.add_technical_indicators(frame), threshold=0.005)
+    return df.dropna()
+
+def temp_db(tmp, name):
+    return DatabaseManager(db_url=f"sqlite:///{os.path.join(tmp, name + '.db')}")
+
+# Each scenario does its setup, then returns the seconds spent in the measured part
+
+def scenario_ingest(frames, args, tmp):
+    rows = len(next(iter(frames.values())))
+    client = FakeClient(latency=args.latency, symbols=list(frames), weight_limit=args.weight_limit, seed=args.seed)
+    db = temp_db(tmp, "ingest")
+    loader = BinanceLoader(client=client, db=db)
+    start = time.perf_counter()
+    for symbol in frames:
+        loader.get_data(symbol, '1h', max(1, rows // 24))
+    elapsed = time.perf_counter() - start
+    db.engine.dispose()
+    return elapsed
+
+def scenario_db_write(frames, args, tmp):
+    db = temp_db(tmp, "write")
+    start = time.perf_counter()
+    for symbol, frame in frames.items():
+        db.save_ohlcv(symbol, '1h', frame)
+    elapsed = time.perf_counter() - start
+    db.engine.dispose()
+    return elapsed
+
+def scenario_bulk_import(frames, args, tmp):
+    # Binance dump files written up front; only the import is timed
+    paths = []
+    for symbol, frame in frames.items():
+        path = os.path.join(tmp, f"{symbol}-1h-dump.csv")
+        rows = frame.assign(open_time=frame.index.to_numpy().astype('datetime64[ms]').astype('int64'))
+        rows[['open_time', 'open', 'high', 'low', 'close', 'volume']].to_csv(path, header=False, index=False)
+        paths.append(path)
+    db = temp_db(tmp, "bulk")
+    start = time.perf_counter()
+    for path in paths:
+        import_file(db, path)
+    elapsed = time.perf_counter() - start
+    db.engine.dispose()
+    return elapsed
+
+def scenario_db_read(frames, args, tmp):
+    db = temp_db(tmp, "read")
+    for symbol, frame in frames.items():
+        db.save_ohlcv(symbol, '1h', frame)
+    start = time.perf_counter()
+    for symbol in frames:
+        db.get_ohlcv(symbol, '1h', limit=None)
+    elapsed = time.perf_counter() - start
+    db.engine.dispose()
+    return elapsed
+
+def scenario_features(frames, args, tmp):
+    fe = FeatureEngineer()
+    start = time.perf_counter()
+    for frame in frames.values():
+        fe.add_technical_indicators(frame)
+    return time.perf_counter() - start
+
+def scenario_train(frames, args, tmp):
+    data = [labeled(frame) for frame in frames.values()]
+    start = time.perf_counter()
+    for df in data:
+        model = SignalModel()
+        model.model_path = None
+        model.train(df)
+    return time.perf_counter() - start
+
+def scenario_predict(frames, args, tmp):
+    models = []
+    for frame in frames.values():
+        df = labeled(frame)
+        model = SignalModel()
+        model.model_path = None
+        model.train(df)
+        models.append((model, df))
+    start = time.perf_counter()
+    for model, df in models:
+        model.predict(df.copy())
+    return time.perf_counter() - start
+
+def scenario_backtest(frames, args, tmp):
+    runs = []
+    for symbol, frame in frames.items():
+        df = labeled(frame)
+        model = SignalModel()
+        model.model_path = None
+        model.train(df)
+        runs.append((symbol, model.predict(df.copy())))
+    start = time.perf_counter()
+    for symbol, df in runs:
+        Trader().run_backtest(df, symbol)
+    return time.perf_counter() - start
+
+SCENARIOS = {
+    'ingest': scenario_ingest,
+    'db_write': scenario_db_write,
+    'bulk_import': scenario_bulk_import,
+    'db_read': scenario_db_read,
+    'features': scenario_features,
+    'train': scenario_train,
+    'predict': scenario_predict,
+    'backtest': scenario_backtest,
+}
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except Exception:
+        return None
+
+def run(args):
+    results = []
+    for rows in args.rows:
+        for symbols in args.symbols:
+            frames = frames_for(rows, symbols, args.seed)
+            for name in args.scenarios:
+                times = []
+                for _ in range(args.repeat):
+                    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()), \
+                            warnings.catch_warnings():
+                        warnings.simplefilter("ignore")
+                        times.append(SCENARIOS[name](frames, args, tmp))
+                seconds = statistics.median(times)
+                total_rows = rows * symbols
+                results.append({
+                    'scenario': name, 'rows': rows, 'symbols': symbols,
+                    'seconds': round(seconds, 5), 'rows_per_s': round(total_rows / seconds) if seconds else None,
+                })
+                print(f"{name:<9} rows={rows:<7} symbols={symbols:<4} {seconds:9.4f} s  "
+                      f"{results[-1]['rows_per_s'] or 0:>12,} rows/s", flush=True)
+
+    commit = git_commit()
+    report = {
+        'meta': {
+            'commit': commit,
+            'created': datetime.utcnow().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'args': {k: v for k, v in vars(args).items() if k != 'func'},
+        },
+        'results': results,
+    }
+    out = args.out or os.path.join(RESULTS_DIR, f"{commit or datetime.utcnow().strftime('%Y%m%d%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {out}")
+
+def compare(args):
+    """Prints per-scenario ratios new/old; exits 1 when any slows down by more than --threshold."""
+    with open(args.baseline) as f:
+        old = json.load(f)
+    with open(args.candidate) as f:
+        new = json.load(f)
+    key = lambda r: (r['scenario'], r['rows'], r['symbols'])
+    baseline = {key(r): r for r in old['results']}
+
+    print(f"baseline {old['meta'].get('commit')}  ->  candidate {new['meta'].get('commit')}")
+    regressions = 0
+    for r in new['results']:
+        base = baseline.get(key(r))
+        if base is None or not base['seconds']:
+            continue
+        ratio = r['seconds'] / base['seconds']
+        flag = ""
+        if ratio > 1 + args.threshold:
+            flag, regressions = "REGRESSION", regressions + 1
+        elif ratio < 1 - args.threshold:
+            flag = "faster"
+        print(f"{r['scenario']:<9} rows={r['rows']:<7} symbols={r['symbols']:<4} "
+              f"{base['seconds']:9.4f} -> {r['seconds']:9.4f} s  x{ratio:5.2f}  {flag}")
+    sys.exit(1 if regressions else 0)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run scenarios and write a JSON report")
+    run_parser.add_argument("--rows", type=int, nargs="+", default=[1000, 5000, 20000], help="1h candles per symbol")
+    run_parser.add_argument("--symbols", type=int, nargs="+", default=[1, 10])
+    run_parser.add_argument("--scenarios", nargs="+", default=list(SCENARIOS), choices=list(SCENARIOS))
+    run_parser.add_argument("--repeat", type=int, default=3, help="runs per case (median is reported)")
+    run_parser.add_argument("--latency", type=float, default=0.0, help="fake API latency per request (s)")
+    run_parser.add_argument("--weight-limit", type=int, default=None, help="fake request weight limit per minute")
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--out", help="report path (default: benchmarks/results/<commit>.json)")
+    run_parser.set_defaults(func=run)
+
+    compare_parser = commands.add_parser("compare", help="compare two JSON reports")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("candidate")
+    compare_parser.add_argument("--threshold", type=float, default=0.15, help="relative slowdown that fails")
+    compare_parser.set_defaults(func=compare)
+
+    args = parser.parse_args()
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
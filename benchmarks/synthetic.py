@@ -0,0 +1,90 @@
+"""
+Seeded synthetic OHLCV with regime switches and volume spikes.
+
+Every series is generated from a fixed origin, so any window of a
+(symbol, interval) is identical no matter how it is requested: overlapping
+fetches, incremental updates and resampled intervals all agree.
+"""
+import zlib
+
+import numpy as np
+import pandas as pd
+
+# Series start here; earlier candles do not exist
+ORIGIN = pd.Timestamp("2023-01-01")
+ORIGIN_MS = ORIGIN.value // 1_000_000
+
+# name: (drift per candle, volatility per candle, volume multiplier)
+REGIMES = {
+    'bull': (0.0006, 0.008, 1.2),
+    'bear': (-0.0005, 0.010, 1.4),
+    'chop': (0.0, 0.004, 0.7),
+    'panic': (-0.0015, 0.030, 3.0),
+}
+# Row: from-regime, columns: probability of switching to each regime (same order)
+TRANSITIONS = np.array([
+    [0.00, 0.35, 0.60, 0.05],
+    [0.45, 0.00, 0.50, 0.05],
+    [0.50, 0.45, 0.00, 0.05],
+    [0.60, 0.10, 0.30, 0.00],
+])
+MEAN_REGIME_CANDLES = 200
+SPIKE_PROBABILITY = 0.01
+
+def _rng(symbol, interval_ms, seed, stream):
+    return np.random.default_rng([seed, zlib.crc32(symbol.encode()), interval_ms // 60000, stream])
+
+def regimes(symbol, n, interval_ms, seed=0):
+    """Regime index (into REGIMES) of each of the first n candles."""
+    rng = _rng(symbol, interval_ms, seed, 0)
+    out = np.empty(n, dtype=np.int8)
+    state, pos = int(rng.integers(len(REGIMES))), 0
+    while pos < n:
+        length = int(rng.geometric(1 / MEAN_REGIME_CANDLES))
+        out[pos:pos + length] = state
+        pos += length
+        state = int(rng.choice(len(REGIMES), p=TRANSITIONS[state]))
+    return out
+
+def generate(symbol, interval_ms, n, seed=0):
+    """The first n candles of a series as a dict of arrays (open_time ms + OHLCV)."""
+    params = np.array(list(REGIMES.values()))
+    state = regimes(symbol, n, interval_ms, seed)
+    drift, vol, vol_mult = params[state, 0], params[state, 1], params[state, 2]
+    # Volatility scales with the square root of the candle length (1h as reference)
+    scale = np.sqrt(interval_ms / 3_600_000)
+
+    # One stream per quantity: the first m of n draws equal m draws, so any
+    # prefix of a longer series is the shorter series
+    base = 10 ** _rng(symbol, interval_ms, seed, 1).uniform(-2, 4)  # price levels from 0.01 to 10k
+    returns = drift * scale ** 2 + vol * scale * _rng(symbol, interval_ms, seed, 2).standard_normal(n)
+    close = base * np.exp(np.cumsum(returns))
+    open_ = np.concatenate([[base], close[:-1]])
+    wick = np.abs(_rng(symbol, interval_ms, seed, 3).standard_normal((n, 2))) * (vol * scale * 0.5)[:, None]
+    high = np.maximum(open_, close) * (1 + wick[:, 0])
+    low = np.minimum(open_, close) * (1 - wick[:, 1])
+
+    # Volume follows the regime and the size of the move, with occasional spikes
+    volume = _rng(symbol, interval_ms, seed, 4).lognormal(np.log(1000), 0.3, n) * vol_mult * (1 + 20 * np.abs(returns))
+    spikes = _rng(symbol, interval_ms, seed, 5).random((n, 2))
+    volume *= np.where(spikes[:, 0] < SPIKE_PROBABILITY, 3 + 7 * spikes[:, 1], 1.0)
+
+    return {
+        'open_time': ORIGIN_MS + np.arange(n, dtype=np.int64) * interval_ms,
+        'open': open_, 'high': high, 'low': low, 'close': close, 'volume': volume,
+    }
+
+def window(symbol, interval_ms, start_ms, end_ms, seed=0):
+    """Candles with start_ms <= open_time < end_ms (clipped at ORIGIN)."""
+    first = max(0, -(-(start_ms - ORIGIN_MS) // interval_ms))
+    last = max(0, -(-(end_ms - ORIGIN_MS) // interval_ms))
+    series = generate(symbol, interval_ms, last, seed)
+    return {k: v[first:] for k, v in series.items()}
+
+def ohlcv_frame(symbol, interval_ms, rows, seed=0):
+    """The first `rows` candles as a DataFrame shaped like BinanceLoader output."""
+    series = generate(symbol, interval_ms, rows, seed)
+    index = pd.to_datetime(series.pop('open_time'), unit='ms')
+    df = pd.DataFrame(series, index=index)
+    df.index.name = 'timestamp'
+    return df
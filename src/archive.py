@@ -0,0 +1,300 @@
+import contextlib
+import os
+import re
+import struct
+import threading
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers are only serialized within a process
+    fcntl = None
+
+MAGIC = b"CNDL"
+VERSION = 1
+# magic, version, flags, row count, row capacity; padded to HEADER_SIZE
+HEADER = struct.Struct("<4sHHQQ")
+HEADER_SIZE = 64
+FLAG_UNSORTED = 1
+
+COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+# Every INDEX_STRIDE-th timestamp forms the sparse index used to locate ranges
+INDEX_STRIDE = 1024
+
+class CandleArchive:
+    """
+    Append-only, memory-mapped columnar store with one file per
+    (symbol, interval). Layout: a 64-byte header, then fixed-width columns
+    of `capacity` slots each: timestamp (int64 ms, UTC), open, high, low,
+    close, volume (float64). Reads map the file with numpy.memmap, so opening
+    is constant-time and column slices are zero-copy views.
+
+    Appends that are not strictly newer than the last row are still accepted
+    but mark the file unsorted; reads then sort/dedupe in memory until
+    compact() rewrites the file sorted, deduplicated and trimmed.
+
+    Writers (append, compact, import_from_db) hold an exclusive flock on a
+    sidecar .lock file, so the app and the headless scanner can share one
+    archive directory. Readers take no lock: the row count in the header is
+    written last and rewrites are atomic renames.
+    """
+    def __init__(self, root="data/archive"):
+        self.root = root
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, symbol, interval):
+        name = re.sub(r"[^A-Za-z0-9]", "_", f"{symbol}_{interval}")
+        return os.path.join(self.root, f"{name}.candles")
+
+    def _lock(self, path):
+        with self._locks_guard:
+            return self._locks.setdefault(path, threading.Lock())
+
+    @contextlib.contextmanager
+    def _locked(self, path):
+        """Exclusive write access to one file: across threads, then across processes."""
+        with self._lock(path):
+            if fcntl is None:
+                yield
+                return
+            with open(path + ".lock", "a") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    # --- low level -----------------------------------------------------------------
+
+    @staticmethod
+    def _read_header(path):
+        with open(path, "rb") as f:
+            magic, version, flags, count, capacity = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a candle archive (v{VERSION})")
+        return flags, count, capacity
+
+    @staticmethod
+    def _write_header(f, flags, count, capacity):
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, flags, count, capacity).ljust(HEADER_SIZE, b"\0"))
+
+    @staticmethod
+    def _map(path, capacity, mode="r"):
+        """Returns (timestamps, {column: values}) memmaps of length `capacity`."""
+        mm = np.memmap(path, dtype=np.int64, mode=mode, offset=HEADER_SIZE, shape=(1 + len(COLUMNS), capacity))
+        ts = mm[0]
+        values = mm[1:].view(np.float64)
+        return ts, {col: values[i] for i, col in enumerate(COLUMNS)}
+
+    def _create(self, path, ts, values, capacity, flags=0):
+        """Writes a fresh file via a temp file + atomic rename."""
+        capacity = max(capacity, len(ts), 1)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            self._write_header(f, flags, len(ts), capacity)
+            f.truncate(HEADER_SIZE + (1 + len(COLUMNS)) * capacity * 8)
+        if len(ts):
+            m_ts, m_vals = self._map(tmp, capacity, mode="r+")
+            m_ts[:len(ts)] = ts
+            for col in COLUMNS:
+                m_vals[col][:len(ts)] = values[col]
+            m_ts._mmap.flush()
+            del m_ts, m_vals
+        os.replace(tmp, path)
+
+    # --- public API ----------------------------------------------------------------
+
+    def info(self, symbol, interval):
+        path = self.path(symbol, interval)
+        if not os.path.exists(path):
+            return None
+        flags, count, capacity = self._read_header(path)
+        ts, _ = self.arrays(symbol, interval)
+        return {
+            'rows': count,
+            'capacity': capacity,
+            'sorted': not flags & FLAG_UNSORTED,
+            'first': pd.to_datetime(ts.min(), unit='ms') if count else None,
+            'last': pd.to_datetime(ts.max(), unit='ms') if count else None,
+            'bytes': os.path.getsize(path),
+        }
+
+    def arrays(self, symbol, interval):
+        """
+        Zero-copy (timestamps_ms, {column: values}) memmap views of the stored
+        rows, in file order. Empty arrays when the series does not exist.
+        """
+        path = self.path(symbol, interval)
+        if not os.path.exists(path):
+            return np.empty(0, np.int64), {col: np.empty(0) for col in COLUMNS}
+        flags, count, capacity = self._read_header(path)
+        ts, values = self._map(path, capacity)
+        return ts[:count], {col: v[:count] for col, v in values.items()}
+
+    def last_timestamp(self, symbol, interval):
+        ts, _ = self.arrays(symbol, interval)
+        return pd.to_datetime(ts.max(), unit='ms') if len(ts) else None
+
+    def read(self, symbol, interval, start=None, end=None) -> pd.DataFrame:
+        """Candles in [start, end) as a DataFrame shaped like DatabaseManager.get_ohlcv."""
+        path = self.path(symbol, interval)
+        ts, values = self.arrays(symbol, interval)
+        if not len(ts):
+            return pd.DataFrame()
+
+        if self._read_header(path)[0] & FLAG_UNSORTED:
+            # Slow path until compact(): sort and keep the last write per timestamp
+            order = np.argsort(ts, kind="stable")
+            ts_sorted = ts[order]
+            keep = np.append(ts_sorted[1:] != ts_sorted[:-1], True)
+            rows = order[keep]
+            ts = ts[rows]
+            values = {col: v[rows] for col, v in values.items()}
+
+        lo = self._locate(ts, start) if start is not None else 0
+        hi = self._locate(ts, end) if end is not None else len(ts)
+        if lo >= hi:
+            return pd.DataFrame()
+
+        df = pd.DataFrame({col: values[col][lo:hi] for col in COLUMNS},
+                          index=pd.to_datetime(ts[lo:hi], unit='ms'))
+        df.index.name = 'timestamp'
+        return df
+
+    @staticmethod
+    def _locate(ts, when):
+        """First row with timestamp >= when, via the sparse index then one block."""
+        target = pd.Timestamp(when).value // 1_000_000
+        sparse = ts[::INDEX_STRIDE]
+        block = max(int(np.searchsorted(sparse, target, side="left")) - 1, 0)
+        lo = block * INDEX_STRIDE
+        hi = min(lo + 2 * INDEX_STRIDE, len(ts))
+        return lo + int(np.searchsorted(ts[lo:hi], target, side="left"))
+
+    def append(self, symbol, interval, df: pd.DataFrame, only_newer=False):
+        """
+        Appends candles (DatetimeIndex + OHLCV columns). only_newer keeps
+        just the rows after the last stored one, checked under the write
+        lock. Returns rows written.
+        """
+        if df is None or df.empty:
+            return 0
+        df = df.sort_index()
+        new_ts = df.index.values.astype("datetime64[ms]").astype(np.int64)
+        new_vals = {col: df[col].to_numpy(dtype=np.float64) for col in COLUMNS}
+
+        path = self.path(symbol, interval)
+        with self._locked(path):
+            if only_newer and os.path.exists(path):
+                ts, _ = self.arrays(symbol, interval)
+                if len(ts):
+                    keep = new_ts > ts.max()
+                    new_ts = new_ts[keep]
+                    new_vals = {col: v[keep] for col, v in new_vals.items()}
+                del ts
+                if not len(new_ts):
+                    return 0
+            if not os.path.exists(path):
+                self._create(path, new_ts, new_vals, capacity=len(new_ts))
+                return len(new_ts)
+
+            flags, count, capacity = self._read_header(path)
+            ts, values = self._map(path, capacity)
+            if count and new_ts[0] <= ts[:count].max():
+                flags |= FLAG_UNSORTED
+
+            if count + len(new_ts) > capacity:
+                # Grow geometrically so appends stay amortized O(rows)
+                merged_ts = np.concatenate([ts[:count], new_ts])
+                merged = {col: np.concatenate([values[col][:count], new_vals[col]]) for col in COLUMNS}
+                del ts, values
+                self._create(path, merged_ts, merged, capacity=max(2 * capacity, len(merged_ts)), flags=flags)
+                return len(new_ts)
+            del ts, values
+
+            m_ts, m_vals = self._map(path, capacity, mode="r+")
+            m_ts[count:count + len(new_ts)] = new_ts
+            for col in COLUMNS:
+                m_vals[col][count:count + len(new_ts)] = new_vals[col]
+            m_ts._mmap.flush()
+            del m_ts, m_vals
+
+            # Header last: the row count is the commit point
+            with open(path, "r+b") as f:
+                self._write_header(f, flags, count + len(new_ts), capacity)
+        return len(new_ts)
+
+    def compact(self, symbol, interval):
+        """Rewrites a series sorted, deduplicated (last write wins) and trimmed. Returns bytes saved."""
+        path = self.path(symbol, interval)
+        if not os.path.exists(path):
+            return 0
+        with self._locked(path):
+            before = os.path.getsize(path)
+            df = self.read(symbol, interval)
+            ts = df.index.values.astype("datetime64[ms]").astype(np.int64) if not df.empty else np.empty(0, np.int64)
+            values = {col: df[col].to_numpy() if not df.empty else np.empty(0) for col in COLUMNS}
+            self._create(path, ts, values, capacity=len(ts))
+            return before - os.path.getsize(path)
+
+    def delete(self, symbol, interval):
+        path = self.path(symbol, interval)
+        with self._locked(path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def clear(self):
+        for name in os.listdir(self.root):
+            if name.endswith(".candles"):
+                os.remove(os.path.join(self.root, name))
+
+    def series(self):
+        """(symbol, interval) pairs in the archive, from the stored file names."""
+        out = []
+        for name in sorted(os.listdir(self.root)):
+            if name.endswith(".candles") and "_" in name:
+                symbol, interval = name[:-len(".candles")].rsplit("_", 1)
+                out.append((symbol, interval))
+        return out
+
+    # --- SQL store round trip ------------------------------------------------------
+
+    def import_from_db(self, db, symbol, interval):
+        """Appends candles from the SQL store newer than the archive's last row."""
+        last = self.last_timestamp(symbol, interval)
+        df = db.get_ohlcv(symbol, interval, limit=None, start=last)
+        # Rechecked under the lock: another process may have appended meanwhile
+        return self.append(symbol, interval, df, only_newer=True)
+
+    def export_to_db(self, db, symbol, interval, start=None, end=None):
+        """Writes archived candles back into the SQL store (existing rows are skipped)."""
+        df = self.read(symbol, interval, start=start, end=end)
+        if not df.empty:
+            db.save_ohlcv(symbol, interval, df)
+        return len(df)
+
+
+if __name__ == "__main__":
+    import argparse
+    from src.database import DatabaseManager
+
+    parser = argparse.ArgumentParser(description="Columnar candle archive maintenance")
+    parser.add_argument("command", choices=["import", "export", "compact", "info"])
+    parser.add_argument("--symbol", required=True)
+    parser.add_argument("--interval", required=True)
+    parser.add_argument("--root", default=os.getenv("CANDLE_ARCHIVE_DIR", "data/archive"))
+    args = parser.parse_args()
+
+    archive = CandleArchive(args.root)
+    if args.command == "import":
+        print(f"Imported {archive.import_from_db(DatabaseManager(), args.symbol, args.interval)} rows")
+    elif args.command == "export":
+        print(f"Exported {archive.export_to_db(DatabaseManager(), args.symbol, args.interval)} rows")
+    elif args.command == "compact":
+        print(f"Compacted, {archive.compact(args.symbol, args.interval)} bytes reclaimed")
+    else:
+        print(archive.info(args.symbol, args.interval))
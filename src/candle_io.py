@@ -0,0 +1,271 @@
+"""
+Bulk candle import/export for seeding the `ohlcv` store without the API.
+
+Reads CSV (with a header, or Binance's headerless kline dump layout, also
+zipped as downloaded from data.binance.vision) and Parquet, in chunks:
+each chunk is validated, deduplicated and bulk-inserted with save_ohlcv.
+Epoch timestamps may be s, ms or µs (Binance spot dumps switched to µs
+in 2025); ISO strings are read as UTC.
+
+    python -m src.candle_io import data/BTCUSDT-1h-2024-*.zip
+    python -m src.candle_io import candles.parquet --symbol ETHUSDT --interval 15m
+    python -m src.candle_io export --symbol BTCUSDT --interval 1h --out btc.parquet
+"""
+import os
+import re
+import time
+import numpy as np
+import pandas as pd
+
+COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+# Rows read, validated and inserted per transaction
+CHUNK_ROWS = 100_000
+# Header names accepted for the candle open time
+TIME_COLUMNS = ['open_time', 'timestamp', 'time', 'date', 'datetime']
+# Binance dump file names: BTCUSDT-1h-2024-01.csv / .zip
+DUMP_NAME = re.compile(r"^([A-Z0-9]+)-(\d+[smhdwM])-")
+# Binance kline row: open time, OHLCV, close time, quote volume, trades, taker base/quote, ignore
+BINANCE_COLUMNS = ['open_time', *COLUMNS, 'close_time', 'quote_volume', 'trades',
+                   'taker_buy_base', 'taker_buy_quote', 'ignore']
+
+def interval_minutes(interval):
+    """Minutes per candle for m/h/d intervals, None for w/M (no fixed grid)."""
+    match = re.fullmatch(r"(\d+)([mhd])", interval)
+    if not match:
+        return None
+    return int(match.group(1)) * {'m': 1, 'h': 60, 'd': 1440}[match.group(2)]
+
+def infer_series(path):
+    """(symbol, interval) from a Binance dump file name, else (None, None)."""
+    match = DUMP_NAME.match(os.path.basename(path))
+    return (match.group(1), match.group(2)) if match else (None, None)
+
+def to_timestamps(values):
+    """
+    Candle open times as naive UTC. Numbers are epochs whose unit is told
+    apart per value by magnitude (s < 1e11 <= ms < 1e14 <= µs < 1e17 <= ns),
+    so files mixing ms and µs rows still line up.
+    """
+    values = pd.Series(values)
+    if pd.api.types.is_numeric_dtype(values):
+        # float64 holds ms and µs epochs exactly; missing values become NaT
+        v = values.to_numpy(dtype=np.float64)
+        ms = np.select([v >= 1e17, v >= 1e14, v >= 1e11], [v / 1e6, v / 1e3, v], v * 1e3)
+        return pd.DatetimeIndex(pd.to_datetime(np.floor(ms), unit='ms'))
+    return pd.DatetimeIndex(pd.to_datetime(values, utc=True)).tz_convert(None)
+
+def _is_number(value):
+    try:
+        float(value)
+        return True
+    except (TypeError, ValueError):
+        return False
+
+def _candles(frame, time_column):
+    """Raw chunk -> OHLCV float frame indexed by open time."""
+    out = frame[COLUMNS].apply(pd.to_numeric, errors='coerce').astype(float)
+    out.index = to_timestamps(frame[time_column])
+    out.index.name = 'timestamp'
+    return out
+
+def _with_header(frame):
+    frame = frame.rename(columns=lambda c: str(c).strip().lower())
+    time_column = next((c for c in TIME_COLUMNS if c in frame.columns), None)
+    missing = [c for c in COLUMNS if c not in frame.columns]
+    if time_column is None or missing:
+        raise ValueError(f"Expected a time column ({', '.join(TIME_COLUMNS)}) and {', '.join(COLUMNS)}; "
+                         f"got {', '.join(frame.columns)}")
+    return _candles(frame, time_column)
+
+def read_chunks(path, chunk_size=CHUNK_ROWS):
+    """Yields OHLCV frames indexed by open time from a CSV, zipped CSV or Parquet file."""
+    if path.endswith(".parquet"):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Parquet support needs pyarrow: pip install pyarrow")
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            frame = batch.to_pandas()
+            if isinstance(frame.index, pd.DatetimeIndex):
+                frame = frame.reset_index()
+            yield _with_header(frame)
+        return
+
+    # Binance dumps have no header row (futures dumps do); sniff the first cell
+    first = pd.read_csv(path, header=None, nrows=1)
+    if first.empty:
+        return
+    if _is_number(first.iloc[0, 0]):
+        # Headerless: Binance's 12 columns, or just open time + OHLCV
+        if first.shape[1] < 6:
+            raise ValueError(f"{path}: expected open time and OHLCV columns, found {first.shape[1]}")
+        reader = pd.read_csv(path, header=None, names=BINANCE_COLUMNS[:first.shape[1]], usecols=range(6),
+                             chunksize=chunk_size)
+        for frame in reader:
+            yield _candles(frame, 'open_time')
+    else:
+        for frame in pd.read_csv(path, chunksize=chunk_size):
+            yield _with_header(frame)
+
+def validate(candles, interval):
+    """
+    Splits a chunk into valid candles and {reason: rows rejected}. Each row
+    counts once, under the first check it fails.
+    """
+    prices = candles[['open', 'high', 'low', 'close']]
+    checks = [
+        ('missing values', candles.isna().any(axis=1).to_numpy() | candles.index.isna()),
+        ('non-positive price', (prices <= 0).any(axis=1).to_numpy()),
+        ('high/low outside open/close', (
+            (candles['high'] < prices[['open', 'close']].max(axis=1))
+            | (candles['low'] > prices[['open', 'close']].min(axis=1))
+        ).to_numpy()),
+        ('negative volume', (candles['volume'] < 0).to_numpy()),
+    ]
+    minutes = interval_minutes(interval)
+    if minutes:
+        step = minutes * 60 * 10**9
+        checks.append(('off the interval grid', candles.index.to_numpy().astype('datetime64[ns]').astype(np.int64) % step != 0))
+
+    rejected, bad = {}, np.zeros(len(candles), dtype=bool)
+    for reason, mask in checks:
+        new = mask & ~bad
+        if new.any():
+            rejected[reason] = int(new.sum())
+            bad |= new
+    return candles[~bad], rejected
+
+def import_file(db, path, symbol=None, interval=None, chunk_size=CHUNK_ROWS, progress=None):
+    """
+    Streams one file into the store. symbol/interval default to those in a
+    Binance dump file name. Rows already stored (or repeated in the file)
+    are skipped. progress(stats) is called after every chunk.
+    Returns stats: rows read, inserted, duplicates, rejected per reason,
+    seconds and rows/s.
+    """
+    inferred_symbol, inferred_interval = infer_series(path)
+    symbol, interval = symbol or inferred_symbol, interval or inferred_interval
+    if not symbol or not interval:
+        raise ValueError(f"{path}: pass --symbol and --interval (not a Binance dump file name)")
+
+    stats = {'path': path, 'symbol': symbol, 'interval': interval,
+             'rows': 0, 'inserted': 0, 'duplicates': 0, 'rejected': {}, 'seconds': 0.0, 'rows_per_s': 0}
+    start = time.perf_counter()
+    for candles in read_chunks(path, chunk_size):
+        stats['rows'] += len(candles)
+        # 1. Validate, 2. drop repeats within the chunk, 3. insert what the store lacks
+        valid, rejected = validate(candles, interval)
+        for reason, n in rejected.items():
+            stats['rejected'][reason] = stats['rejected'].get(reason, 0) + n
+        valid = valid[~valid.index.duplicated(keep='last')].sort_index()
+        # Not journaled for replay on the SQLite fallback: that would hold the whole file
+        inserted = db.save_ohlcv(symbol, interval, valid, journal=False)
+        stats['inserted'] += inserted
+        stats['duplicates'] += len(candles) - sum(rejected.values()) - inserted
+        stats['seconds'] = time.perf_counter() - start
+        stats['rows_per_s'] = round(stats['rows'] / stats['seconds']) if stats['seconds'] else 0
+        if progress:
+            progress(stats)
+    return stats
+
+def _binance_rows(chunk, interval):
+    """OHLCV frame -> Binance kline dump layout (ms epochs; unknown fields zero)."""
+    open_ms = chunk.index.to_numpy().astype('datetime64[ms]').astype(np.int64)
+    minutes = interval_minutes(interval) or 0
+    return pd.DataFrame({
+        'open_time': open_ms,
+        **{c: chunk[c].to_numpy() for c in COLUMNS},
+        'close_time': open_ms + minutes * 60_000 - 1,
+        'quote_volume': 0.0, 'trades': 0, 'taker_buy_base': 0.0, 'taker_buy_quote': 0.0, 'ignore': 0,
+    })
+
+def export_candles(db, symbol, interval, path, fmt=None, start=None, end=None, chunk_size=CHUNK_ROWS, progress=None):
+    """
+    Streams stored candles to a file, oldest first. fmt: 'parquet', 'csv'
+    (header, ISO timestamps) or 'binance' (headerless dump layout); by
+    default from the extension (.parquet, otherwise csv).
+    Returns stats: rows, seconds and rows/s.
+    """
+    fmt = fmt or ('parquet' if path.endswith('.parquet') else 'csv')
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    stats = {'path': path, 'rows': 0, 'seconds': 0.0, 'rows_per_s': 0}
+    begin = time.perf_counter()
+    out = open(path, 'w', newline='') if fmt != 'parquet' else None
+    writer = None
+    try:
+        for chunk in db.iter_ohlcv(symbol, interval, start=start, end=end, chunk_size=chunk_size):
+            if fmt == 'parquet':
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+                table = pa.Table.from_pandas(chunk.reset_index(), preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema)
+                writer.write_table(table)
+            elif fmt == 'binance':
+                _binance_rows(chunk, interval).to_csv(out, header=False, index=False)
+            else:
+                chunk.to_csv(out, header=stats['rows'] == 0, date_format="%Y-%m-%d %H:%M:%S")
+            stats['rows'] += len(chunk)
+            stats['seconds'] = time.perf_counter() - begin
+            stats['rows_per_s'] = round(stats['rows'] / stats['seconds']) if stats['seconds'] else 0
+            if progress:
+                progress(stats)
+    finally:
+        if out is not None:
+            out.close()
+        if writer is not None:
+            writer.close()
+    return stats
+
+def _print_progress(stats):
+    line = f"{stats['path']}: {stats['rows']:,} rows"
+    if 'inserted' in stats:
+        line += f", {stats['inserted']:,} inserted, {stats['duplicates']:,} duplicates"
+        if stats['rejected']:
+            line += f", {sum(stats['rejected'].values()):,} rejected"
+    print(f"{line} ({stats['rows_per_s']:,} rows/s)", flush=True)
+
+
+if __name__ == "__main__":
+    import argparse
+    import glob
+    from src.database import DatabaseManager
+
+    parser = argparse.ArgumentParser(description="Bulk candle import/export (CSV, Binance dumps, Parquet)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    import_parser = commands.add_parser("import", help="load candle files into the ohlcv store")
+    import_parser.add_argument("paths", nargs="+", help="files or glob patterns")
+    import_parser.add_argument("--symbol", help="default: from a Binance dump file name")
+    import_parser.add_argument("--interval", help="default: from a Binance dump file name")
+    export_parser = commands.add_parser("export", help="write stored candles to a file")
+    export_parser.add_argument("--symbol", required=True)
+    export_parser.add_argument("--interval", required=True)
+    export_parser.add_argument("--out", required=True)
+    export_parser.add_argument("--format", choices=["csv", "binance", "parquet"], help="default: from --out")
+    export_parser.add_argument("--start", type=pd.Timestamp)
+    export_parser.add_argument("--end", type=pd.Timestamp)
+    for sub in (import_parser, export_parser):
+        sub.add_argument("--chunk-size", type=int, default=CHUNK_ROWS)
+        sub.add_argument("--db-url", help="database URL (default: MySQL from .env, SQLite fallback)")
+    args = parser.parse_args()
+
+    db = DatabaseManager(db_url=args.db_url)
+    if args.command == "import":
+        paths = sorted({p for pattern in args.paths for p in (glob.glob(pattern) or [pattern])})
+        total, inserted, started = 0, 0, time.perf_counter()
+        for path in paths:
+            stats = import_file(db, path, args.symbol, args.interval, args.chunk_size, progress=_print_progress)
+            total, inserted = total + stats['rows'], inserted + stats['inserted']
+            for reason, n in stats['rejected'].items():
+                print(f"  rejected {n:,}: {reason}")
+        elapsed = time.perf_counter() - started
+        print(f"Imported {inserted:,} of {total:,} rows from {len(paths)} file(s) in {elapsed:.1f} s "
+              f"({total / elapsed if elapsed else 0:,.0f} rows/s)")
+        if db.fallback_active:
+            print("MySQL was unreachable: the candles are in the local SQLite store only. "
+                  "Re-run the import once MySQL is back to load them there.")
+    else:
+        stats = export_candles(db, args.symbol, args.interval, args.out, args.format,
+                               args.start, args.end, args.chunk_size, progress=_print_progress)
+        print(f"Exported {stats['rows']:,} rows to {args.out} in {stats['seconds']:.1f} s")
@@ -0,0 +1,139 @@
+"""
+Chart data for the Analysis page, decimated to what a full-width chart can
+show: candles are merged OHLC-aware into at most CANDLE_BUDGET buckets,
+lines are downsampled with LTTB and signal markers are clustered per
+bucket. The figure payload stays about the same size however long the
+history is; narrowing the window brings back full resolution.
+"""
+import numpy as np
+import pandas as pd
+
+# Candles drawn at most (about 2 px each on a full-width chart)
+CANDLE_BUDGET = 600
+# Points per line; LTTB keeps the visual shape at about one point per pixel
+LINE_BUDGET = 1200
+# Scatter traces with more points than this are drawn with WebGL
+WEBGL_THRESHOLD = 1000
+
+def bucket_starts(n, n_buckets):
+    """Offsets of contiguous, equally sized buckets covering n rows."""
+    size = max(1, -(-n // max(n_buckets, 1)))
+    return np.arange(0, n, size)
+
+def bucket_ohlc(df, n_buckets=CANDLE_BUDGET):
+    """
+    Merges runs of consecutive candles so at most n_buckets remain: first
+    open, highest high, lowest low, last close and summed volume, indexed
+    by the first candle's time. Wicks and gaps survive any zoom level.
+    """
+    columns = [c for c in ['open', 'high', 'low', 'close', 'volume'] if c in df.columns]
+    if len(df) <= n_buckets:
+        return df[columns].copy()
+    starts = bucket_starts(len(df), n_buckets)
+    ends = np.append(starts[1:], len(df)) - 1
+    out = pd.DataFrame({
+        'open': df['open'].to_numpy()[starts],
+        'high': np.maximum.reduceat(df['high'].to_numpy(), starts),
+        'low': np.minimum.reduceat(df['low'].to_numpy(), starts),
+        'close': df['close'].to_numpy()[ends],
+    }, index=df.index[starts])
+    if 'volume' in columns:
+        out['volume'] = np.add.reduceat(df['volume'].to_numpy(), starts)
+    return out
+
+def lttb(x, y, n_out=LINE_BUDGET):
+    """
+    Largest-Triangle-Three-Buckets downsampling. Returns the indices of the
+    points kept: the first and last, and from each bucket in between the
+    point spanning the largest triangle with the previously kept point and
+    the mean of the next bucket. Peaks and troughs survive; flat runs don't.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    # n_out - 2 buckets over the interior points; the step is >= 1, so none is empty
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    kept = np.empty(n_out, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_x, next_y = x[hi:edges[i + 2]].mean(), y[hi:edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+        area = np.abs((x[a] - next_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (next_y - y[a]))
+        a = lo + int(np.argmax(area))
+        kept[i + 1] = a
+    return kept
+
+def cluster_markers(times, prices, starts):
+    """
+    Collapses markers that fall into the same chart bucket (`starts`:
+    ascending bucket start times) into one marker at the bucket start and
+    their mean price. Returns a DataFrame with x, y and count.
+    """
+    if not len(times):
+        return pd.DataFrame({'x': pd.DatetimeIndex([]), 'y': [], 'count': []})
+    starts = np.asarray(starts)
+    bucket = np.clip(np.searchsorted(starts, np.asarray(times), side='right') - 1, 0, None)
+    grouped = pd.DataFrame({'bucket': bucket, 'y': prices}).groupby('bucket')['y'].agg(['mean', 'size'])
+    return pd.DataFrame({
+        'x': starts[grouped.index.to_numpy()],
+        'y': grouped['mean'].to_numpy(),
+        'count': grouped['size'].to_numpy(),
+    })
+
+def scatter_trace(n_points):
+    """go.Scattergl above WEBGL_THRESHOLD points, go.Scatter (SVG) below."""
+    import plotly.graph_objects as go
+    return go.Scattergl if n_points > WEBGL_THRESHOLD else go.Scatter
+
+def price_chart(df, signals, start=None, end=None, candle_budget=CANDLE_BUDGET, line_budget=LINE_BUDGET):
+    """
+    Candlesticks, SMA 20 and BUY/SELL markers for df[start:end], decimated
+    to the budgets. `signals` needs 'signal' and 'close' columns.
+    Returns (figure, info) with rows in the window, candles per bucket and
+    points sent.
+    """
+    import plotly.graph_objects as go  # imported on first chart to keep startup fast
+
+    # 1. Candles
+    view = df.loc[start:end]
+    candles = bucket_ohlc(view, candle_budget)
+    fig = go.Figure()
+    fig.add_trace(go.Candlestick(x=candles.index,
+                    open=candles['open'], high=candles['high'],
+                    low=candles['low'], close=candles['close'], name='OHLC'))
+    points = len(candles)
+
+    # 2. SMA 20 line (indicator warmup NaNs dropped before LTTB)
+    if 'sma_20' in view.columns:
+        sma = view['sma_20'].dropna()
+        sma = sma.iloc[lttb(sma.index.to_numpy().astype(np.int64), sma.to_numpy(), line_budget)]
+        fig.add_trace(scatter_trace(len(sma))(x=sma.index, y=sma.to_numpy(), mode='lines',
+                                              line=dict(color='blue', width=1), name='SMA 20'))
+        points += len(sma)
+
+    # 3. Markers, one per bucket and side; size grows with the signals merged
+    window_signals = signals.loc[start:end]
+    for kind, shape, color in [('BUY', 'triangle-up', 'green'), ('SELL', 'triangle-down', 'red')]:
+        hits = window_signals[window_signals['signal'] == kind]
+        markers = cluster_markers(hits.index.to_numpy(), hits['close'].to_numpy(), candles.index.to_numpy())
+        fig.add_trace(scatter_trace(len(markers))(
+            mode='markers', x=markers['x'], y=markers['y'], customdata=markers['count'],
+            marker=dict(symbol=shape, color=color, size=np.minimum(10 + 3 * np.log2(np.maximum(markers['count'], 1)), 22)),
+            hovertemplate=f"{kind} ×%{{customdata}}<br>%{{x}}<br>%{{y}}<extra></extra>",
+            name=f"{kind.title()} Signal"))
+        points += len(markers)
+
+    fig.update_layout(xaxis_rangeslider_visible=False, height=500)
+    info = {
+        'rows': len(view),
+        'candles': len(candles),
+        'per_bucket': -(-len(view) // max(len(candles), 1)),
+        'points': points,
+    }
+    return fig, info
@@ -0,0 +1,47 @@
+import numpy as np
+
+class CompactFrame:
+    """
+    Memory-lean stand-in for a feature/label DataFrame of one symbol.
+    All numeric columns live in one Fortran-ordered float32 buffer, so every
+    column, and any leading block of columns, is a contiguous view that can be
+    handed to the model without copying. Targets are int8 (-1/0/1).
+    """
+    def __init__(self, index, columns, buffer, n_rows=None, target=None):
+        self.columns = list(columns)
+        self._pos = {name: j for j, name in enumerate(self.columns)}
+        self.buffer = buffer
+        self.n_rows = len(buffer) if n_rows is None else n_rows
+        self.index = index[:self.n_rows]
+        self.target = target
+
+    def __len__(self):
+        return self.n_rows
+
+    def __getitem__(self, name):
+        """One column as a float32 view."""
+        return self.buffer[:self.n_rows, self._pos[name]]
+
+    def features(self, cols):
+        """
+        (rows x len(cols)) float32 matrix. A zero-copy view when cols are a
+        contiguous run of the buffer's columns (e.g. INDICATOR_COLUMNS),
+        otherwise a gathered copy.
+        """
+        positions = [self._pos[c] for c in cols]
+        first = positions[0]
+        if positions == list(range(first, first + len(positions))):
+            return self.buffer[:self.n_rows, first:first + len(positions)]
+        return np.asfortranarray(self.buffer[:self.n_rows, positions])
+
+    @property
+    def nbytes(self):
+        return self.buffer.nbytes + (self.target.nbytes if self.target is not None else 0) + self.index.nbytes
+
+    def to_frame(self):
+        """Materializes a regular DataFrame (for display/debugging)."""
+        import pandas as pd
+        df = pd.DataFrame(self.buffer[:self.n_rows], index=self.index, columns=self.columns)
+        if self.target is not None:
+            df['target'] = self.target
+        return df
@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+
+# Candles in the rolling window (one week of 1h candles)
+CORRELATION_WINDOW = 168
+BENCHMARK = "BTCUSDT"
+# Rebuild the running sums from the ring buffer after this many rows to bound float drift
+REBUILD_EVERY = 10000
+
+class RollingCorrelation:
+    """
+    Rolling correlation and beta matrix over the last `window` aligned log
+    returns of a fixed set of symbols. Keeps a ring buffer of returns plus
+    running sums S (N) and cross products P (N x N): adding k candles adds
+    their outer products and subtracts those of the rows they evict, so an
+    update costs O(N^2 * k) however long the window is.
+    """
+    def __init__(self, symbols, window=CORRELATION_WINDOW, benchmark=BENCHMARK):
+        self.symbols = list(symbols)
+        self.window = window
+        self.benchmark = benchmark if benchmark in self.symbols else None
+        n = len(self.symbols)
+        self._buffer = np.zeros((window, n))
+        self._pos = 0      # next ring slot to write
+        self.count = 0     # rows in the window
+        self._sum = np.zeros(n)
+        self._cross = np.zeros((n, n))
+        self._since_rebuild = 0
+        # Store refresh state: last aligned timestamp and each symbol's last close
+        self.last_timestamp = None
+        self._last_close = {}
+
+    def extend(self, returns):
+        """Adds rows of returns (k x N array, columns in self.symbols order)."""
+        returns = np.asarray(returns, dtype=np.float64).reshape(-1, len(self.symbols))
+        if len(returns) >= self.window:
+            # Everything in the window is replaced: start over from the tail
+            self._buffer[:] = returns[-self.window:]
+            self._pos, self.count = 0, self.window
+            self._rebuild()
+            return
+
+        slots = (self._pos + np.arange(len(returns))) % self.window
+        # Slots never written are zero rows, so subtracting them is a no-op
+        old = self._buffer[slots]
+        self._sum -= old.sum(axis=0)
+        self._cross -= old.T @ old
+        self._buffer[slots] = returns
+        self._sum += returns.sum(axis=0)
+        self._cross += returns.T @ returns
+        self._pos = (self._pos + len(returns)) % self.window
+        self.count = min(self.count + len(returns), self.window)
+
+        self._since_rebuild += len(returns)
+        if self._since_rebuild >= REBUILD_EVERY:
+            self._rebuild()
+
+    def _rebuild(self):
+        rows = self._buffer[:self.count] if self.count < self.window else self._buffer
+        self._sum = rows.sum(axis=0)
+        self._cross = rows.T @ rows
+        self._since_rebuild = 0
+
+    def covariance(self):
+        n = self.count
+        if n < 2:
+            return np.full((len(self.symbols),) * 2, np.nan)
+        return (self._cross - np.outer(self._sum, self._sum) / n) / (n - 1)
+
+    def correlation(self) -> pd.DataFrame:
+        cov = self.covariance()
+        std = np.sqrt(np.clip(np.diag(cov), 0, None))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            corr = cov / np.outer(std, std)
+        return pd.DataFrame(np.clip(corr, -1, 1), index=self.symbols, columns=self.symbols)
+
+    def betas(self) -> pd.Series:
+        """Beta of every symbol to the benchmark: cov(symbol, benchmark) / var(benchmark)."""
+        if self.benchmark is None:
+            return pd.Series(np.nan, index=self.symbols)
+        cov = self.covariance()
+        b = self.symbols.index(self.benchmark)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return pd.Series(cov[:, b] / cov[b, b], index=self.symbols)
+
+    def refresh(self, db, interval):
+        """
+        Pulls candles newer than the last aligned timestamp from the store and
+        adds their returns. Only timestamps every symbol has reached are
+        consumed, so a lagging symbol never gets its candles dropped. Returns
+        the number of new rows.
+        """
+        frames = {}
+        for symbol in self.symbols:
+            if self.last_timestamp is None:
+                df = db.get_ohlcv(symbol, interval, limit=self.window + 1)
+            else:
+                df = db.get_ohlcv(symbol, interval, limit=None, start=self.last_timestamp)
+                df = df[df.index > self.last_timestamp] if not df.empty else df
+            if df.empty:
+                return 0
+            frames[symbol] = df['close']
+
+        closes = pd.concat(frames, axis=1)[self.symbols].sort_index()
+        closes = closes[closes.index <= min(s.index[-1] for s in frames.values())]
+        if self._last_close:
+            # Seed with the previous closes so the first new row has a return
+            seed = pd.DataFrame([self._last_close], index=[self.last_timestamp])[self.symbols]
+            closes = pd.concat([seed, closes])
+        # A symbol without a candle at a timestamp is treated as unchanged
+        closes = closes.ffill()
+        returns = np.log(closes).diff().iloc[1:].fillna(0.0)
+        if returns.empty:
+            return 0
+
+        self.extend(returns.to_numpy())
+        self.last_timestamp = closes.index[-1]
+        self._last_close = closes.iloc[-1].to_dict()
+        return len(returns)
+
+
+def add_market_features(df, benchmark_df, window=CORRELATION_WINDOW):
+    """
+    Per-candle rolling correlation and beta of df's returns to the benchmark
+    (BTC) returns, as 'corr_btc' and 'beta_btc'. Candles are aligned on the
+    index; the warm-up rows (and candles the benchmark lacks) get 0.
+    """
+    returns = np.log(df['close']).diff()
+    bench = np.log(benchmark_df['close']).diff().reindex(df.index)
+    min_periods = min(window, 20)
+    cov = returns.rolling(window, min_periods=min_periods).cov(bench)
+    var = bench.rolling(window, min_periods=min_periods).var()
+    df['corr_btc'] = returns.rolling(window, min_periods=min_periods).corr(bench)
+    df['beta_btc'] = cov / var
+    df[['corr_btc', 'beta_btc']] = df[['corr_btc', 'beta_btc']].replace([np.inf, -np.inf], np.nan).fillna(0)
+    return df
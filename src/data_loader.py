@@ -1,28 +1,65 @@
+import numpy as np
 import pandas as pd
-from binance.client import Client
 import os
+import threading
 import time
 from datetime import datetime, timedelta
 from src.database import DatabaseManager
+from src.metrics import timed, incr
+from src.resample import INTERVAL_MINUTES, SOURCE_INTERVALS, interval_delta, resample_ohlcv, incomplete_ranges
 from dotenv import load_dotenv
 
 load_dotenv()
 
+FALLBACK_SYMBOLS = ["BTCUSDT", "ETHUSDT", "SOLUSDT", "BNBUSDT", "XRPUSDT"]
+
+# Seconds before shared cache entries are refetched
+CANDLE_CACHE_TTL = 60
+TICKER_CACHE_TTL = 300
+METADATA_CACHE_TTL = 3600
+
+# Longest a data request waits for a deferred connection attempt
+CONNECT_TIMEOUT = 15
+
 class BinanceLoader:
-    def __init__(self, api_key=None, api_secret=None):
+    def __init__(self, api_key=None, api_secret=None, client=None, db=None, cache=None, archive=None, metadata=None,
+                 defer_connect=False):
         # Load from env if not provided
         self.api_key = api_key or os.getenv("BINANCE_API_KEY")
         self.api_secret = api_secret or os.getenv("BINANCE_API_SECRET")
         self.tld = os.getenv("BINANCE_TLD", "com")
         
         self.connected = False
+        self.connecting = False
         self.error_message = None
-        
+        self.client = None
+        self._ready = threading.Event()
+
+        if defer_connect:
+            # Client creation and ping run in the background; callers that need
+            # the API wait in wait_until_ready(), everything else proceeds
+            self.connecting = True
+            threading.Thread(target=self._connect, args=(client,), name="binance-connect", daemon=True).start()
+        else:
+            self._connect(client)
+
+        self.db = db or DatabaseManager()
+        # Optional shared read-through cache (see src/services.TTLCache)
+        self.cache = cache
+        # Optional cold-storage tier read before the SQL store (see src/archive.CandleArchive)
+        self.archive = archive
+        # Optional persisted exchange metadata cache (see src/metadata_cache.MetadataCache)
+        self.metadata = metadata
+
+    def _connect(self, client=None):
         try:
-            # Initialize client with optional TLD (e.g., 'us' for binance.us)
-            self.client = Client(self.api_key, self.api_secret, tld=self.tld)
+            if client is None:
+                from binance.client import Client  # imported on first use to keep startup fast
+                # Initialize client with optional TLD (e.g., 'us' for binance.us); we ping below
+                client = Client(self.api_key, self.api_secret, tld=self.tld, ping=False)
             # Test connection with a simple ping
-            self.client.ping()
+            client.ping()
+            self.client = client
             self.connected = True
         except Exception as e:
             self.connected = False
@@ -33,17 +70,175 @@ class BinanceLoader:
                 self.error_message = msg
             print(f"FAILED to initialize Binance Client (TLD: {self.tld}): {self.error_message}")
             self.client = None
+        finally:
+            self.connecting = False
+            self._ready.set()
 
-        self.db = DatabaseManager()
+    def wait_until_ready(self, timeout=CONNECT_TIMEOUT):
+        """Blocks until a deferred connection attempt finished. Returns `connected`."""
+        self._ready.wait(timeout)
+        return self.connected
 
-    def get_data(self, symbol: str, interval: str, lookback_days: int) -> pd.DataFrame:
+    def _cached(self, key, ttl, load):
+        if self.cache is None:
+            return load()
+        return self.cache.get_or_load(key, load, ttl=ttl)
+
+    def _klines(self, *args):
+        klines = self.client.get_historical_klines(*args)
+        incr('api_klines_requests')
+        incr('api_klines_rows', len(klines))
+        return klines
+
+    @timed('get_data')
+    def get_data(self, symbol: str, interval: str, lookback_days: int, refresh=False) -> pd.DataFrame:
         """
         Fetches historical data from Database or Binance.
-        Implements incremental fetching.
+        Implements incremental fetching. With a shared cache the returned
+        frame may be shared across sessions and must be treated as read-only;
+        refresh=True skips the cached frame (an explicit fetch).
+        """
+        key = ('candles', symbol, interval, lookback_days)
+        if refresh and self.cache is not None:
+            self.cache.invalidate(key)
+        df = self._cached(key, CANDLE_CACHE_TTL, lambda: self._load_data(symbol, interval, lookback_days))
+        if self.cache is not None and (df is None or df.empty):
+            # Don't pin a failed fetch for a whole TTL
+            self.cache.invalidate(key)
+        return df
+
+    def _load_data(self, symbol, interval, lookback_days):
+        self.wait_until_ready()
+        # 0. Build coarse intervals from finer candles we already store
+        derived = self._derive_from_finer(symbol, interval, lookback_days)
+        if derived is not None:
+            return derived
+
+        return self._load_stored(symbol, interval, lookback_days)
+
+    def _rows_needed(self, interval, lookback_days):
+        return max(1000, lookback_days * 1440 // INTERVAL_MINUTES.get(interval, 60) + 1)
+
+    def _derive_from_finer(self, symbol, interval, lookback_days):
+        """
+        Resamples the lookback window from a finer stored interval when it
+        covers enough of it. The parts the finer data does not cover (the
+        head of the window and buckets with gaps) are fetched from the
+        exchange at the requested interval.
+        Returns None when no stored interval qualifies.
+        """
+        cutoff = datetime.utcnow() - timedelta(days=lookback_days)
+        for source in SOURCE_INTERVALS.get(interval, []):
+            first_ts = self.db.get_first_timestamp(symbol, source)
+            if self.archive is not None:
+                arch_ts, _ = self.archive.arrays(symbol, source)
+                if len(arch_ts):
+                    arch_first = pd.to_datetime(arch_ts.min(), unit='ms').to_pydatetime()
+                    first_ts = min(first_ts, arch_first) if first_ts else arch_first
+            if first_ts is None:
+                continue
+            # Same "enough" rule as the direct path
+            if (datetime.utcnow() - first_ts).days < lookback_days * 0.8:
+                continue
+
+            # Brings the finer series up to date (incremental fetch only)
+            df_src = self._load_stored(symbol, source, lookback_days)
+            derived = resample_ohlcv(df_src, source, interval)
+            # First whole candle in the window, like the cutoff filter of the direct path
+            window_start = pd.Timestamp(cutoff).ceil(interval_delta(interval))
+            derived = derived[derived.index >= window_start]
+            if derived.empty:
+                continue
+
+            # Head of the window and interior gaps, as inclusive bucket ranges
+            uncovered = [(first, last) for first, last in incomplete_ranges(df_src, source, interval)
+                         if last >= window_start]
+            if derived.index[0] > window_start:
+                uncovered.insert(0, (window_start, derived.index[0] - interval_delta(interval)))
+            filled = [self._fetch_range(symbol, interval, max(first, window_start), last)
+                      for first, last in uncovered] if self.client else []
+            filled = [part for part in filled if not part.empty]
+            if filled:
+                derived = pd.concat([derived] + filled).sort_index()
+            return derived
+        return None
+
+    def _fetch_range(self, symbol, interval, first, last):
+        """
+        Candles with open times in [first, last]: from the SQL store when it
+        has all of them (fetched by an earlier run), else from the exchange,
+        stored on the way.
+        """
+        stored = list(self.db.iter_ohlcv(symbol, interval, start=first.to_pydatetime(), end=last.to_pydatetime()))
+        if stored and sum(map(len, stored)) == (last - first) // interval_delta(interval) + 1:
+            return pd.concat(stored)
+        try:
+            klines = self._klines(
+                symbol, interval,
+                first.strftime("%d %b, %Y %H:%M:%S"),
+                (last + interval_delta(interval) - timedelta(seconds=1)).strftime("%d %b, %Y %H:%M:%S")
+            )
+            candles = self._process_candles(klines)
+            candles = candles[(candles.index >= first) & (candles.index <= last)]
+            if not candles.empty:
+                self._save(symbol, interval, candles)
+            return candles
+        except Exception as e:
+            print(f"Error fetching uncovered range: {e}")
+            return pd.DataFrame()
+
+    def _read_stored(self, symbol, interval, lookback_days):
         """
-        # 1. Check DB for existing data
-        df_db = self.db.get_ohlcv(symbol, interval)
-        last_ts = self.db.get_last_timestamp(symbol, interval)
+        Archive rows for the window plus newer SQL rows (the SQL store wins on
+        overlap). SQL rows from before the archive starts (e.g. bulk imports)
+        fill the head of the window, and SQL rows inside holes of the archive
+        (candles it never received) fill those.
+        """
+        limit = self._rows_needed(interval, lookback_days)
+        if self.archive is None:
+            return self.db.get_ohlcv(symbol, interval, limit=limit)
+
+        cutoff = datetime.utcnow() - timedelta(days=lookback_days)
+        df_arch = self.archive.read(symbol, interval, start=cutoff)
+        if df_arch.empty:
+            return self.db.get_ohlcv(symbol, interval, limit=limit)
+
+        # SQL rows before the archive's first candle
+        head = list(self.db.iter_ohlcv(symbol, interval, start=cutoff, end=df_arch.index[0].to_pydatetime()))
+        head = pd.concat(head) if head else df_arch.iloc[:0]
+        head = head[head.index < df_arch.index[0]]
+
+        # SQL rows inside holes of the archive; usually there are none
+        holes = []
+        if interval in INTERVAL_MINUTES:
+            step = interval_delta(interval)
+            for i in np.flatnonzero(np.diff(df_arch.index) > step):
+                holes += self.db.iter_ohlcv(symbol, interval, start=(df_arch.index[i] + step).to_pydatetime(),
+                                            end=(df_arch.index[i + 1] - step).to_pydatetime())
+
+        df_db = self.db.get_ohlcv(symbol, interval, limit=limit, start=df_arch.index[-1])
+        if not df_db.empty:
+            df_arch = df_arch[df_arch.index < df_db.index[0]]
+        df = pd.concat([part for part in (head, df_arch, *holes, df_db) if not part.empty])
+        return df.sort_index() if holes else df
+
+    def _save(self, symbol, interval, df, replace_from=None, fetched_at=None):
+        """
+        Stores candles in the SQL store (overwriting those from replace_from
+        on, see DatabaseManager.save_ohlcv) and appends the ones that had
+        closed when they were fetched (final values) to the archive. A candle
+        still forming at fetched_at is archived by the fetch that refetches
+        it from the last stored candle.
+        """
+        self.db.save_ohlcv(symbol, interval, df, replace_from=replace_from)
+        if self.archive is not None and interval in INTERVAL_MINUTES:
+            closed = df[df.index + interval_delta(interval) <= (fetched_at or datetime.utcnow())]
+            self.archive.append(symbol, interval, closed, only_newer=True)
+
+    def _load_stored(self, symbol, interval, lookback_days):
+        # 1. Check DB (and archive) for existing data
+        df_db = self._read_stored(symbol, interval, lookback_days)
+        last_ts = df_db.index[-1] if not df_db.empty else None
         
         start_str = f"{lookback_days} days ago UTC"
         
@@ -62,10 +257,11 @@ class BinanceLoader:
 
         if not has_enough:
             try:
-                klines = self.client.get_historical_klines(symbol, interval, start_str)
+                fetched_at = datetime.utcnow()
+                klines = self._klines(symbol, interval, start_str)
                 df = self._process_candles(klines)
                 if not df.empty:
-                    self.db.save_ohlcv(symbol, interval, df)
+                    self._save(symbol, interval, df, replace_from=last_ts, fetched_at=fetched_at)
                     return df
             except Exception as e:
                 print(f"Error fetching full data: {e}")
@@ -74,17 +270,19 @@ class BinanceLoader:
         # 3. If we have enough but it's old, do incremental update
         if last_ts and self.client:
             now = datetime.utcnow()
-            # If last candle is older than the interval, fetch more
-            fetch_start = last_ts + timedelta(minutes=1) 
-            
+            # From the last stored candle on: it may have been stored while
+            # still forming, and is overwritten with its final values
+            fetch_start = last_ts
+
             if (now - last_ts).total_seconds() > 60: # Simple freshness check
                 try:
-                    new_candles = self.client.get_historical_klines(symbol, interval, fetch_start.strftime("%d %b, %Y %H:%M:%S"))
+                    fetched_at = datetime.utcnow()
+                    new_candles = self._klines(symbol, interval, fetch_start.strftime("%d %b, %Y %H:%M:%S"))
                     if new_candles:
                         df_new = self._process_candles(new_candles)
-                        self.db.save_ohlcv(symbol, interval, df_new)
+                        self._save(symbol, interval, df_new, replace_from=last_ts, fetched_at=fetched_at)
                         # Refresh from DB
-                        df_db = self.db.get_ohlcv(symbol, interval, limit=2000)
+                        df_db = self._read_stored(symbol, interval, lookback_days)
                 except Exception as e:
                     print(f"Error fetching incremental data: {e}")
         
@@ -92,7 +290,8 @@ class BinanceLoader:
         cutoff = datetime.utcnow() - timedelta(days=lookback_days)
         return df_db[df_db.index >= cutoff]
 
-    def _process_candles(self, klines) -> pd.DataFrame:
+    @staticmethod
+    def _process_candles(klines) -> pd.DataFrame:
         df = pd.DataFrame(klines, columns=[
             'timestamp', 'open', 'high', 'low', 'close', 'volume',
             'close_time', 'quote_av', 'trades', 'tb_base_av', 'tb_quote_av', 'ignore'
@@ -105,56 +304,85 @@ class BinanceLoader:
         df[cols] = df[cols].astype(float)
         return df[cols]
 
-    def get_top_symbols(self, limit=10, quote_asset="USDT"):
+    def _metadata(self, name, fetch, ttl, refresh=False):
         """
-        Fetches top symbols by 24h quote volume.
+        Exchange metadata through the persisted stale-while-revalidate cache
+        when configured (never blocks once something is stored), else the
+        in-process TTL cache.
         """
+        if self.metadata is None:
+            if refresh and self.cache is not None:
+                self.cache.invalidate(name)
+            return self._cached(name, ttl, fetch)
+        if refresh:
+            return self.metadata.refresh(name, fetch)
         if not self.client:
-            return ["BTCUSDT", "ETHUSDT", "SOLUSDT", "BNBUSDT", "XRPUSDT"]
+            return self.metadata.peek(name, FALLBACK_SYMBOLS)
+        return self.metadata.get(name, fetch, ttl, default=FALLBACK_SYMBOLS)
+
+    def get_top_symbols(self, limit=10, quote_asset="USDT", refresh=False):
+        """
+        Fetches top symbols by 24h quote volume.
+        """
+        if not self.client and self.metadata is None:
+            return list(FALLBACK_SYMBOLS)
             
         try:
-            tickers = self.client.get_ticker()
-            # Filter for USDT pairs and exclude leveraged tokens (UP/DOWN)
-            usdt_pairs = [
-                t for t in tickers 
-                if t['symbol'].endswith(quote_asset) 
-                and "UP" not in t['symbol'] 
-                and "DOWN" not in t['symbol']
-            ]
-            
-            # Sort by volume (float)
-            usdt_pairs.sort(key=lambda x: float(x['quoteVolume']), reverse=True)
-            
-            return [t['symbol'] for t in usdt_pairs[:limit]]
+            ranked = self._metadata(f"top_symbols:{quote_asset}", lambda: self._fetch_top_symbols(quote_asset),
+                                    TICKER_CACHE_TTL, refresh=refresh and self.client is not None)
+            return list(ranked[:limit])
         except Exception as e:
             print(f"Error fetching top symbols: {e}")
-            return ["BTCUSDT", "ETHUSDT", "SOLUSDT", "BNBUSDT", "XRPUSDT"] # Fallback
+            return list(FALLBACK_SYMBOLS) # Fallback
+
+    def _fetch_top_symbols(self, quote_asset):
+        """All quote_asset pairs ranked by 24h quote volume (limit is applied on read)."""
+        tickers = self.client.get_ticker()
+        # Filter for USDT pairs and exclude leveraged tokens (UP/DOWN)
+        usdt_pairs = [
+            t for t in tickers 
+            if t['symbol'].endswith(quote_asset) 
+            and "UP" not in t['symbol'] 
+            and "DOWN" not in t['symbol']
+        ]
+        
+        # Sort by volume (float)
+        usdt_pairs.sort(key=lambda x: float(x['quoteVolume']), reverse=True)
+        
+        return [t['symbol'] for t in usdt_pairs]
 
     def get_all_symbols(self, quote_asset="USDT"):
         """
         Fetches all symbols ending with quote_asset.
         """
-        if not self.client:
-            return ["BTCUSDT", "ETHUSDT", "SOLUSDT", "BNBUSDT", "XRPUSDT"]
+        if not self.client and self.metadata is None:
+            return list(FALLBACK_SYMBOLS)
 
         try:
-            exchange_info = self.client.get_exchange_info()
-            symbols = [
-                s['symbol'] for s in exchange_info['symbols']
-                if s['symbol'].endswith(quote_asset)
-                and s['status'] == 'TRADING'
-                and "UP" not in s['symbol']
-                and "DOWN" not in s['symbol']
-            ]
-            symbols.sort()
-            return symbols
+            return list(self._metadata(f"all_symbols:{quote_asset}", lambda: self._fetch_all_symbols(quote_asset),
+                                       METADATA_CACHE_TTL))
         except Exception as e:
             print(f"Error fetching symbols: {e}")
-            return ["BTCUSDT", "ETHUSDT", "SOLUSDT", "BNBUSDT", "XRPUSDT"] # Fallback
+            return list(FALLBACK_SYMBOLS) # Fallback
 
+    def _fetch_all_symbols(self, quote_asset):
+        exchange_info = self.client.get_exchange_info()
+        symbols = [
+            s['symbol'] for s in exchange_info['symbols']
+            if s['symbol'].endswith(quote_asset)
+            and s['status'] == 'TRADING'
+            and "UP" not in s['symbol']
+            and "DOWN" not in s['symbol']
+        ]
+        symbols.sort()
+        return symbols
 
     def clear_cache(self):
         """
         Removes all OHLCV data from the database.
         """
+        if self.cache is not None:
+            self.cache.invalidate(prefix='candles')
+        if self.archive is not None:
+            self.archive.clear()
         return self.db.clear_ohlcv()
@@ -1,11 +1,14 @@
 import os
+import pickle
 import time
+import threading
 import pandas as pd
-from sqlalchemy import create_engine, Column, String, Float, Integer, DateTime, Text, JSON, Boolean, text
+from sqlalchemy import create_engine, Column, String, Float, Integer, DateTime, Text, JSON, Boolean, LargeBinary, MetaData, Table, text, insert, update, func, event, UniqueConstraint, Index, select, case, cast, and_, or_, delete, inspect
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, aliased
 from dotenv import load_dotenv
-from datetime import datetime
+from src.metrics import timed
+from datetime import datetime, timedelta
 
 load_dotenv()
 
@@ -19,6 +22,7 @@ class Symbol(Base):
 
 class OHLCV(Base):
     __tablename__ = 'ohlcv'
+    __table_args__ = (Index('ix_ohlcv_symbol_interval_ts', 'symbol', 'interval', 'timestamp'),)
     id = Column(Integer, primary_key=True)
     symbol = Column(String(20))
     timestamp = Column(DateTime)
@@ -36,6 +40,13 @@ class Setting(Base):
 
 class SignalLog(Base):
     __tablename__ = 'signal_logs'
+    __table_args__ = (
+        Index('ix_signal_logs_ts_id', 'timestamp', 'id'),  # keyset pagination
+        Index('ix_signal_logs_symbol_interval_ts', 'symbol', 'interval', 'timestamp'),
+        # One signal per candle and model: re-logging the same prediction is a no-op.
+        # Rows from before candle_time existed are NULL there and never collide.
+        Index('uq_signal_logs_candle', 'symbol', 'interval', 'candle_time', 'model_version', unique=True),
+    )
     id = Column(Integer, primary_key=True)
     timestamp = Column(DateTime, default=datetime.utcnow)
     symbol = Column(String(20))
@@ -43,19 +54,208 @@ class SignalLog(Base):
     confidence = Column(Float)
     price = Column(Float)
     interval = Column(String(10))
+    candle_time = Column(DateTime)  # open time of the candle the signal was predicted for
+    model_version = Column(String(20))  # SignalModel.version
 
-class PerformanceStat(Base):
-    __tablename__ = 'performance_stats'
+class SignalDaily(Base):
+    """Per-day rollup of signal_logs rows past retention, see rollup_signal_logs()."""
+    __tablename__ = 'signal_daily'
+    __table_args__ = (UniqueConstraint('day', 'symbol', 'interval', 'signal', name='uq_signal_daily'),)
     id = Column(Integer, primary_key=True)
+    day = Column(DateTime)  # midnight UTC
     symbol = Column(String(20))
-    total_trades = Column(Integer, default=0)
+    interval = Column(String(10))
+    signal = Column(String(10))
+    signals = Column(Integer, default=0)
+    confidence_sum = Column(Float, default=0.0)
+    min_price = Column(Float)
+    max_price = Column(Float)
+
+class SignalOutcomeDaily(Base):
+    """
+    Per-day realized outcomes of BUY/SELL signal_logs rows past retention,
+    per confidence decile and OUTCOME_HORIZONS horizon, see rollup_signal_logs().
+    """
+    __tablename__ = 'signal_outcome_daily'
+    __table_args__ = (UniqueConstraint('day', 'symbol', 'interval', 'bucket', 'horizon', name='uq_signal_outcome_daily'),)
+    id = Column(Integer, primary_key=True)
+    day = Column(DateTime)  # midnight UTC
+    symbol = Column(String(20))
+    interval = Column(String(10))
+    bucket = Column(Integer)  # confidence decile 0..9
+    horizon = Column(Integer)  # candles after the signal
+    signals = Column(Integer, default=0)
+    scored = Column(Integer, default=0)
+    hits = Column(Integer, default=0)
+    return_sum = Column(Float, default=0.0)  # sum of directional forward returns (fractions)
+
+class TradeLedger(Base):
+    """One closed paper trade, see log_trades(). Folded into trade_stats once."""
+    __tablename__ = 'trade_ledger'
+    __table_args__ = (
+        # A trade is booked once however often the same backtest is replayed;
+        # also finds a strategy's latest trade (see log_trades)
+        Index('uq_trade_ledger_trade', 'symbol', 'interval', 'strategy', 'entry_time', 'exit_time', unique=True),
+        Index('ix_trade_ledger_strategy_id', 'symbol', 'interval', 'strategy', 'id'),  # equity curve tail
+    )
+    id = Column(Integer, primary_key=True)
+    booked_at = Column(DateTime, default=datetime.utcnow)
+    symbol = Column(String(20))
+    interval = Column(String(10))
+    strategy = Column(String(40))  # Trader.strategy_key(): model version and risk settings
+    entry_time = Column(DateTime)
+    exit_time = Column(DateTime)
+    entry_price = Column(Float)
+    exit_price = Column(Float)
+    amount = Column(Float)
+    pnl = Column(Float)
+    profit_pct = Column(Float)
+    reason = Column(String(30))
+
+class TradeStat(Base):
+    """
+    Aggregates of one strategy's trade_ledger rows (symbol, interval,
+    strategy) up to last_ledger_id. A strategy's trades do not overlap (see
+    log_trades), so booking order is exit order. Only rows past
+    last_ledger_id are ever read to update it.
+    """
+    # Replaces the per-symbol trade_stats table; rebuilt from the ledger
+    __tablename__ = 'strategy_stats'
+    __table_args__ = (UniqueConstraint('symbol', 'interval', 'strategy', name='uq_strategy_stats'),)
+    id = Column(Integer, primary_key=True)
+    symbol = Column(String(20))
+    interval = Column(String(10))
+    strategy = Column(String(40))
+    trades = Column(Integer, default=0)
     wins = Column(Integer, default=0)
     losses = Column(Integer, default=0)
-    profit_loss = Column(Float, default=0.0)
-    win_rate = Column(Float, default=0.0)
+    gross_profit = Column(Float, default=0.0)
+    gross_loss = Column(Float, default=0.0)  # positive sum of losing P/L
+    equity = Column(Float, default=0.0)  # cumulative P/L
+    peak_equity = Column(Float, default=0.0)
+    max_drawdown = Column(Float, default=0.0)  # largest peak-to-trough fall of equity
+    last_ledger_id = Column(Integer, default=0)
+    updated_at = Column(DateTime)
+    # The watermark doubles as the row version: a concurrent writer that
+    # applied the same ledger rows first makes this flush fail, not double count
+    __mapper_args__ = {'version_id_col': last_ledger_id, 'version_id_generator': False}
+
+class ScanJob(Base):
+    """One headless scan of a (symbol, interval) for the candle closing at candle_close."""
+    __tablename__ = 'scan_jobs'
+    __table_args__ = (UniqueConstraint('symbol', 'interval', 'candle_close', name='uq_scan_job'),)
+    id = Column(Integer, primary_key=True)
+    symbol = Column(String(20))
+    interval = Column(String(10))
+    candle_close = Column(DateTime)
+    status = Column(String(10))  # queued, running, done, failed, timeout
+    signal = Column(String(10))
+    confidence = Column(Float)
+    price = Column(Float)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    lag_seconds = Column(Float)  # finished_at - candle_close
+    error = Column(Text)
+
+SQLITE_PATH = "trading_bot.db"
+
+# Seconds a MySQL connection attempt may take, and that sessions wait at
+# startup for the first background probe before using the SQLite fallback
+MYSQL_CONNECT_TIMEOUT = 3
+FIRST_PROBE_TIMEOUT = 5
+
+# Writes made on the SQLite fallback, replayed into MySQL on upgrade. Lives
+# only in the SQLite file (separate metadata, never created in MySQL), so it
+# survives a restart during an outage.
+OUTBOX = Table(
+    'fallback_outbox', MetaData(),
+    Column('id', Integer, primary_key=True),
+    Column('created_at', DateTime, default=datetime.utcnow),
+    Column('method', String(40)),
+    Column('payload', LargeBinary),  # pickled (args, kwargs)
+)
+
+# Raw signal logs older than this are rolled into signal_daily and deleted
+SIGNAL_RETENTION_DAYS = int(os.getenv("SIGNAL_RETENTION_DAYS", 90))
+# Rows per rollup transaction; small batches keep write locks short
+ROLLUP_BATCH = 5000
+# Forward horizons (candles) whose signal outcomes are kept past retention
+OUTCOME_HORIZONS = (1, 3, 6, 12, 24)
+# Ledger rows read per query when folding new trades into trade_stats
+LEDGER_BATCH = 10000
+
+# Applied to every SQLite connection; journal_mode is persistent, set by the writer
+SQLITE_PRAGMAS = {
+    "synchronous": "NORMAL",     # safe with WAL, avoids an fsync per commit
+    "cache_size": -64000,        # 64 MB page cache (negative = KiB)
+    "mmap_size": 268435456,      # 256 MB memory-mapped reads
+    "temp_store": "MEMORY",
+    "busy_timeout": 5000,        # ms to wait on a lock instead of failing
+}
+
+def _set_pragmas(pragmas):
+    def on_connect(dbapi_conn, connection_record):
+        cursor = dbapi_conn.cursor()
+        for key, value in pragmas.items():
+            cursor.execute(f"PRAGMA {key}={value}")
+        cursor.close()
+    return on_connect
+
+def add_missing_columns(engine):
+    """
+    Adds model columns that an existing table lacks (ALTER TABLE ... ADD
+    COLUMN). New columns are nullable and not backfilled.
+    """
+    with engine.begin() as conn:
+        inspector = inspect(conn)
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    quote = engine.dialect.identifier_preparer.quote
+                    conn.exec_driver_sql(
+                        f"ALTER TABLE {quote(table.name)} ADD COLUMN {quote(column.name)} "
+                        f"{column.type.compile(dialect=engine.dialect)}"
+                    )
+                    print(f"Migrated {table.name}: added column {column.name}")
+
+def create_schema(engine):
+    """
+    Creates missing tables, columns and indexes: create_all only builds
+    indexes together with a new table, so existing databases get them here.
+    """
+    Base.metadata.create_all(engine)
+    add_missing_columns(engine)
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
+
+def create_sqlite_engines(path):
+    """
+    Tuned SQLite engines for many concurrent readers and a single writer:
+    WAL journaling, one dedicated writer connection (writes queue in the pool
+    rather than racing for the file lock) and a pool of read-only connections.
+    Returns (writer_engine, reader_engine).
+    """
+    writer = create_engine(f"sqlite:///{path}", pool_size=1, max_overflow=0, pool_timeout=30)
+    event.listen(writer, "connect", _set_pragmas({"journal_mode": "WAL", **SQLITE_PRAGMAS}))
+    create_schema(writer)
+    OUTBOX.create(writer, checkfirst=True)
+
+    reader = create_engine(
+        f"sqlite:///file:{os.path.abspath(path)}?mode=ro&uri=true",
+        pool_size=8, max_overflow=8
+    )
+    event.listen(reader, "connect", _set_pragmas({**SQLITE_PRAGMAS, "query_only": 1}))
+    return writer, reader
 
 class DatabaseManager:
-    def __init__(self):
+    # Cap on writes kept in the fallback outbox (oldest dropped, with a warning)
+    MAX_FALLBACK_WRITES = 10000
+
+    def __init__(self, db_url=None, defer_probe=False):
         # Force reload .env to catch any changes
         load_dotenv(override=True)
         self.host = os.getenv("DB_HOST", "localhost")
@@ -65,57 +265,213 @@ class DatabaseManager:
         self.dbname = os.getenv("DB_NAME", "trading_bot")
         self.connection_type = "Pending"
         
-        if not self._try_mysql():
+        # Engine swaps happen under this lock; generation bumps on every swap
+        self._lock = threading.RLock()
+        self.generation = 0
+        self.fallback_active = False
+        self.outbox_engine = None  # SQLite writer holding the fallback outbox
+        self._pending_replay = 0
+        self._dropped_writes = 0
+        self._upgraded = False
+        self.monitor = None
+        # Set once the first MySQL probe finished (at once without defer_probe)
+        self._first_probe = threading.Event()
+        if not defer_probe:
+            self._first_probe.set()
+        self.db_url = db_url
+        
+        if db_url:
+            # Explicit database (tests, benchmarks, tooling): no MySQL probing
+            if db_url.startswith("sqlite:///") and ":memory:" not in db_url:
+                writer, reader = create_sqlite_engines(db_url[len("sqlite:///"):])
+                self._swap_engine(writer, "sqlite", read_engine=reader)
+                self._set_outbox(writer)
+            else:
+                engine = create_engine(db_url)
+                create_schema(engine)
+                self._swap_engine(engine, engine.dialect.name)
+        elif defer_probe:
+            # Construction doesn't block on MySQL: the health monitor probes it
+            # in the background and sessions wait for that first probe up to
+            # FIRST_PROBE_TIMEOUT, so a healthy MySQL is used from the start
+            self._fallback_to_sqlite()
+            self.start_health_monitor()
+        elif self._try_mysql():
+            # Writes left in the outbox by a run that ended during an outage
+            if os.path.exists(SQLITE_PATH):
+                self._set_outbox(create_sqlite_engines(SQLITE_PATH)[0])
+                self.replay_fallback_writes()
+        else:
             self._fallback_to_sqlite()
 
-    def _try_mysql(self):
+    def _swap_engine(self, engine, connection_type, read_engine=None):
+        """
+        Atomically points sessions at a new engine and disposes the old ones.
+        `engine` takes writes; reads use `read_engine` when given (SQLite).
+        """
+        read_engine = read_engine or engine
+        with self._lock:
+            old = {getattr(self, 'engine', None), getattr(self, 'read_engine', None)}
+            self.engine = engine
+            self.read_engine = read_engine
+            self.Session = sessionmaker(bind=read_engine)
+            self.WriteSession = sessionmaker(bind=engine)
+            self.connection_type = connection_type
+            self.generation += 1
+        for old_engine in old - {None, engine, read_engine}:
+            old_engine.dispose()
+
+    def _connect_mysql(self):
+        """Builds and verifies a MySQL engine (one attempt). Raises on failure."""
+        # 1. Ensure Database Exists
+        connect_args = {'connect_timeout': MYSQL_CONNECT_TIMEOUT}
+        temp_engine = create_engine(f"mysql+pymysql://{self.user}:{self.password}@{self.host}:{self.port}",
+                                    connect_args=connect_args)
+        try:
+            with temp_engine.connect() as conn:
+                conn.execute(text(f"CREATE DATABASE IF NOT EXISTS {self.dbname}"))
+                conn.commit()
+        finally:
+            temp_engine.dispose()
+
+        # 2. Main Connection
+        engine = create_engine(
+            f"mysql+pymysql://{self.user}:{self.password}@{self.host}:{self.port}/{self.dbname}",
+            pool_pre_ping=True,
+            pool_recycle=3600,
+            connect_args=connect_args
+        )
+        
+        # 3. Verify Connection & Init Tables
+        try:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            create_schema(engine)
+        except Exception:
+            engine.dispose()
+            raise
+        return engine
+
+    def _try_mysql(self, attempts=3):
         """Attempts to connect to MySQL with a short retry loop."""
-        for attempt in range(3):
+        for attempt in range(attempts):
             try:
-                # 1. Ensure Database Exists
-                temp_engine = create_engine(f"mysql+pymysql://{self.user}:{self.password}@{self.host}:{self.port}")
-                with temp_engine.connect() as conn:
-                    conn.execute(text(f"CREATE DATABASE IF NOT EXISTS {self.dbname}"))
-                    conn.commit()
-                temp_engine.dispose()
-
-                # 2. Main Connection
-                self.engine = create_engine(
-                    f"mysql+pymysql://{self.user}:{self.password}@{self.host}:{self.port}/{self.dbname}",
-                    pool_pre_ping=True,
-                    pool_recycle=3600
-                )
-                
-                # 3. Verify Connection & Init Tables
-                with self.engine.connect() as conn:
-                    conn.execute(text("SELECT 1"))
-                
-                Base.metadata.create_all(self.engine)
-                self.Session = sessionmaker(bind=self.engine)
-                self.connection_type = "MySQL"
-                return True
+                engine = self._connect_mysql()
             except Exception:
                 # Silence connection errors to avoid noise on Cloud fallback
-                pass
+                continue
+            self._swap_engine(engine, "MySQL")
+            self.fallback_active = False
+            return True
         return False
 
     def _fallback_to_sqlite(self):
         """Configures local SQLite fallback."""
-        self.engine = create_engine("sqlite:///trading_bot.db")
-        Base.metadata.create_all(self.engine)
-        self.Session = sessionmaker(bind=self.engine)
-        self.connection_type = "SQLite (Local)"
+        writer, reader = create_sqlite_engines(SQLITE_PATH)
+        self._swap_engine(writer, "SQLite (Local)", read_engine=reader)
+        self._set_outbox(writer)
+        self.fallback_active = True
         print("WARNING: Using local SQLite fallback (trading_bot.db)")
 
+    def _set_outbox(self, engine):
+        """Uses the SQLite file behind `engine` for the outbox; counts what is pending in it."""
+        self.outbox_engine = engine
+        with engine.connect() as conn:
+            self._pending_replay = conn.execute(select(func.count()).select_from(OUTBOX)).scalar()
+
+    def _record_fallback_write(self, method, *args, **kwargs):
+        """Adds a write made on the fallback to the outbox so it can be replayed into MySQL."""
+        if not self.fallback_active or self.outbox_engine is None:
+            return
+        payload = pickle.dumps((args, kwargs), protocol=pickle.HIGHEST_PROTOCOL)
+        with self.outbox_engine.begin() as conn:
+            conn.execute(OUTBOX.insert(), {'created_at': datetime.utcnow(), 'method': method, 'payload': payload})
+            self._pending_replay += 1
+            excess = self._pending_replay - self.MAX_FALLBACK_WRITES
+            if excess > 0:
+                oldest = select(OUTBOX.c.id).order_by(OUTBOX.c.id).offset(excess - 1).limit(1).scalar_subquery()
+                conn.execute(delete(OUTBOX).where(OUTBOX.c.id <= oldest))
+                self._pending_replay -= excess
+        if excess > 0:
+            # Once, then every 1000 drops: an outage this long is worth noticing, not spamming
+            if self._dropped_writes % 1000 == 0:
+                print(f"WARNING: fallback outbox is full ({self.MAX_FALLBACK_WRITES} writes), "
+                      f"dropping the oldest; they will not reach MySQL")
+            self._dropped_writes += excess
+
+    def replay_fallback_writes(self, batch_size=100):
+        """
+        Re-applies writes from the fallback outbox to the current (MySQL)
+        engine, in order, deleting each once applied. Stops at the first
+        failure and keeps the rest. Returns the number of writes replayed.
+        """
+        replayed = 0
+        while self.outbox_engine is not None and not self.fallback_active:
+            with self.outbox_engine.connect() as conn:
+                rows = conn.execute(select(OUTBOX.c.id, OUTBOX.c.method, OUTBOX.c.payload)
+                                    .order_by(OUTBOX.c.id).limit(batch_size)).all()
+            if not rows:
+                break
+            for outbox_id, method, payload in rows:
+                try:
+                    args, kwargs = pickle.loads(payload)
+                    getattr(self, method)(*args, **kwargs)
+                except Exception as e:
+                    print(f"Fallback replay stopped at {method}: {e}")
+                    return replayed
+                with self.outbox_engine.begin() as conn:
+                    conn.execute(delete(OUTBOX).where(OUTBOX.c.id == outbox_id))
+                self._pending_replay -= 1
+                replayed += 1
+        return replayed
+
+    def upgrade_to_mysql(self, attempts=1):
+        """Switches from the fallback to MySQL if reachable and replays fallback writes."""
+        if self.db_url or self.connection_type == "MySQL":
+            return False
+        if not self._try_mysql(attempts=attempts):
+            return False
+        # Sessions waiting for the first probe can go ahead (replay uses sessions too)
+        self._first_probe.set()
+        replayed = self.replay_fallback_writes()
+        self._upgraded = True
+        print(f"Connection upgraded to MySQL automatically! Replayed {replayed} fallback writes.")
+        return True
+
+    def start_health_monitor(self, **kwargs):
+        """Starts (once) the background MySQL health monitor. Returns it."""
+        with self._lock:
+            if self.monitor is None:
+                self.monitor = DatabaseHealthMonitor(self, **kwargs)
+                self.monitor.start()
+            return self.monitor
+
     def check_and_upgrade_connection(self):
-        """Checks if MySQL is now available and upgrades if currently on SQLite."""
-        if self.connection_type != "MySQL":
-            if self._try_mysql():
-                print("Connection upgraded to MySQL automatically!")
-                return True
+        """
+        Non-blocking: returns True once after the health monitor has upgraded
+        the connection to MySQL. Probing itself happens off the request path.
+        """
+        self.start_health_monitor()
+        if self._upgraded:
+            self._upgraded = False
+            return True
         return False
 
+    def health_state(self):
+        """Connection and monitor state for the UI."""
+        state = {
+            'connection': self.connection_type,
+            'generation': self.generation,
+            'pending_replay': self._pending_replay,
+            'dropped_writes': self._dropped_writes,
+        }
+        if self.monitor is not None:
+            state.update(self.monitor.state())
+        return state
+
     def get_session(self):
+        """Session for reads (pooled read-only connections on SQLite)."""
+        self._first_probe.wait(FIRST_PROBE_TIMEOUT)
         try:
             return self.Session()
         except Exception as e:
@@ -124,6 +480,16 @@ class DatabaseManager:
             self._try_mysql()
             return self.Session()
 
+    def get_write_session(self):
+        """Session for writes (the single dedicated writer connection on SQLite)."""
+        self._first_probe.wait(FIRST_PROBE_TIMEOUT)
+        try:
+            return self.WriteSession()
+        except Exception as e:
+            print(f"Error creating write session: {e}")
+            self._try_mysql()
+            return self.WriteSession()
+
     def get_engine_url(self):
         """Returns current engine URL (masked)."""
         url = str(self.engine.url)
@@ -139,7 +505,7 @@ class DatabaseManager:
         return url
 
     def update_watchlist(self, symbols_list):
-        session = self.get_session()
+        session = self.get_write_session()
         try:
             # Mark all as not in watchlist first
             session.query(Symbol).update({Symbol.is_watchlist: False})
@@ -151,6 +517,7 @@ class DatabaseManager:
                     new_sym = Symbol(symbol=sym, is_watchlist=True)
                     session.add(new_sym)
             session.commit()
+            self._record_fallback_write('update_watchlist', list(symbols_list))
         finally:
             session.close()
 
@@ -163,7 +530,7 @@ class DatabaseManager:
             session.close()
 
     def save_setting(self, key, value):
-        session = self.get_session()
+        session = self.get_write_session()
         try:
             setting = session.query(Setting).filter_by(key=key).first()
             if setting:
@@ -171,6 +538,7 @@ class DatabaseManager:
             else:
                 session.add(Setting(key=key, value=float(value)))
             session.commit()
+            self._record_fallback_write('save_setting', key, value)
         finally:
             session.close()
 
@@ -182,72 +550,219 @@ class DatabaseManager:
         finally:
             session.close()
 
-    def log_signal(self, symbol, signal, confidence, price, interval):
-        session = self.get_session()
+    def log_signal(self, symbol, signal, confidence, price, interval, timestamp=None,
+                   candle_time=None, model_version=None):
+        """
+        Logs one signal. With candle_time and model_version set, logging the
+        same (symbol, interval, candle, model) again is ignored.
+        """
+        self.log_signals([{
+            'timestamp': timestamp or datetime.utcnow(),
+            'symbol': symbol,
+            'signal': signal,
+            'confidence': confidence,
+            'price': price,
+            'interval': interval,
+            'candle_time': candle_time,
+            'model_version': model_version,
+        }])
+
+    def _insert_ignore(self, model):
+        """INSERT that skips rows colliding with a unique key (SQLite and MySQL)."""
+        return insert(model).prefix_with('OR IGNORE', dialect='sqlite').prefix_with('IGNORE', dialect='mysql')
+
+    def log_signals(self, rows):
+        """
+        Bulk-inserts signal dicts (SignalLog column names) in one transaction.
+        Signals already logged for the same candle and model are skipped.
+        """
+        if not rows:
+            return
+        # executemany needs the same keys in every row
+        rows = [{'candle_time': None, 'model_version': None, **row} for row in rows]
+        session = self.get_write_session()
         try:
-            log = SignalLog(symbol=symbol, signal=signal, confidence=confidence, price=price, interval=interval)
-            session.add(log)
+            session.execute(self._insert_ignore(SignalLog), rows)
             session.commit()
+            self._record_fallback_write('log_signals', rows)
         finally:
             session.close()
 
-    def update_performance(self, symbol, win, pnl):
-        session = self.get_session()
+    def log_trades(self, rows):
+        """
+        Books closed trades (TradeLedger column names) and folds the new ones
+        into strategy_stats in the same transaction. Only trades opened after
+        the last booked exit of their (symbol, interval, strategy) are booked,
+        so neither replaying a backtest nor rerunning it over a shifted
+        window counts a trade twice.
+        """
+        if not rows:
+            return
+        booked_at = datetime.utcnow()
+        rows = [{'booked_at': booked_at, 'strategy': '', 'entry_price': None, 'amount': None,
+                 'profit_pct': None, 'reason': None, **row} for row in rows]
+        session = self.get_write_session()
         try:
-            stat = session.query(PerformanceStat).filter_by(symbol=symbol).first()
-            if not stat:
-                stat = PerformanceStat(
-                    symbol=symbol, 
-                    total_trades=0, 
-                    wins=0, 
-                    losses=0, 
-                    profit_loss=0.0, 
-                    win_rate=0.0
-                )
-                session.add(stat)
-            
-            # Ensure no None values (null-safety)
-            if stat.total_trades is None: stat.total_trades = 0
-            if stat.wins is None: stat.wins = 0
-            if stat.losses is None: stat.losses = 0
-            if stat.profit_loss is None: stat.profit_loss = 0.0
-            
-            stat.total_trades += 1
-            if win:
-                stat.wins += 1
-            else:
-                stat.losses += 1
-            
-            stat.profit_loss += pnl
-            if stat.total_trades > 0:
-                stat.win_rate = (stat.wins / stat.total_trades) * 100
-            
+            # 1. Last booked exit per strategy: that of its latest entry, via the unique index.
+            #    Its stats row is locked first (MySQL), so writers of one strategy take turns
+            #    and its ledger ids are committed in order (see _apply_new_trades)
+            key = lambda row: (row['symbol'], row['interval'], row['strategy'])
+            last_exit = {}
+            for symbol, interval, strategy in {key(row) for row in rows}:
+                self._lock_trade_stat(session, symbol, interval, strategy)
+                last_exit[(symbol, interval, strategy)] = session.execute(
+                    select(TradeLedger.exit_time)
+                    .where(TradeLedger.symbol == symbol, TradeLedger.interval == interval,
+                           TradeLedger.strategy == strategy)
+                    .order_by(TradeLedger.entry_time.desc()).limit(1)
+                ).scalar()
+            # 2. Book only the trades opened after it, in order: a batch can hold several
+            #    runs of one strategy (INSERT IGNORE covers a concurrent writer's repeats)
+            booked = []
+            for row in rows:
+                if last_exit[key(row)] is None or row['entry_time'] > last_exit[key(row)]:
+                    booked.append(row)
+                    last_exit[key(row)] = row['exit_time']
+            rows = booked
+            if rows:
+                session.execute(self._insert_ignore(TradeLedger), rows)
+            self._apply_new_trades(session, {key(row) for row in rows})
+            session.commit()
+            self._record_fallback_write('log_trades', rows)
+        finally:
+            session.close()
+
+    def _lock_trade_stat(self, session, symbol, interval, strategy):
+        """
+        Locks a strategy's strategy_stats row (SELECT ... FOR UPDATE) and
+        creates it with zero totals on its first booking, so there is always
+        a row to lock. Two first bookings racing on InnoDB deadlock on the
+        insert; one is rolled back and retried by its caller, neither books.
+        """
+        where = (TradeStat.symbol == symbol, TradeStat.interval == interval, TradeStat.strategy == strategy)
+        if session.query(TradeStat.id).filter(*where).with_for_update().first() is None:
+            session.execute(self._insert_ignore(TradeStat), [{
+                'symbol': symbol, 'interval': interval, 'strategy': strategy, 'trades': 0, 'wins': 0, 'losses': 0,
+                'gross_profit': 0.0, 'gross_loss': 0.0, 'equity': 0.0, 'peak_equity': 0.0, 'max_drawdown': 0.0,
+                'last_ledger_id': 0,
+            }])
+            session.query(TradeStat.id).filter(*where).with_for_update().first()
+
+    def refresh_trade_stats(self):
+        """Folds ledger rows not aggregated yet into strategy_stats. Returns the rows applied."""
+        session = self.get_write_session()
+        try:
+            applied = self._apply_new_trades(session)
             session.commit()
+            return applied
         finally:
             session.close()
 
+    def _apply_new_trades(self, session, keys=None, batch_size=LEDGER_BATCH):
+        """
+        Updates each strategy's running totals, equity peak and drawdown from
+        its ledger rows past its own watermark, in id order
+        (ix_trade_ledger_strategy_id). keys limits the pass to those
+        (symbol, interval, strategy); None also finds strategies not
+        aggregated yet.
+        """
+        stats = {(s.symbol, s.interval, s.strategy): s for s in session.query(TradeStat)}
+        if keys is None:
+            keys = set(stats) | set(session.execute(
+                select(TradeLedger.symbol, TradeLedger.interval, TradeLedger.strategy).distinct()
+            ).all())
+        applied = 0
+        for symbol, interval, strategy in keys:
+            s = stats.get((symbol, interval, strategy))
+            while True:
+                rows = session.execute(
+                    select(TradeLedger.id, TradeLedger.pnl)
+                    .where(TradeLedger.symbol == symbol, TradeLedger.interval == interval,
+                           TradeLedger.strategy == strategy, TradeLedger.id > (s.last_ledger_id if s else 0))
+                    .order_by(TradeLedger.id).limit(batch_size)
+                ).all()
+                if not rows:
+                    break
+                if s is None:
+                    s = TradeStat(symbol=symbol, interval=interval, strategy=strategy, trades=0, wins=0, losses=0,
+                                  gross_profit=0.0, gross_loss=0.0, equity=0.0, peak_equity=0.0, max_drawdown=0.0,
+                                  last_ledger_id=0)
+                    session.add(s)
+                for ledger_id, pnl in rows:
+                    s.trades += 1
+                    if pnl > 0:
+                        s.wins += 1
+                        s.gross_profit += pnl
+                    else:
+                        s.losses += 1
+                        s.gross_loss -= pnl
+                    s.equity += pnl
+                    s.peak_equity = max(s.peak_equity, s.equity)
+                    s.max_drawdown = max(s.max_drawdown, s.peak_equity - s.equity)
+                s.last_ledger_id = rows[-1][0]
+                s.updated_at = datetime.utcnow()
+                applied += len(rows)
+        return applied
+
     def get_performance(self):
+        """Trade figures per (symbol, interval, strategy) from strategy_stats, no ledger scan."""
         session = self.get_session()
         try:
-            stats = session.query(PerformanceStat).all()
+            stats = session.query(TradeStat).filter(TradeStat.trades > 0).order_by(
+                TradeStat.symbol, TradeStat.interval, TradeStat.strategy).all()
             return pd.DataFrame([
                 {
                     'Symbol': s.symbol,
-                    'Trades': s.total_trades,
+                    'Interval': s.interval,
+                    'Strategy': s.strategy,
+                    'Trades': s.trades,
                     'Wins': s.wins,
                     'Losses': s.losses,
-                    'P/L ($)': round(s.profit_loss, 2),
-                    'Win Rate (%)': round(s.win_rate, 1)
+                    'P/L ($)': round(s.equity, 2),
+                    'Win Rate (%)': round(s.wins * 100.0 / s.trades, 1) if s.trades else 0.0,
+                    'Profit Factor': round(s.gross_profit / s.gross_loss, 2) if s.gross_loss else None,
+                    'Drawdown ($)': round(s.peak_equity - s.equity, 2),
+                    'Max Drawdown ($)': round(s.max_drawdown, 2),
                 } for s in stats
             ])
         finally:
             session.close()
 
-    def clear_performance(self):
+    def get_equity_curve(self, symbol, interval, strategy, limit=500):
+        """
+        Cumulative P/L after each of the last `limit` trades of a strategy,
+        indexed by exit time. Walked back from the stored equity, so only
+        those trades are read.
+        """
         session = self.get_session()
         try:
-            session.query(PerformanceStat).delete()
+            stat = session.query(TradeStat).filter(
+                TradeStat.symbol == symbol, TradeStat.interval == interval, TradeStat.strategy == strategy
+            ).first()
+            if stat is None:
+                return pd.Series(dtype=float)
+            rows = session.execute(
+                select(TradeLedger.exit_time, TradeLedger.pnl)
+                .where(TradeLedger.symbol == symbol, TradeLedger.interval == interval,
+                       TradeLedger.strategy == strategy, TradeLedger.id <= stat.last_ledger_id)
+                .order_by(TradeLedger.id.desc()).limit(limit)
+            ).all()
+        finally:
+            session.close()
+        times = [row[0] for row in reversed(rows)]
+        pnl = pd.Series([row[1] for row in reversed(rows)], dtype=float)
+        # Equity after trade i = final equity - P/L of the trades booked after it
+        later = pnl[::-1].cumsum()[::-1].shift(-1, fill_value=0.0)
+        return pd.Series((stat.equity - later).to_numpy(), index=pd.DatetimeIndex(times), name='equity')
+
+    def clear_performance(self):
+        """Deletes the trade ledger and its aggregates."""
+        session = self.get_write_session()
+        try:
+            session.query(TradeStat).delete()
+            session.query(TradeLedger).delete()
             session.commit()
+            self._record_fallback_write('clear_performance')
             return True
         except Exception:
             return False
@@ -261,59 +776,92 @@ class DatabaseManager:
             return {
                 "ohlcv": session.query(OHLCV).count(),
                 "signals": session.query(SignalLog).count(),
-                "performance": session.query(PerformanceStat).count(),
+                "signal_days": session.query(SignalDaily).count(),
+                "performance": session.query(TradeStat).count(),
+                "trades": session.query(TradeLedger).count(),
                 "symbols": session.query(Symbol).count()
             }
         except Exception:
-            return {"ohlcv": 0, "signals": 0, "performance": 0, "symbols": 0}
+            return {"ohlcv": 0, "signals": 0, "signal_days": 0, "performance": 0, "trades": 0, "symbols": 0}
         finally:
             session.close()
 
     def clear_ohlcv(self):
-        session = self.get_session()
+        session = self.get_write_session()
         try:
             session.query(OHLCV).delete()
             session.commit()
+            self._record_fallback_write('clear_ohlcv')
             return True
         except Exception:
             return False
         finally:
             session.close()
 
-    def save_ohlcv(self, symbol, interval, df):
-        session = self.get_session()
+    @timed('save_ohlcv')
+    def save_ohlcv(self, symbol, interval, df, journal=True, replace_from=None):
+        """
+        Inserts candles not stored yet: one range query for existing timestamps,
+        one bulk insert. Returns the number of rows inserted. Stored candles
+        from replace_from on are overwritten with df's values (the candle that
+        was still forming when it was stored). journal=False keeps the candles
+        out of the fallback outbox (bulk imports, which are re-run against
+        MySQL instead of replayed).
+        """
+        if df is None or df.empty:
+            return 0
+        session = self.get_write_session()
         try:
-            for timestamp, row in df.iterrows():
-                # Check if this candle already exists
-                existing = session.query(OHLCV).filter_by(
-                    symbol=symbol, 
-                    interval=interval, 
-                    timestamp=timestamp
-                ).first()
-                
-                if not existing:
-                    candle = OHLCV(
-                        symbol=symbol,
-                        interval=interval,
-                        timestamp=timestamp,
-                        open=row['open'],
-                        high=row['high'],
-                        low=row['low'],
-                        close=row['close'],
-                        volume=row['volume']
-                    )
-                    session.add(candle)
+            existing = {ts for (ts,) in session.query(OHLCV.timestamp).filter(
+                OHLCV.symbol == symbol,
+                OHLCV.interval == interval,
+                OHLCV.timestamp >= df.index.min(),
+                OHLCV.timestamp <= df.index.max()
+            )}
+            # Columns as plain Python floats in one pass each (no per-row float())
+            columns = [df[c].to_numpy(dtype=float).tolist() for c in ('open', 'high', 'low', 'close', 'volume')]
+            rows = [
+                {
+                    'symbol': symbol,
+                    'interval': interval,
+                    'timestamp': timestamp,
+                    'open': o,
+                    'high': h,
+                    'low': l,
+                    'close': c,
+                    'volume': v
+                } for timestamp, o, h, l, c, v in zip(df.index.to_pydatetime(), *columns)
+            ]
+            if replace_from is not None:
+                replace_from = pd.Timestamp(replace_from).to_pydatetime()
+                for row in rows:
+                    if row['timestamp'] in existing and row['timestamp'] >= replace_from:
+                        session.execute(update(OHLCV.__table__).where(
+                            OHLCV.symbol == symbol, OHLCV.interval == interval, OHLCV.timestamp == row['timestamp']
+                        ).values(open=row['open'], high=row['high'], low=row['low'], close=row['close'],
+                                 volume=row['volume']))
+            rows = [row for row in rows if row['timestamp'] not in existing]
+            if rows:
+                # Core insert into the table skips ORM bulk-save bookkeeping
+                session.execute(insert(OHLCV.__table__), rows)
             session.commit()
+            if journal:
+                self._record_fallback_write('save_ohlcv', symbol, interval, df, replace_from=replace_from)
+            return len(rows)
         finally:
             session.close()
 
-    def get_ohlcv(self, symbol, interval, limit=1000):
+    def get_ohlcv(self, symbol, interval, limit=1000, start=None):
+        """Most recent `limit` candles (None = all), optionally only from `start` on."""
         session = self.get_session()
         try:
-            candles = session.query(OHLCV).filter_by(
+            query = session.query(OHLCV).filter_by(
                 symbol=symbol, 
                 interval=interval
-            ).order_by(OHLCV.timestamp.desc()).limit(limit).all()
+            )
+            if start is not None:
+                query = query.filter(OHLCV.timestamp >= start)
+            candles = query.order_by(OHLCV.timestamp.desc()).limit(limit).all()
             
             if not candles:
                 return pd.DataFrame()
@@ -333,6 +881,45 @@ class DatabaseManager:
         finally:
             session.close()
 
+    def iter_ohlcv(self, symbol, interval, start=None, end=None, chunk_size=100000):
+        """
+        Yields candles oldest first as DataFrames of up to chunk_size rows.
+        Pages by timestamp (keyset), so memory stays flat however long the
+        history and each page is an index range scan.
+        """
+        last = None
+        while True:
+            stmt = select(OHLCV.timestamp, OHLCV.open, OHLCV.high, OHLCV.low, OHLCV.close, OHLCV.volume).where(
+                OHLCV.symbol == symbol, OHLCV.interval == interval)
+            if last is not None:
+                stmt = stmt.where(OHLCV.timestamp > last)
+            elif start is not None:
+                stmt = stmt.where(OHLCV.timestamp >= start)
+            if end is not None:
+                stmt = stmt.where(OHLCV.timestamp <= end)
+            session = self.get_session()
+            try:
+                rows = session.execute(stmt.order_by(OHLCV.timestamp).limit(chunk_size)).all()
+            finally:
+                session.close()
+            if not rows:
+                return
+            yield pd.DataFrame(rows, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume']).set_index('timestamp')
+            if len(rows) < chunk_size:
+                return
+            last = rows[-1].timestamp
+
+    def get_first_timestamp(self, symbol, interval):
+        session = self.get_session()
+        try:
+            first_candle = session.query(OHLCV).filter_by(
+                symbol=symbol, 
+                interval=interval
+            ).order_by(OHLCV.timestamp.asc()).first()
+            return first_candle.timestamp if first_candle else None
+        finally:
+            session.close()
+
     def get_last_timestamp(self, symbol, interval):
         session = self.get_session()
         try:
@@ -343,3 +930,421 @@ class DatabaseManager:
             return last_candle.timestamp if last_candle else None
         finally:
             session.close()
+
+    # --- realized signal outcomes ----------------------------------------------------
+
+    @staticmethod
+    def _forward_close(horizon):
+        """
+        Correlated scalar subquery: close of the horizon-th candle after each
+        signal's candle (after the time it was logged, for rows without
+        candle_time), resolved per row through ix_ohlcv_symbol_interval_ts.
+        """
+        candle = aliased(OHLCV)
+        return (
+            select(candle.close)
+            .where(candle.symbol == SignalLog.symbol,
+                   candle.interval == SignalLog.interval,
+                   candle.timestamp > func.coalesce(SignalLog.candle_time, SignalLog.timestamp))
+            .order_by(candle.timestamp)
+            .limit(1).offset(horizon - 1)
+            .correlate(SignalLog)
+            .scalar_subquery()
+        )
+
+    def _confidence_bucket(self):
+        """Confidence decile 0..9 (0.63 -> 6)."""
+        scaled = SignalLog.confidence * 10
+        # MySQL's CAST rounds, SQLite's truncates
+        bucket = func.floor(scaled) if self.engine.dialect.name == 'mysql' else cast(scaled, Integer)
+        return case((SignalLog.confidence >= 1, 9), else_=bucket)
+
+    def _scored_signals(self, horizon):
+        """
+        BUY/SELL signal rows with their confidence decile and directional
+        forward return after `horizon` candles (NULL while not available).
+        """
+        direction = case((SignalLog.signal == 'BUY', 1.0), else_=-1.0)
+        forward = self._forward_close(horizon)
+        return select(
+            SignalLog.timestamp,
+            SignalLog.symbol,
+            SignalLog.interval,
+            self._confidence_bucket().label('bucket'),
+            ((forward - SignalLog.price) / SignalLog.price * direction).label('ret'),
+        ).where(SignalLog.signal.in_(['BUY', 'SELL']))
+
+    def get_signal_outcomes(self, horizon=1, since=None, symbol=None):
+        """
+        Hit rate and mean directional forward return of BUY/SELL signals per
+        symbol, interval and confidence decile, aggregated in the database.
+        A BUY hits when the close `horizon` candles later is above the signal
+        price, a SELL when it is below; signals without that candle yet are
+        counted but not scored. Signals past retention come from
+        signal_outcome_daily (OUTCOME_HORIZONS only, whole days from `since`).
+        """
+        scored = self._scored_signals(horizon)
+        if since is not None:
+            scored = scored.where(SignalLog.timestamp >= since)
+        if symbol is not None:
+            scored = scored.where(SignalLog.symbol == symbol)
+        scored = scored.subquery()
+        live = select(
+            scored.c.symbol,
+            scored.c.interval,
+            scored.c.bucket,
+            func.count().label('signals'),
+            func.count(scored.c.ret).label('scored'),
+            func.sum(case((scored.c.ret > 0, 1), else_=0)).label('hits'),
+            func.sum(scored.c.ret).label('return_sum'),
+        ).group_by(scored.c.symbol, scored.c.interval, scored.c.bucket)
+
+        rolled = select(
+            SignalOutcomeDaily.symbol,
+            SignalOutcomeDaily.interval,
+            SignalOutcomeDaily.bucket,
+            func.sum(SignalOutcomeDaily.signals).label('signals'),
+            func.sum(SignalOutcomeDaily.scored).label('scored'),
+            func.sum(SignalOutcomeDaily.hits).label('hits'),
+            func.sum(SignalOutcomeDaily.return_sum).label('return_sum'),
+        ).where(SignalOutcomeDaily.horizon == horizon).group_by(
+            SignalOutcomeDaily.symbol, SignalOutcomeDaily.interval, SignalOutcomeDaily.bucket)
+        if since is not None:
+            rolled = rolled.where(SignalOutcomeDaily.day >= datetime(since.year, since.month, since.day))
+        if symbol is not None:
+            rolled = rolled.where(SignalOutcomeDaily.symbol == symbol)
+
+        session = self.get_session()
+        try:
+            rows = session.execute(live).all() + session.execute(rolled).all()
+        finally:
+            session.close()
+        if not rows:
+            return pd.DataFrame()
+
+        # A decile can have both raw and rolled-up signals: add them up
+        totals = pd.DataFrame([tuple(r) for r in rows],
+                              columns=['symbol', 'interval', 'bucket', 'signals', 'scored', 'hits', 'return_sum'])
+        totals['bucket'] = totals['bucket'].astype(int)
+        totals = totals.groupby(['symbol', 'interval', 'bucket'], as_index=False).sum(min_count=1)
+        totals = totals.sort_values(['symbol', 'interval', 'bucket'], ascending=[True, True, False])
+        return pd.DataFrame([
+            {
+                'Symbol': r.symbol,
+                'Interval': r.interval,
+                'Confidence': f"{r.bucket * 10}-{r.bucket * 10 + 10}%",
+                'Signals': int(r.signals),
+                'Scored': int(r.scored),
+                'Hit Rate (%)': round(r.hits * 100.0 / r.scored, 1) if r.scored else None,
+                'Avg Return (%)': round(r.return_sum / r.scored * 100, 3) if r.scored else None,
+            } for r in totals.itertuples()
+        ])
+
+    def get_signal_history(self, limit=20, cursor=None, symbol=None, interval=None, horizon=1):
+        """
+        One page of signals, newest first, with their realized forward return.
+        Keyset pagination: pass the returned cursor (timestamp, id) to get the
+        next older page; it is None on the last page. Each page is an index
+        range scan, however deep it is.
+        """
+        stmt = select(
+            SignalLog.id, SignalLog.timestamp, SignalLog.symbol, SignalLog.interval,
+            SignalLog.signal, SignalLog.price, SignalLog.confidence,
+            self._forward_close(horizon).label('future_close'),
+        )
+        if symbol is not None:
+            stmt = stmt.where(SignalLog.symbol == symbol)
+        if interval is not None:
+            stmt = stmt.where(SignalLog.interval == interval)
+        if cursor is not None:
+            ts, last_id = cursor
+            stmt = stmt.where(or_(SignalLog.timestamp < ts, and_(SignalLog.timestamp == ts, SignalLog.id < last_id)))
+        stmt = stmt.order_by(SignalLog.timestamp.desc(), SignalLog.id.desc()).limit(limit + 1)
+
+        session = self.get_session()
+        try:
+            rows = session.execute(stmt).all()
+        finally:
+            session.close()
+
+        next_cursor = (rows[limit - 1].timestamp, rows[limit - 1].id) if len(rows) > limit else None
+        return pd.DataFrame([
+            {
+                'Time': r.timestamp,
+                'Symbol': r.symbol,
+                'Interval': r.interval,
+                'Signal': r.signal,
+                'Price': r.price,
+                'Confidence (%)': round(r.confidence * 100, 1) if r.confidence is not None else None,
+                'Forward Return (%)': round((r.future_close - r.price) / r.price * 100, 3)
+                                      if r.future_close is not None and r.price else None,
+            } for r in rows[:limit]
+        ]), next_cursor
+
+    # --- signal retention (see src/maintenance.py) -----------------------------------
+
+    def rollup_signal_logs(self, retention_days=SIGNAL_RETENTION_DAYS, batch_size=ROLLUP_BATCH, pause=0.05, now=None):
+        """
+        Folds signal_logs rows older than retention_days into signal_daily
+        (counts) and signal_outcome_daily (realized outcomes) and deletes them, oldest first, batch_size rows per transaction with a short
+        pause in between so other writers are never locked out for long.
+        Returns the number of raw rows purged.
+        """
+        cutoff = (now or datetime.utcnow()) - timedelta(days=retention_days)
+        purged = 0
+        while True:
+            session = self.get_write_session()
+            try:
+                # 1. Oldest batch past retention (range scan on ix_signal_logs_ts_id)
+                rows = session.execute(
+                    select(SignalLog.id, SignalLog.timestamp, SignalLog.symbol, SignalLog.interval,
+                           SignalLog.signal, SignalLog.confidence, SignalLog.price)
+                    .where(SignalLog.timestamp < cutoff)
+                    .order_by(SignalLog.timestamp, SignalLog.id)
+                    .limit(batch_size)
+                ).all()
+                if not rows:
+                    break
+
+                # 2. Aggregate per (day, symbol, interval, signal)
+                groups = {}
+                for r in rows:
+                    key = (datetime(r.timestamp.year, r.timestamp.month, r.timestamp.day), r.symbol, r.interval, r.signal)
+                    n, conf, lo, hi = groups.get(key, (0, 0.0, None, None))
+                    if r.price is not None:
+                        lo = r.price if lo is None else min(lo, r.price)
+                        hi = r.price if hi is None else max(hi, r.price)
+                    groups[key] = (n + 1, conf + (r.confidence or 0.0), lo, hi)
+
+                # 2b. Realized outcomes of the batch's BUY/SELL rows, per decile and horizon
+                ids = [r.id for r in rows]
+                outcomes = {}
+                for horizon in OUTCOME_HORIZONS:
+                    for r in session.execute(self._scored_signals(horizon).where(SignalLog.id.in_(ids))):
+                        key = (datetime(r.timestamp.year, r.timestamp.month, r.timestamp.day),
+                               r.symbol, r.interval, int(r.bucket), horizon)
+                        n, scored, hits, total = outcomes.get(key, (0, 0, 0, 0.0))
+                        if r.ret is not None:
+                            scored, hits, total = scored + 1, hits + int(r.ret > 0), total + r.ret
+                        outcomes[key] = (n + 1, scored, hits, total)
+
+                # 3. Merge into existing day rows (a day can span batches), then purge
+                days = {key[0] for key in groups}
+                existing = {
+                    (d.day, d.symbol, d.interval, d.signal): d
+                    for d in session.query(SignalDaily).filter(SignalDaily.day.in_(days))
+                }
+                for key, (n, conf, lo, hi) in groups.items():
+                    daily = existing.get(key)
+                    if daily is None:
+                        day, symbol, interval, signal = key
+                        session.add(SignalDaily(day=day, symbol=symbol, interval=interval, signal=signal,
+                                                signals=n, confidence_sum=conf, min_price=lo, max_price=hi))
+                        continue
+                    daily.signals += n
+                    daily.confidence_sum += conf
+                    if lo is not None:
+                        daily.min_price = lo if daily.min_price is None else min(daily.min_price, lo)
+                        daily.max_price = hi if daily.max_price is None else max(daily.max_price, hi)
+                existing = {
+                    (d.day, d.symbol, d.interval, d.bucket, d.horizon): d
+                    for d in session.query(SignalOutcomeDaily).filter(SignalOutcomeDaily.day.in_(days))
+                }
+                for key, (n, scored, hits, total) in outcomes.items():
+                    daily = existing.get(key)
+                    if daily is None:
+                        day, symbol, interval, bucket, horizon = key
+                        session.add(SignalOutcomeDaily(day=day, symbol=symbol, interval=interval, bucket=bucket,
+                                                       horizon=horizon, signals=n, scored=scored, hits=hits,
+                                                       return_sum=total))
+                        continue
+                    daily.signals += n
+                    daily.scored += scored
+                    daily.hits += hits
+                    daily.return_sum += total
+                session.execute(delete(SignalLog).where(SignalLog.id.in_([r.id for r in rows])))
+                session.commit()
+                purged += len(rows)
+            finally:
+                session.close()
+            if len(rows) < batch_size:
+                break
+            time.sleep(pause)
+        return purged
+
+    def storage_bytes(self):
+        """
+        Bytes held by tables and indexes: live pages on SQLite (pages freed by
+        deletes are excluded until reused), data + index length on MySQL.
+        """
+        with self.engine.connect() as conn:
+            if self.engine.dialect.name == 'sqlite':
+                page_size = conn.exec_driver_sql("PRAGMA page_size").scalar()
+                pages = conn.exec_driver_sql("PRAGMA page_count").scalar()
+                free = conn.exec_driver_sql("PRAGMA freelist_count").scalar()
+                return (pages - free) * page_size
+            if self.engine.dialect.name == 'mysql':
+                return int(conn.execute(text(
+                    "SELECT COALESCE(SUM(data_length + index_length), 0) FROM information_schema.tables "
+                    "WHERE table_schema = DATABASE()"
+                )).scalar())
+        return None
+
+    def file_bytes(self):
+        """Size of the SQLite file plus its write-ahead log (None for server databases)."""
+        path = self.engine.url.database
+        if self.engine.dialect.name != 'sqlite' or not path:
+            return None
+        return sum(os.path.getsize(p) for p in (path, path + "-wal") if os.path.exists(p))
+
+    def compact(self):
+        """
+        Returns freed space to the OS: VACUUM on SQLite, OPTIMIZE TABLE on
+        MySQL. Both rewrite tables and block writers while they run.
+        """
+        with self.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            if self.engine.dialect.name == 'sqlite':
+                conn.exec_driver_sql("VACUUM")
+                # VACUUM goes through the WAL; fold it back and truncate the log
+                conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+            elif self.engine.dialect.name == 'mysql':
+                conn.exec_driver_sql(f"OPTIMIZE TABLE {SignalLog.__tablename__}")
+
+    # --- scan jobs (see src/scanner.py) ---------------------------------------------
+
+    def claim_scan_job(self, symbol, interval, candle_close):
+        """
+        Queues a scan of one candle close. Returns the job id, or None when
+        that close was already scanned successfully (restarts are idempotent).
+        Failed and timed out jobs are re-queued.
+        """
+        session = self.get_write_session()
+        try:
+            job = session.query(ScanJob).filter_by(symbol=symbol, interval=interval, candle_close=candle_close).first()
+            if job is not None and job.status == 'done':
+                return None
+            if job is None:
+                job = ScanJob(symbol=symbol, interval=interval, candle_close=candle_close)
+                session.add(job)
+            job.status = 'queued'
+            job.started_at = job.finished_at = job.lag_seconds = job.error = None
+            session.commit()
+            return job.id
+        finally:
+            session.close()
+
+    def start_scan_job(self, job_id):
+        self._update_scan_job(job_id, status='running', started_at=datetime.utcnow())
+
+    def finish_scan_job(self, job_id, status, signal=None, confidence=None, price=None, error=None):
+        """Records the outcome; a job that already timed out is left as is."""
+        session = self.get_write_session()
+        try:
+            job = session.get(ScanJob, job_id)
+            if job is None or job.status not in ('queued', 'running'):
+                return
+            job.finished_at = datetime.utcnow()
+            job.status = status
+            job.signal = signal
+            job.confidence = confidence
+            job.price = price
+            job.error = error
+            job.lag_seconds = (job.finished_at - job.candle_close).total_seconds()
+            session.commit()
+        finally:
+            session.close()
+
+    def _update_scan_job(self, job_id, **values):
+        session = self.get_write_session()
+        try:
+            session.query(ScanJob).filter_by(id=job_id).update(values)
+            session.commit()
+        finally:
+            session.close()
+
+    def get_latest_scan_jobs(self):
+        """The most recent scan job of every (symbol, interval)."""
+        session = self.get_session()
+        try:
+            latest = session.query(
+                ScanJob.symbol, ScanJob.interval, func.max(ScanJob.candle_close).label('candle_close')
+            ).group_by(ScanJob.symbol, ScanJob.interval).subquery()
+            return session.query(ScanJob).join(latest, (ScanJob.symbol == latest.c.symbol)
+                                                       & (ScanJob.interval == latest.c.interval)
+                                                       & (ScanJob.candle_close == latest.c.candle_close)).all()
+        finally:
+            session.close()
+
+
+class DatabaseHealthMonitor:
+    """
+    Background thread that probes MySQL with exponential backoff while the
+    manager is on the SQLite fallback, and checks the live MySQL connection
+    (falling back to SQLite if it drops) while it is not.
+    """
+    def __init__(self, db, base_delay=5.0, max_delay=300.0, healthy_interval=60.0):
+        self.db = db
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.healthy_interval = healthy_interval
+        self.failures = 0
+        self.last_probe = None
+        self.last_error = None
+        self.next_probe_at = time.monotonic()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="db-health-monitor", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        self._thread.join(timeout)
+
+    def _delay(self):
+        if self.failures == 0:
+            return self.healthy_interval
+        return min(self.max_delay, self.base_delay * (2 ** (self.failures - 1)))
+
+    def probe(self):
+        """Runs one health check / upgrade attempt. Returns True when on MySQL afterwards."""
+        self.last_probe = datetime.utcnow()
+        try:
+            if self.db.connection_type == "MySQL":
+                with self.db.engine.connect() as conn:
+                    conn.execute(text("SELECT 1"))
+                healthy = True
+            else:
+                healthy = self.db.upgrade_to_mysql(attempts=1)
+                if not healthy:
+                    self.last_error = "MySQL unreachable"
+        except Exception as e:
+            self.last_error = str(e)
+            healthy = False
+            if self.db.connection_type == "MySQL" and not self.db.db_url:
+                print(f"MySQL health check failed, switching to SQLite fallback: {e}")
+                self.db._fallback_to_sqlite()
+
+        self.failures = 0 if healthy else self.failures + 1
+        if healthy:
+            self.last_error = None
+        self.next_probe_at = time.monotonic() + self._delay()
+        self.db._first_probe.set()
+        return healthy
+
+    def _run(self):
+        while not self._stop.is_set():
+            wait = self.next_probe_at - time.monotonic()
+            if wait > 0:
+                self._stop.wait(wait)
+                continue
+            self.probe()
+
+    def state(self):
+        return {
+            'monitor_running': self._thread.is_alive(),
+            'failures': self.failures,
+            'last_probe': self.last_probe,
+            'last_error': self.last_error,
+            'next_probe_in': max(0.0, self.next_probe_at - time.monotonic()),
+        }
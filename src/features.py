@@ -1,37 +1,53 @@
 import pandas as pd
-import ta
 import numpy as np
+from src.metrics import timed
+
+# Columns added by add_technical_indicators, in order
+INDICATOR_COLUMNS = [
+    'rsi', 'macd', 'macd_signal', 'macd_diff',
+    'bb_high', 'bb_low', 'sma_20', 'ema_50', 'volume_change'
+]
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+# Optional columns added by add_market_features
+MARKET_COLUMNS = ['corr_btc', 'beta_btc']
 
 class FeatureEngineer:
     def __init__(self):
         pass
 
-    def add_technical_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
-        """
-        Adds RSI, MACD, Bollinger Bands, etc.
-        """
-        df = df.copy()
-        
+    def _indicators(self, df: pd.DataFrame):
+        """Yields (column, series) for every indicator, in INDICATOR_COLUMNS order."""
+        import ta  # imported on first use to keep app startup fast
+
         # RSI
-        df['rsi'] = ta.momentum.RSIIndicator(close=df['close'], window=14).rsi()
+        yield 'rsi', ta.momentum.RSIIndicator(close=df['close'], window=14).rsi()
         
         # MACD
         macd = ta.trend.MACD(close=df['close'])
-        df['macd'] = macd.macd()
-        df['macd_signal'] = macd.macd_signal()
-        df['macd_diff'] = macd.macd_diff()
+        yield 'macd', macd.macd()
+        yield 'macd_signal', macd.macd_signal()
+        yield 'macd_diff', macd.macd_diff()
         
         # Bollinger Bands
         bb = ta.volatility.BollingerBands(close=df['close'], window=20, window_dev=2)
-        df['bb_high'] = bb.bollinger_hband()
-        df['bb_low'] = bb.bollinger_lband()
+        yield 'bb_high', bb.bollinger_hband()
+        yield 'bb_low', bb.bollinger_lband()
         
         # SMA / EMA
-        df['sma_20'] = ta.trend.SMAIndicator(close=df['close'], window=20).sma_indicator()
-        df['ema_50'] = ta.trend.EMAIndicator(close=df['close'], window=50).ema_indicator()
+        yield 'sma_20', ta.trend.SMAIndicator(close=df['close'], window=20).sma_indicator()
+        yield 'ema_50', ta.trend.EMAIndicator(close=df['close'], window=50).ema_indicator()
         
         # Volume Change
-        df['volume_change'] = df['volume'].pct_change()
+        yield 'volume_change', df['volume'].pct_change()
+
+    @timed('add_technical_indicators')
+    def add_technical_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Adds RSI, MACD, Bollinger Bands, etc.
+        """
+        df = df.copy()
+        for name, values in self._indicators(df):
+            df[name] = values
 
         # Handle Infinity and extremely large values
         df.replace([np.inf, -np.inf], 0, inplace=True)
@@ -40,6 +56,39 @@ class FeatureEngineer:
 
         return df
 
+    def add_market_features(self, df: pd.DataFrame, benchmark_df: pd.DataFrame, window=None) -> pd.DataFrame:
+        """
+        Adds rolling correlation and beta to the benchmark (BTC) candles.
+        """
+        from src.correlation import add_market_features, CORRELATION_WINDOW
+        return add_market_features(df.copy(), benchmark_df, window or CORRELATION_WINDOW)
+
+    def compact_features(self, df: pd.DataFrame, threshold=0.005, horizon=1):
+        """
+        Opt-in compact equivalent of add_technical_indicators + create_labels +
+        dropna: indicators are written one at a time into a single float32
+        buffer (no intermediate float64 frame copies) and targets are int8.
+        Returns a CompactFrame (see src/compact.py).
+        """
+        from src.compact import CompactFrame
+
+        columns = INDICATOR_COLUMNS + OHLCV_COLUMNS
+        n = len(df)
+        buffer = np.empty((n, len(columns)), dtype=np.float32, order='F')
+        for j, (name, values) in enumerate(self._indicators(df)):
+            buffer[:, j] = values.to_numpy()
+        for j, name in enumerate(OHLCV_COLUMNS, start=len(INDICATOR_COLUMNS)):
+            buffer[:, j] = df[name].to_numpy()
+        # Same hardening as add_technical_indicators, in place
+        np.nan_to_num(buffer, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
+
+        # Labels from float64 closes; the last `horizon` rows have no future (dropna)
+        close = df['close'].to_numpy(dtype=float)
+        returns = (close[horizon:] - close[:-horizon]) / close[:-horizon]
+        target = (returns > threshold).astype(np.int8) - (returns < -threshold).astype(np.int8)
+
+        return CompactFrame(df.index[:n - horizon], columns, buffer, n_rows=n - horizon, target=target)
+
     def create_labels(self, df: pd.DataFrame, horizon=1, threshold=0.005):
         """
         Create target labels for training.
@@ -59,3 +108,52 @@ class FeatureEngineer:
         
         df['target'] = np.select(conditions, choices, default=0)
         return df
+
+    @staticmethod
+    def return_column(horizon):
+        return f"return_h{horizon}"
+
+    @staticmethod
+    def target_column(horizon, threshold):
+        # Thresholds are fractions (0.005 = 0.5%), named in basis points
+        return f"target_h{horizon}_t{int(round(threshold * 10000))}"
+
+    def create_multi_horizon_labels(self, df: pd.DataFrame, horizons=(1,), thresholds=(0.005,)):
+        """
+        Multi-horizon version of create_labels computed in a single pass.
+        Builds one (rows x horizons) matrix of shifted closes and derives every
+        forward return and every (horizon, threshold) target from it.
+        Adds 'return_h{h}' and 'target_h{h}_t{bps}' columns (see target_column).
+        """
+        horizons = sorted(set(int(h) for h in horizons))
+        thresholds = np.asarray(sorted(set(thresholds)), dtype=float)
+        if not horizons or any(h < 1 for h in horizons):
+            raise ValueError("Horizons must be positive integers.")
+
+        close = df['close'].to_numpy(dtype=float)
+        n = len(close)
+        steps = np.asarray(horizons)
+
+        # Shared array of shifted closes: future[i, j] = close[i + horizons[j]]
+        idx = np.arange(n)[:, None] + steps[None, :]
+        valid = idx < n
+        future = np.full((n, len(steps)), np.nan)
+        future[valid] = close[idx[valid]]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            returns = (future - close[:, None]) / close[:, None]
+
+        # Broadcast to (rows x horizons x thresholds); NaN returns compare False -> Hold
+        up = returns[:, :, None] > thresholds[None, None, :]
+        down = returns[:, :, None] < -thresholds[None, None, :]
+        targets = up.astype(np.int8) - down.astype(np.int8)
+
+        columns = {}
+        for j, h in enumerate(horizons):
+            columns[self.return_column(h)] = returns[:, j]
+            for k, thr in enumerate(thresholds):
+                columns[self.target_column(h, thr)] = targets[:, j, k]
+
+        new_cols = pd.DataFrame(columns, index=df.index)
+        df = df.drop(columns=[c for c in new_cols.columns if c in df.columns])
+        return pd.concat([df, new_cols], axis=1)
@@ -0,0 +1,70 @@
+"""
+Database maintenance: signal log retention and space reporting.
+
+    python -m src.maintenance                    # roll up logs older than SIGNAL_RETENTION_DAYS
+    python -m src.maintenance --retention-days 30 --vacuum
+"""
+import time
+from src.database import SIGNAL_RETENTION_DAYS, ROLLUP_BATCH
+
+def run_maintenance(db, retention_days=SIGNAL_RETENTION_DAYS, batch_size=ROLLUP_BATCH, vacuum=False, now=None):
+    """
+    Rolls old signal logs into daily summaries and optionally compacts the
+    database. Returns a report dict with rows purged and bytes reclaimed.
+    """
+    # 1. Measure, 2. roll up and purge in batches, 3. compact, 4. measure again
+    before_stats = db.get_stats()
+    used_before, file_before = db.storage_bytes(), db.file_bytes()
+
+    start = time.perf_counter()
+    purged = db.rollup_signal_logs(retention_days=retention_days, batch_size=batch_size, now=now)
+    if vacuum:
+        db.compact()
+    elapsed = time.perf_counter() - start
+
+    after_stats = db.get_stats()
+    used_after, file_after = db.storage_bytes(), db.file_bytes()
+    return {
+        'rows_purged': purged,
+        'signals_before': before_stats['signals'],
+        'signals_after': after_stats['signals'],
+        'summary_rows': after_stats['signal_days'],
+        'used_bytes_before': used_before,
+        'used_bytes_after': used_after,
+        'reclaimed_bytes': used_before - used_after if used_before is not None and used_after is not None else None,
+        'file_bytes_before': file_before,
+        'file_bytes_after': file_after,
+        'seconds': round(elapsed, 3),
+    }
+
+def format_report(report):
+    def size(n):
+        return "n/a" if n is None else f"{n / 1024:,.1f} KiB"
+    lines = [
+        f"Signal logs: {report['signals_before']:,} -> {report['signals_after']:,} "
+        f"({report['rows_purged']:,} rolled into {report['summary_rows']:,} daily rows) in {report['seconds']} s",
+        f"Used space:  {size(report['used_bytes_before'])} -> {size(report['used_bytes_after'])} "
+        f"(reclaimed {size(report['reclaimed_bytes'])})",
+    ]
+    if report['file_bytes_before'] is not None:
+        lines.append(f"File size:   {size(report['file_bytes_before'])} -> {size(report['file_bytes_after'])}"
+                     + ("" if report['file_bytes_after'] < report['file_bytes_before'] else
+                        "  (freed pages are reused; --vacuum shrinks the file)"))
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import argparse
+    from src.database import DatabaseManager
+
+    parser = argparse.ArgumentParser(description="Signal log retention and space reporting")
+    parser.add_argument("--retention-days", type=int, default=SIGNAL_RETENTION_DAYS,
+                        help="raw signal logs older than this are rolled into daily summaries")
+    parser.add_argument("--batch-size", type=int, default=ROLLUP_BATCH, help="rows per purge transaction")
+    parser.add_argument("--vacuum", action="store_true",
+                        help="return freed space to the OS (VACUUM / OPTIMIZE TABLE; blocks writers while it runs)")
+    parser.add_argument("--db-url", help="database URL (default: MySQL from .env, SQLite fallback)")
+    args = parser.parse_args()
+
+    db = DatabaseManager(db_url=args.db_url)
+    print(format_report(run_maintenance(db, args.retention_days, args.batch_size, args.vacuum)))
@@ -0,0 +1,160 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from src.features import FeatureEngineer
+from src.model import SignalModel
+
+# Price-level indicators are divided by close so one model fits every symbol
+LEVEL_FEATURES = ['bb_high', 'bb_low', 'sma_20', 'ema_50']
+MACD_FEATURES = ['macd', 'macd_signal', 'macd_diff']
+POOLED_FEATURES = ['rsi'] + [f"{c}_rel" for c in MACD_FEATURES + LEVEL_FEATURES] + ['volume_change']
+
+# Leading rows whose indicators are still warming up (ema_50) are not trained on
+WARMUP_ROWS = 50
+# Most recent labeled rows per symbol in the pooled training set
+TRAIN_ROWS_PER_SYMBOL = 200
+
+CLASS_MAP = {0: 'SELL', 1: 'HOLD', 2: 'BUY'}
+
+# Pool workers are spawned, not forked: inside the Streamlit server a fork
+# would copy locks held by its threads (Tornado, write-behind, DB health
+# monitor, connection pools) into children that then deadlock on them
+POOL_CONTEXT = multiprocessing.get_context("spawn")
+
+def relative_features(df):
+    """Adds the scale-free POOLED_FEATURES columns to an indicator frame."""
+    for col in MACD_FEATURES:
+        df[f"{col}_rel"] = df[col] / df['close']
+    for col in LEVEL_FEATURES:
+        df[f"{col}_rel"] = df[col] / df['close'] - 1
+    return df
+
+def featurize(symbol, raw, threshold, train_rows=TRAIN_ROWS_PER_SYMBOL):
+    """
+    (training rows, latest feature row) for one symbol. The latest row is the
+    newest candle, which has no label yet.
+    """
+    fe = FeatureEngineer()
+    df = relative_features(fe.add_technical_indicators(raw))
+    labeled = fe.create_labels(df.copy(), threshold=threshold).dropna()
+    labeled = labeled.iloc[WARMUP_ROWS:].tail(train_rows)
+    return labeled[POOLED_FEATURES + ['target', 'return']], df[POOLED_FEATURES + ['close']].iloc[-1]
+
+def _featurize_batch(batch, threshold):
+    # Runs in worker processes: one task per batch keeps pickling overhead low
+    out = []
+    for symbol, raw in batch:
+        try:
+            out.append((symbol, featurize(symbol, raw, threshold)))
+        except Exception as e:
+            out.append((symbol, e))
+    return out
+
+
+class MarketScanner:
+    """
+    Scores every USDT pair with one pooled model: candles are fetched on a
+    thread pool, indicators are computed in batches across processes, a
+    single SignalModel is trained on scale-free features from all symbols,
+    and the latest candle of every symbol is scored in one predict_proba
+    call. Results are ranked by confidence and expected return.
+    """
+    def __init__(self, loader, fetch_workers=16, processes=None):
+        self.loader = loader
+        self.fetch_workers = fetch_workers
+        self.processes = processes if processes is not None else (os.cpu_count() or 1)
+        self.timings = {}
+        self.failed = {}
+        self.accuracy = None
+
+    def scan(self, interval='1h', lookback=30, threshold=0.005, symbols=None, progress=None):
+        """
+        Returns a ranked DataFrame: actionable signals first, then by
+        confidence and the size of the expected return.
+        progress(fraction, text) is called between stages if given.
+        """
+        self.timings, self.failed = {}, {}
+        report = progress or (lambda fraction, text: None)
+        symbols = list(symbols or self.loader.get_all_symbols())
+
+        # 1. Fetch candles in parallel (I/O bound)
+        start = time.perf_counter()
+        report(0.0, f"Fetching {len(symbols)} symbols...")
+        with ThreadPoolExecutor(max_workers=self.fetch_workers) as pool:
+            raws = list(pool.map(lambda s: self._fetch(s, interval, lookback), symbols))
+        candles = [(s, raw) for s, raw in zip(symbols, raws) if raw is not None]
+        self.timings['fetch'] = time.perf_counter() - start
+
+        # 2. Indicators per symbol (CPU bound)
+        start = time.perf_counter()
+        report(0.4, f"Computing features for {len(candles)} symbols...")
+        features = self._featurize_all(candles, threshold)
+        self.timings['features'] = time.perf_counter() - start
+        if not features:
+            return pd.DataFrame()
+
+        # 3. One pooled model, trained chronologically across symbols
+        start = time.perf_counter()
+        report(0.7, "Training pooled model...")
+        train = pd.concat([rows for rows, _ in features.values()]).sort_index(kind='stable')
+        model = SignalModel(threshold=threshold)
+        model.feature_cols = POOLED_FEATURES
+        model.model_path = None
+        self.accuracy = model.train(train)
+        if self.accuracy is None:
+            raise ValueError("Not enough data to train the market model.")
+        self.timings['train'] = time.perf_counter() - start
+
+        # 4. Batched inference: the newest candle of every symbol in one call
+        start = time.perf_counter()
+        report(0.9, "Scoring...")
+        latest = pd.DataFrame([row for _, row in features.values()], index=list(features))
+        probs = model.model.predict_proba(model.clean_features(latest[POOLED_FEATURES]))
+        classes = model.model.classes_
+        # Expected return: class probabilities times the mean realized return of each class
+        class_returns = train.groupby(train['target'] + 1)['return'].mean().reindex(classes).fillna(0).to_numpy()
+        expected = probs @ class_returns
+        self.timings['predict'] = time.perf_counter() - start
+        report(1.0, "Done")
+
+        ranked = pd.DataFrame({
+            'Symbol': latest.index,
+            'Signal': [CLASS_MAP[c] for c in classes[probs.argmax(axis=1)]],
+            'Confidence (%)': np.round(probs.max(axis=1) * 100, 1),
+            'Expected Return (%)': np.round(expected * 100, 3),
+            'Price': latest['close'].to_numpy(),
+        })
+        order = np.lexsort((-np.abs(expected), -probs.max(axis=1), ranked['Signal'] == 'HOLD'))
+        return ranked.iloc[order].reset_index(drop=True)
+
+    def _fetch(self, symbol, interval, lookback):
+        try:
+            df = self.loader.get_data(symbol, interval, lookback)
+            if df is None or len(df) < WARMUP_ROWS + 2:
+                self.failed[symbol] = "Not enough candles"
+                return None
+            return df
+        except Exception as e:
+            self.failed[symbol] = str(e)
+            return None
+
+    def _featurize_all(self, candles, threshold):
+        if self.processes > 1 and len(candles) > 1:
+            size = max(1, len(candles) // (self.processes * 4))
+            batches = [candles[i:i + size] for i in range(0, len(candles), size)]
+            with ProcessPoolExecutor(max_workers=self.processes, mp_context=POOL_CONTEXT) as pool:
+                results = [item for batch in pool.map(_featurize_batch, batches, [threshold] * len(batches))
+                           for item in batch]
+        else:
+            results = _featurize_batch(candles, threshold)
+
+        features = {}
+        for symbol, result in results:
+            if isinstance(result, Exception):
+                self.failed[symbol] = str(result)
+            elif len(result[0]):
+                features[symbol] = result
+        return features
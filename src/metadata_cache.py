@@ -0,0 +1,97 @@
+import json
+import os
+import threading
+import time
+
+class MetadataCache:
+    """
+    Exchange metadata (symbol lists, volume rankings) persisted to a local
+    JSON file with fetch timestamps, shared by every session in the process
+    and across restarts. Stale entries are served immediately while a
+    background thread refreshes them (stale-while-revalidate).
+    """
+    def __init__(self, path="data/exchange_metadata.json"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._entries = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        # Called with the lock held
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self._entries, f)
+        os.replace(tmp, self.path)
+
+    def age(self, name):
+        """Seconds since the entry was fetched, or None if missing."""
+        with self._lock:
+            entry = self._entries.get(name)
+        return time.time() - entry['fetched_at'] if entry else None
+
+    def peek(self, name, default=None):
+        """Stored value regardless of age, without triggering a fetch."""
+        with self._lock:
+            entry = self._entries.get(name)
+        return entry['value'] if entry else default
+
+    def get(self, name, fetch, ttl, default=None):
+        """
+        Returns the cached value for `name`. Fresh: returned as is. Stale:
+        returned as is and refreshed in the background. Missing: fetched
+        synchronously, or, when `default` is given, `default` is returned and
+        the fetch runs in the background so the caller never waits.
+        """
+        with self._lock:
+            entry = self._entries.get(name)
+
+        if entry is None:
+            if default is not None:
+                self.refresh_async(name, fetch)
+                return default
+            return self.refresh(name, fetch)
+
+        if time.time() - entry['fetched_at'] > ttl:
+            self.refresh_async(name, fetch)
+        return entry['value']
+
+    def is_refreshing(self, name):
+        with self._lock:
+            return name in self._refreshing
+
+    def refresh(self, name, fetch):
+        """Fetches synchronously, stores and returns the new value."""
+        value = fetch()
+        with self._lock:
+            self._entries[name] = {'fetched_at': time.time(), 'value': value}
+            try:
+                self._save()
+            except OSError as e:
+                print(f"Could not persist metadata cache: {e}")
+        return value
+
+    def refresh_async(self, name, fetch):
+        """Starts a background refresh unless one is already running for `name`."""
+        with self._lock:
+            if name in self._refreshing:
+                return
+            self._refreshing.add(name)
+
+        def run():
+            try:
+                self.refresh(name, fetch)
+            except Exception as e:
+                print(f"Background refresh of {name} failed: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(name)
+
+        threading.Thread(target=run, name=f"refresh-{name}", daemon=True).start()
@@ -0,0 +1,201 @@
+import contextlib
+import functools
+import io
+import os
+import threading
+import time
+from collections import deque
+import numpy as np
+
+# Durations kept per stage for the recent p50/p95
+RECENT_SPANS = 500
+PREFIX = "trading_bot"
+
+class Metrics:
+    """
+    In-process span timers and counters. Each span name keeps its call count,
+    total seconds, total rows and the last RECENT_SPANS durations. When
+    disabled, instrumented calls cost one attribute check.
+    """
+    def __init__(self, enabled=True, export_path=None):
+        self.enabled = enabled
+        self.export_path = export_path
+        self._lock = threading.Lock()
+        self._spans = {}     # name -> {'count', 'errors', 'seconds', 'rows', 'recent'}
+        self._counters = {}  # name -> value
+
+    def observe(self, name, seconds, rows=0, error=False):
+        with self._lock:
+            span = self._spans.get(name)
+            if span is None:
+                span = self._spans[name] = {'count': 0, 'errors': 0, 'seconds': 0.0, 'rows': 0,
+                                            'recent': deque(maxlen=RECENT_SPANS)}
+            span['count'] += 1
+            span['errors'] += int(error)
+            span['seconds'] += seconds
+            span['rows'] += rows
+            span['recent'].append(seconds)
+
+    def incr(self, name, value=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    @contextlib.contextmanager
+    def span(self, name):
+        """Times a block; set `.rows` on the yielded object to record rows processed."""
+        if not self.enabled:
+            yield _NullSpan
+            return
+        record = _SpanRecord()
+        start = time.perf_counter()
+        try:
+            yield record
+        except BaseException:
+            self.observe(name, time.perf_counter() - start, record.rows, error=True)
+            raise
+        self.observe(name, time.perf_counter() - start, record.rows)
+
+    def reset(self):
+        with self._lock:
+            self._spans.clear()
+            self._counters.clear()
+
+    def snapshot(self):
+        """Per-stage rows (calls, rows, recent p50/p95) for st.dataframe."""
+        with self._lock:
+            spans = {name: dict(s, recent=list(s['recent'])) for name, s in self._spans.items()}
+        rows = []
+        for name, s in sorted(spans.items()):
+            p50, p95 = np.percentile(s['recent'], [50, 95]) * 1000
+            rows.append({
+                'Stage': name,
+                'Calls': s['count'],
+                'Errors': s['errors'],
+                'Rows': s['rows'],
+                'p50 (ms)': round(p50, 2),
+                'p95 (ms)': round(p95, 2),
+                'Total (s)': round(s['seconds'], 3),
+            })
+        return rows
+
+    def counters(self):
+        with self._lock:
+            return dict(self._counters)
+
+    def to_prometheus(self):
+        """Prometheus text exposition format (a summary per stage plus counters)."""
+        with self._lock:
+            spans = {name: dict(s, recent=list(s['recent'])) for name, s in self._spans.items()}
+            counters = dict(self._counters)
+
+        lines = [
+            f"# HELP {PREFIX}_stage_seconds Time spent in instrumented stages (recent quantiles).",
+            f"# TYPE {PREFIX}_stage_seconds summary",
+        ]
+        for name, s in sorted(spans.items()):
+            for q, v in zip((0.5, 0.95), np.percentile(s['recent'], [50, 95])):
+                lines.append(f'{PREFIX}_stage_seconds{{stage="{name}",quantile="{q}"}} {v:.6f}')
+            lines.append(f'{PREFIX}_stage_seconds_sum{{stage="{name}"}} {s["seconds"]:.6f}')
+            lines.append(f'{PREFIX}_stage_seconds_count{{stage="{name}"}} {s["count"]}')
+        for metric, key, help_text in [('stage_rows_total', 'rows', 'Rows processed by instrumented stages.'),
+                                       ('stage_errors_total', 'errors', 'Instrumented calls that raised.')]:
+            lines.append(f"# HELP {PREFIX}_{metric} {help_text}")
+            lines.append(f"# TYPE {PREFIX}_{metric} counter")
+            for name, s in sorted(spans.items()):
+                lines.append(f'{PREFIX}_{metric}{{stage="{name}"}} {s[key]}')
+        for name, value in sorted(counters.items()):
+            lines.append(f"# TYPE {PREFIX}_{name}_total counter")
+            lines.append(f"{PREFIX}_{name}_total {value}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, path=None):
+        """Writes to_prometheus() atomically (node_exporter textfile style). Returns the path."""
+        path = path or self.export_path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp, path)
+        return path
+
+
+class _SpanRecord:
+    __slots__ = ('rows',)
+
+    def __init__(self):
+        self.rows = 0
+
+
+class _NullRecord:
+    """Accepts and drops `.rows` when metrics are disabled."""
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        pass
+
+_NullSpan = _NullRecord()
+
+
+# Process-wide registry used by the instrumented entry points; off unless
+# METRICS_ENABLED=1 or the app's Instrumentation toggle turns it on
+METRICS = Metrics(
+    enabled=os.getenv("METRICS_ENABLED", "0") == "1",
+    export_path=os.getenv("METRICS_PATH", "data/metrics.prom"),
+)
+
+def _default_rows(result, *args, **kwargs):
+    try:
+        return len(result)
+    except TypeError:
+        return 0
+
+def timed(name, rows=_default_rows):
+    """
+    Decorator recording a span per call. rows(result, *args, **kwargs) gives
+    the row count to record (default: len(result) when it has one).
+    """
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not METRICS.enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException:
+                METRICS.observe(name, time.perf_counter() - start, error=True)
+                raise
+            METRICS.observe(name, time.perf_counter() - start, rows(result, *args, **kwargs))
+            return result
+        return wrapper
+    return decorate
+
+def span(name):
+    return METRICS.span(name)
+
+def incr(name, value=1):
+    METRICS.incr(name, value)
+
+@contextlib.contextmanager
+def profiled(limit=30, sort="cumulative"):
+    """
+    cProfile capture of one block. The yielded dict gets 'report' (pstats
+    text of the top `limit` functions) once the block exits.
+    """
+    import cProfile
+    import pstats
+
+    capture = {'report': None}
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield capture
+    finally:
+        profiler.disable()
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats(sort).print_stats(limit)
+        capture['report'] = out.getvalue()
@@ -1,19 +1,40 @@
+import numpy as np
 import pandas as pd
-from sklearn.ensemble import GradientBoostingClassifier
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score, classification_report
-import joblib
 import os
+from src.compact import CompactFrame
+from src.metrics import timed
+
+# sklearn and joblib are imported on first use to keep app startup fast
 
 class SignalModel:
-    def __init__(self):
+    def __init__(self, market_features=False, threshold=None):
+        from sklearn.ensemble import GradientBoostingClassifier
         # using sklearn GradientBoostingClassifier as drop-in replacement
         self.model = GradientBoostingClassifier(n_estimators=100, learning_rate=0.1, max_depth=3, random_state=42)
         self.feature_cols = [
             'rsi', 'macd', 'macd_signal', 'macd_diff', 
             'bb_high', 'bb_low', 'sma_20', 'ema_50', 'volume_change'
         ]
+        if market_features:
+            # Rolling correlation/beta to BTC, see FeatureEngineer.add_market_features
+            self.feature_cols += ['corr_btc', 'beta_btc']
         self.model_path = "model.joblib"
+        # Per-horizon heads: {horizon: fitted classifier}, see train_horizons()
+        self.heads = {}
+        # Label threshold (sensitivity) of the training targets, when known
+        self.threshold = threshold
+
+    @property
+    def version(self):
+        """
+        Short id of the model configuration (estimator, parameters, features,
+        label threshold). Signal logs are keyed by it, so a reconfigured model
+        or another sensitivity logs afresh.
+        """
+        import hashlib
+        spec = repr((type(self.model).__name__, sorted(self.model.get_params().items()), self.feature_cols,
+                     self.threshold))
+        return hashlib.sha1(spec.encode()).hexdigest()[:12]
 
     def clean_features(self, df):
         """
@@ -27,24 +48,34 @@ class SignalModel:
         data.fillna(0, inplace=True)
         return data
 
-    def prepare_data(self, df):
+    def prepare_data(self, df, target_col='target'):
+        if isinstance(df, CompactFrame):
+            # Already hardened float32 features: hand the model a view, no copies
+            X = df.features(self.feature_cols)
+            y = df.target + 1  # -1->0, 0->1, 1->2 (int8)
+            return X, y
+
         # Drop rows with NaNs in features
-        data = df.dropna(subset=self.feature_cols + ['target']).copy()
+        data = df.dropna(subset=self.feature_cols + [target_col]).copy()
         
         X = self.clean_features(data[self.feature_cols])
         # Map targets: -1->0, 0->1, 1->2
-        y = data['target'].map({-1: 0, 0: 1, 1: 2})
+        y = data[target_col].map({-1: 0, 0: 1, 1: 2})
         return X, y
 
+    @timed('train', rows=lambda acc, self, df: len(df))
     def train(self, df):
+        import joblib
+        from sklearn.metrics import accuracy_score, classification_report
+
         X, y = self.prepare_data(df)
         if len(X) < 50:
             print("Not enough data to train.")
             return
 
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, shuffle=False)
+        X_train, X_test, y_train, y_test = self._split(X, y)
         
-        if len(y_train.unique()) < 2:
+        if len(np.unique(y_train)) < 2:
             raise ValueError("Training data contains only one class. Training requires at least two classes (e.g., BUY and HOLD). Try increasing the training lookback or selecting a different coin/interval.")
 
         self.model.fit(X_train, y_train)
@@ -54,9 +85,81 @@ class SignalModel:
         print(f"Model Training Accuracy: {acc:.2f}")
         print(classification_report(y_test, preds))
         
-        joblib.dump(self.model, self.model_path)
+        if self.model_path:
+            joblib.dump(self.model, self.model_path)
         return acc
 
+    def _split(self, X, y, test_size=0.2):
+        """Chronological train/test split. Arrays are sliced, so parts stay views."""
+        if isinstance(X, np.ndarray):
+            n_train = len(X) - int(np.ceil(len(X) * test_size))
+            return X[:n_train], X[n_train:], y[:n_train], y[n_train:]
+        from sklearn.model_selection import train_test_split
+        return train_test_split(X, y, test_size=test_size, shuffle=False)
+
+    def predict_compact(self, frame):
+        """
+        Predictions for a CompactFrame without building a DataFrame.
+        Returns (signals as int8 -1/0/1, confidence as float32) arrays.
+        """
+        probs = self.model.predict_proba(frame.features(self.feature_cols))
+        signals = (self.model.classes_[probs.argmax(axis=1)] - 1).astype(np.int8)
+        return signals, probs.max(axis=1).astype(np.float32)
+
+    def train_horizons(self, df, horizons, threshold=0.005):
+        """
+        Trains one head per horizon on labels from
+        FeatureEngineer.create_multi_horizon_labels (same features, shared X).
+        Returns {horizon: accuracy}; horizons that cannot be trained are skipped.
+        """
+        from sklearn.base import clone
+        from sklearn.metrics import accuracy_score
+        from sklearn.model_selection import train_test_split
+        from src.features import FeatureEngineer
+
+        results = {}
+        for h in horizons:
+            target_col = FeatureEngineer.target_column(h, threshold)
+            if target_col not in df.columns:
+                raise ValueError(f"Missing label column '{target_col}'. Run create_multi_horizon_labels first.")
+
+            # The last h rows have no realized future close
+            X, y = self.prepare_data(df.iloc[:len(df) - h], target_col=target_col)
+            if len(X) < 50:
+                print(f"Not enough data to train horizon {h}.")
+                continue
+
+            X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, shuffle=False)
+            if len(y_train.unique()) < 2:
+                print(f"Skipping horizon {h}: training data contains only one class.")
+                continue
+
+            head = clone(self.model)
+            head.fit(X_train, y_train)
+            acc = accuracy_score(y_test, head.predict(X_test))
+            print(f"Horizon {h} Training Accuracy: {acc:.2f}")
+
+            self.heads[h] = head
+            results[h] = acc
+        return results
+
+    def predict_horizons(self, df):
+        """
+        Adds 'signal_h{h}' and 'confidence_h{h}' columns for every trained head.
+        """
+        data = self.clean_features(df[self.feature_cols])
+        if len(data) == 0:
+            return None
+
+        class_map = {0: 'SELL', 1: 'HOLD', 2: 'BUY'}
+        for h, head in sorted(self.heads.items()):
+            probs = head.predict_proba(data)
+            preds = head.classes_[probs.argmax(axis=1)]
+            df[f'signal_h{h}'] = [class_map[p] for p in preds]
+            df[f'confidence_h{h}'] = probs.max(axis=1)
+        return df
+
+    @timed('predict')
     def predict(self, df):
         """
         Predicts signal for the latest available data point (or full df).
@@ -0,0 +1,97 @@
+import multiprocessing
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+DEFAULT_PATHS = 10000
+CHUNK_SIZE = 2500
+# Equity curves kept (from the first chunk) for plotting
+SAMPLE_PATHS = 50
+PERCENTILES = [5, 25, 50, 75, 95]
+
+def trade_returns(results, initial_capital=10000):
+    """
+    Portfolio return of every closed trade (pnl over equity before the trade),
+    from Trader.run_backtest results. The trader is flat between trades, so
+    these compound back to the backtest's final value.
+    """
+    pnl = np.array([r['pnl'] for r in results], dtype=np.float64)
+    equity_before = initial_capital + np.concatenate([[0.0], np.cumsum(pnl)[:-1]])
+    return pnl / equity_before
+
+def bootstrap_indices(rng, n_paths, n, method='trades', block_size=24):
+    """
+    (n_paths, n) indices into the source returns. 'trades' draws single
+    returns with replacement; 'block' draws circular blocks of block_size
+    consecutive returns, keeping short-range autocorrelation.
+    """
+    if method == 'trades':
+        return rng.integers(0, n, size=(n_paths, n))
+    if method != 'block':
+        raise ValueError(f"Unknown resampling method '{method}'")
+    block_size = max(1, min(block_size, n))
+    n_blocks = -(-n // block_size)
+    starts = rng.integers(0, n, size=(n_paths, n_blocks, 1))
+    return ((starts + np.arange(block_size)) % n).reshape(n_paths, -1)[:, :n]
+
+def _simulate_chunk(returns, n_paths, seed, method, block_size, initial_capital, periods_per_year, keep):
+    rng = np.random.default_rng(seed)
+    sampled = returns[bootstrap_indices(rng, n_paths, len(returns), method, block_size)]
+
+    equity = initial_capital * np.cumprod(1 + sampled, axis=1)
+    peaks = np.maximum(np.maximum.accumulate(equity, axis=1), initial_capital)
+    std = sampled.std(axis=1, ddof=1) if sampled.shape[1] > 1 else np.zeros(n_paths)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = np.where(std > 0, sampled.mean(axis=1) / std * np.sqrt(periods_per_year), 0.0)
+    return {
+        'final_value': equity[:, -1],
+        'max_drawdown': (1 - equity / peaks).max(axis=1),
+        'sharpe': sharpe,
+        'paths': equity[:keep],
+    }
+
+def simulate(returns, n_paths=DEFAULT_PATHS, method='trades', block_size=24, initial_capital=10000,
+             periods_per_year=252, seed=None, processes=None, chunk_size=CHUNK_SIZE):
+    """
+    Monte Carlo equity curves from resampled returns (see bootstrap_indices).
+    Paths are simulated in chunks across a process pool; every chunk gets its
+    own child seed, so results depend on `seed` and `chunk_size` only, not on
+    the number of processes.
+    Returns {'final_value', 'max_drawdown', 'sharpe': arrays of n_paths,
+    'paths': up to SAMPLE_PATHS equity curves}.
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    if len(returns) == 0:
+        raise ValueError("No returns to resample.")
+
+    sizes = [min(chunk_size, n_paths - start) for start in range(0, n_paths, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = [(returns, size, s, method, block_size, initial_capital, periods_per_year, SAMPLE_PATHS if i == 0 else 0)
+            for i, (size, s) in enumerate(zip(sizes, seeds))]
+
+    processes = processes if processes is not None else (os.cpu_count() or 1)
+    if processes > 1 and len(args) > 1:
+        # Spawned, not forked, as the pool runs inside the threaded Streamlit server
+        with ProcessPoolExecutor(max_workers=min(processes, len(args)),
+                                 mp_context=multiprocessing.get_context("spawn")) as pool:
+            chunks = list(pool.map(_simulate_chunk, *zip(*args)))
+    else:
+        chunks = [_simulate_chunk(*a) for a in args]
+
+    out = {key: np.concatenate([c[key] for c in chunks]) for key in ('final_value', 'max_drawdown', 'sharpe')}
+    out['paths'] = chunks[0]['paths']
+    return out
+
+def summarize(result, initial_capital=10000):
+    """Percentile table of the simulated metrics, for st.dataframe."""
+    rows = []
+    for key, label, scale in [('final_value', 'Final Value ($)', 1), ('max_drawdown', 'Max Drawdown (%)', 100),
+                              ('sharpe', 'Sharpe Ratio', 1)]:
+        values = result[key] * scale
+        row = {'Metric': label, 'Mean': values.mean()}
+        row.update({f"P{p}": v for p, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))})
+        rows.append(row)
+    table = pd.DataFrame(rows).round(2)
+    prob_loss = float((result['final_value'] < initial_capital).mean())
+    return table, prob_loss
@@ -0,0 +1,265 @@
+"""
+Out-of-core training on histories too large for memory (years of 15m
+candles across the watchlist).
+
+Candles are streamed from the store in chunks (DatabaseManager.iter_ohlcv),
+each chunk is turned into float32 features together with a tail of the
+previous one so the indicators are warmed up, and the chunks feed one of
+two estimators:
+
+- 'sgd': StandardScaler + SGDClassifier (logistic loss) fitted with
+  partial_fit; sees every row, memory is one chunk.
+- 'hist': features are quantile-binned to uint8 codes and a
+  HistGradientBoostingClassifier is fitted on them. When the codes of all
+  rows do not fit the memory budget, a uniform reservoir sample that does
+  is kept.
+
+    python -m src.out_of_core --symbols BTCUSDT ETHUSDT --interval 15m --method hist --budget-mb 256
+"""
+import itertools
+import time
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
+from src.features import FeatureEngineer, INDICATOR_COLUMNS
+from src.market_scan import POOLED_FEATURES, LEVEL_FEATURES
+from src.model import SignalModel
+
+MEMORY_BUDGET_MB = 256
+# Rows carried into the next chunk: EMA-based indicators (ema_50, MACD) are
+# then within about 1e-4 of their full-history values
+WARMUP_ROWS = 250
+MAX_CHUNK_ROWS = 100_000
+# Measured peak bytes per candle while a chunk is featurized (SQL rows, raw
+# frame, ta temporaries, float32 buffer)
+BYTES_PER_CHUNK_ROW = 1000
+# Rows sampled to place the quantile bin edges ('hist'), at most; see edge_capacity
+EDGE_SAMPLE_ROWS = 200_000
+HIST_BINS = 255
+CLASSES = np.array([0, 1, 2])  # SELL, HOLD, BUY as in SignalModel.prepare_data
+
+
+class QuantileBinner(BaseEstimator, TransformerMixin):
+    """Maps each feature to uint8 bin codes using fixed per-feature edges."""
+    def __init__(self, edges=None):
+        self.edges = edges
+
+    def fit(self, X, y=None):
+        return self
+
+    def transform(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        codes = np.empty(X.shape, dtype=np.uint8)
+        for j, edges in enumerate(self.edges):
+            codes[:, j] = np.searchsorted(edges, X[:, j], side='right')
+        return codes
+
+    def __sklearn_is_fitted__(self):
+        return self.edges is not None
+
+
+def feature_matrix(frame, feature_cols):
+    """
+    float32 (rows x features) from a CompactFrame; *_rel columns (see
+    market_scan.relative_features) are derived from their base column.
+    """
+    X = np.empty((len(frame), len(feature_cols)), dtype=np.float32)
+    close = frame['close']
+    for j, col in enumerate(feature_cols):
+        if col in frame.columns:
+            X[:, j] = frame[col]
+        else:
+            base = col[:-len('_rel')]
+            X[:, j] = frame[base] / close - (1 if base in LEVEL_FEATURES else 0)
+    np.nan_to_num(X, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
+    return X
+
+
+class OutOfCoreTrainer:
+    """
+    Fits a SignalModel from candles streamed out of the store, with peak
+    memory bounded by memory_budget_mb. Several symbols are interleaved
+    chunk by chunk and use the scale-free POOLED_FEATURES; one symbol uses
+    SignalModel's features. stats reports rows, passes, seconds and rows/s.
+    """
+    def __init__(self, db, symbols, interval, threshold=0.005, method='hist',
+                 memory_budget_mb=MEMORY_BUDGET_MB, feature_cols=None, horizon=1, epochs=2, seed=0):
+        if method not in ('sgd', 'hist'):
+            raise ValueError("method must be 'sgd' or 'hist'")
+        self.db = db
+        self.symbols = list(symbols)
+        self.interval = interval
+        self.threshold = threshold
+        self.method = method
+        self.budget = int(memory_budget_mb * 1024 * 1024)
+        self.feature_cols = feature_cols or (POOLED_FEATURES if len(self.symbols) > 1 else list(INDICATOR_COLUMNS))
+        self.horizon = horizon
+        self.epochs = epochs
+        self.rng = np.random.default_rng(seed)
+        self.fe = FeatureEngineer()
+        # A quarter of the budget for the chunks in flight (one per symbol,
+        # see chunks), the rest for fitting
+        per_chunk = self.budget // 4 // len(self.symbols)
+        self.chunk_rows = int(max(WARMUP_ROWS * 4, min(MAX_CHUNK_ROWS, per_chunk // BYTES_PER_CHUNK_ROW)))
+        self.stats = {'rows': 0, 'passes': 0, 'seconds': 0.0, 'rows_per_s': 0}
+
+    # --- streaming ---------------------------------------------------------------------
+
+    def _symbol_chunks(self, symbol, start=None, end=None):
+        """(X, y) per chunk of one symbol; every labeled row exactly once."""
+        tail, last_emitted = None, None
+        for candles in self.db.iter_ohlcv(symbol, self.interval, start=start, end=end, chunk_size=self.chunk_rows):
+            combined = candles if tail is None else pd.concat([tail, candles])
+            if len(combined) <= self.horizon:
+                tail = combined
+                continue
+            frame = self.fe.compact_features(combined, threshold=self.threshold, horizon=self.horizon)
+            # Skip the warmup rows of the first chunk and rows emitted before
+            first = WARMUP_ROWS if last_emitted is None else int(np.searchsorted(frame.index, last_emitted, side='right'))
+            if first < len(frame):
+                X = feature_matrix(frame, self.feature_cols)[first:]
+                y = frame.target[first:] + 1
+                last_emitted = frame.index[-1]
+                yield X, y
+            tail = combined.iloc[-(WARMUP_ROWS + self.horizon):]
+
+    def chunks(self, start=None, end=None):
+        """(X float32, y int 0..2) chunks, round-robin across symbols."""
+        streams = [self._symbol_chunks(s, start, end) for s in self.symbols]
+        for batch in itertools.zip_longest(*streams):
+            for item in batch:
+                if item is not None:
+                    yield item
+
+    # --- fitting -----------------------------------------------------------------------
+
+    def fit(self, end=None):
+        """Trains on candles up to `end` (None = all). Returns a SignalModel."""
+        started = time.perf_counter()
+        self.stats.update(rows=0, passes=0)
+        estimator = self._fit_sgd(end) if self.method == 'sgd' else self._fit_hist(end)
+        self.stats['seconds'] = time.perf_counter() - started
+        self.stats['rows_per_s'] = round(self.stats['rows'] * self.stats['passes'] / self.stats['seconds']) \
+            if self.stats['seconds'] else 0
+
+        model = SignalModel(threshold=self.threshold)
+        model.model = estimator
+        model.feature_cols = list(self.feature_cols)
+        model.model_path = None
+        return model
+
+    def _fit_sgd(self, end):
+        from sklearn.linear_model import SGDClassifier
+        from sklearn.pipeline import Pipeline
+        from sklearn.preprocessing import StandardScaler
+
+        # 1. One pass for the feature scaling, 2. `epochs` passes of partial_fit
+        scaler = StandardScaler()
+        for X, y in self.chunks(end=end):
+            scaler.partial_fit(X)
+            self.stats['rows'] += len(X)
+        if not self.stats['rows']:
+            raise ValueError("No candles to train on")
+
+        clf = SGDClassifier(loss='log_loss', alpha=1e-4, random_state=0)
+        for _ in range(self.epochs):
+            for X, y in self.chunks(end=end):
+                order = self.rng.permutation(len(X))
+                clf.partial_fit(scaler.transform(X[order]), y[order], classes=CLASSES)
+        self.stats['passes'] = 1 + self.epochs
+        return Pipeline([('scale', scaler), ('clf', clf)])
+
+    def edge_capacity(self):
+        """Rows of float32 features sampled for the bin edges ('hist')."""
+        # Shares the quarter of the budget left beside the chunk in flight
+        # with np.quantile's copy of one column
+        per_row = 4 * len(self.feature_cols) + 4
+        return int(max(HIST_BINS, min(EDGE_SAMPLE_ROWS, self.budget // 4 // per_row)))
+
+    def fit_capacity(self):
+        """Rows of uint8 codes that can be fitted within the budget ('hist')."""
+        n_features = len(self.feature_cols)
+        # uint8 codes, HistGradientBoosting's float64 copy and its own binned
+        # copy, per-row gradients/hessians/raw predictions/softmax for 3
+        # classes, float64 labels and the partition index buffers
+        per_row = n_features * (1 + 8 + 1) + 3 * (4 + 4 + 8 + 8) + 8 + 4 * 4
+        # Histograms (float64 gradient/hessian sums, uint32 counts) of up to 31 leaves
+        histograms = 31 * n_features * (HIST_BINS + 1) * 20
+        return max(1000, (self.budget - self.budget // 4 - histograms) // per_row)
+
+    def _fit_hist(self, end):
+        from sklearn.ensemble import HistGradientBoostingClassifier
+        from sklearn.pipeline import Pipeline
+
+        # 1. Reservoir sample to place the quantile bin edges
+        sample = np.empty((self.edge_capacity(), len(self.feature_cols)), dtype=np.float32)
+        seen = 0
+        for X, y in self.chunks(end=end):
+            seen = self._reservoir((sample,), seen, (X,))
+        if not seen:
+            raise ValueError("No candles to train on")
+        sample = sample[:min(seen, len(sample))]
+        quantiles = np.linspace(0, 1, HIST_BINS + 1)[1:-1]
+        binner = QuantileBinner([np.unique(np.quantile(sample[:, j], quantiles)).astype(np.float32)
+                                 for j in range(sample.shape[1])])
+        del sample
+
+        # 2. Stream every row into uint8 codes, reservoir-sampled down to the budget
+        codes = np.empty((min(self.fit_capacity(), seen), len(self.feature_cols)), dtype=np.uint8)
+        labels = np.empty(len(codes), dtype=np.int8)
+        streamed = 0
+        for X, y in self.chunks(end=end):
+            streamed = self._reservoir((codes, labels), streamed, (binner.transform(X), y))
+        self.stats.update(rows=streamed, fitted_rows=len(codes), passes=2)
+
+        # 3. Codes are already binned: one histogram bin per distinct code
+        hgb = HistGradientBoostingClassifier(max_iter=100, max_bins=HIST_BINS, early_stopping=False, random_state=0)
+        hgb.fit(codes, labels)
+        return Pipeline([('bin', binner), ('hgb', hgb)])
+
+    def _reservoir(self, buffers, seen, rows):
+        """
+        Algorithm R, vectorized per chunk: rows fill `buffers` until they are
+        full, then stream row t replaces slot j ~ U[0, t] when j < capacity.
+        Returns the number of rows seen so far.
+        """
+        capacity, n = len(buffers[0]), len(rows[0])
+        take = max(0, min(n, capacity - seen))
+        for buffer, values in zip(buffers, rows):
+            buffer[seen:seen + take] = values[:take]
+        if take < n:
+            slots = self.rng.integers(0, seen + np.arange(take, n) + 1)
+            keep = np.flatnonzero(slots < capacity)
+            for buffer, values in zip(buffers, rows):
+                buffer[slots[keep]] = values[take:][keep]
+        return seen + n
+
+    def score(self, model, start=None, end=None):
+        """Streaming accuracy of `model` on candles in [start, end]."""
+        correct = total = 0
+        for X, y in self.chunks(start=start, end=end):
+            correct += int((model.model.predict(X) == y).sum())
+            total += len(y)
+        return correct / total if total else None
+
+
+if __name__ == "__main__":
+    import argparse
+    import joblib
+    from src.database import DatabaseManager
+
+    parser = argparse.ArgumentParser(description="Out-of-core SignalModel training from the candle store")
+    parser.add_argument("--symbols", nargs="+", required=True)
+    parser.add_argument("--interval", default="15m")
+    parser.add_argument("--method", choices=["hist", "sgd"], default="hist")
+    parser.add_argument("--budget-mb", type=float, default=MEMORY_BUDGET_MB)
+    parser.add_argument("--sensitivity", type=float, default=0.5, help="label threshold in percent")
+    parser.add_argument("--out", default="model.joblib")
+    args = parser.parse_args()
+
+    trainer = OutOfCoreTrainer(DatabaseManager(), args.symbols, args.interval, args.sensitivity / 100,
+                               args.method, args.budget_mb)
+    model = trainer.fit()
+    joblib.dump(model.model, args.out)
+    print(f"Trained on {trainer.stats['rows']:,} rows in {trainer.stats['seconds']:.1f} s "
+          f"({trainer.stats['rows_per_s']:,} rows/s over {trainer.stats['passes']} passes), saved to {args.out}")
@@ -0,0 +1,139 @@
+import time
+from src.correlation import BENCHMARK
+from src.features import FeatureEngineer
+from src.model import SignalModel
+from src.trader import Trader
+
+class AnalysisPipeline:
+    """
+    Memoized load -> features -> labels -> train -> predict -> backtest chain
+    for the Analysis page. Every stage is keyed on the inputs it actually
+    depends on, so a widget change only recomputes the stages downstream of it
+    (e.g. the stop-loss slider only re-runs the backtest).
+    """
+    STAGES = ['load', 'features', 'labels', 'train', 'predict', 'backtest']
+
+    def __init__(self, loader, initial_capital=10000, model_path="model.joblib"):
+        self.loader = loader
+        self.initial_capital = initial_capital
+        self.model_path = model_path  # where trained models are saved (None = not saved)
+        self.fe = FeatureEngineer()
+        self._cache = {}  # stage -> (key, value)
+        self._refresh = False  # next load skips the loader's shared candle cache
+        self.timings = {}  # stage -> {'ms': float, 'cached': bool}
+
+    def invalidate(self, stage='load'):
+        """
+        Drops the cached result of a stage and every stage after it. Dropping
+        'load' also refetches past the loader's shared candle cache.
+        """
+        for name in self.STAGES[self.STAGES.index(stage):]:
+            self._cache.pop(name, None)
+        if stage == 'load':
+            self._refresh = True
+
+    def _stage(self, name, key, compute):
+        start = time.perf_counter()
+        cached = self._cache.get(name)
+        if cached is not None and cached[0] == key:
+            value, fresh = cached[1], False
+        else:
+            value, fresh = compute(), True
+            self._cache[name] = (key, value)
+        self.timings[name] = {'ms': (time.perf_counter() - start) * 1000, 'cached': not fresh}
+        return value, fresh
+
+    def run(self, symbol, interval, lookback, sensitivity, risk_size, sl_pct, tp_pct, market_features=False):
+        """
+        Runs (or reuses) every stage for the given parameters.
+        market_features adds rolling correlation/beta to BTC as model inputs.
+        Returns a dict with the stage outputs plus 'fresh', the set of stages
+        recomputed on this call, so callers can limit side effects (signal
+        logging, performance stats) to genuinely new results.
+        """
+        fresh = set()
+        self.timings = {}
+
+        load_key = (symbol, interval, lookback)
+        raw, is_new = self._stage('load', load_key,
+                                  lambda: self.loader.get_data(symbol, interval, lookback, refresh=self._refresh))
+        if is_new:
+            fresh.add('load')
+            self._refresh = False
+        if raw is None or raw.empty:
+            self.invalidate('load')
+            raise ValueError("Failed to fetch data.")
+
+        feature_key = load_key + (market_features,)
+        features, is_new = self._stage('features', feature_key,
+                                       lambda: self._features(raw, symbol, interval, lookback, market_features))
+        if is_new: fresh.add('features')
+
+        label_key = feature_key + (sensitivity,)
+        labeled, is_new = self._stage('labels', label_key, lambda: self._label(features, sensitivity))
+        if is_new: fresh.add('labels')
+
+        def train():
+            model = SignalModel(market_features=market_features, threshold=sensitivity)
+            model.model_path = self.model_path
+            acc = model.train(labeled)
+            if acc is None:
+                raise ValueError("Not enough data to train. Try increasing the training lookback.")
+            return model, acc
+        try:
+            (model, acc), is_new = self._stage('train', label_key, train)
+        except ValueError:
+            self.invalidate('train')
+            raise
+        if is_new: fresh.add('train')
+
+        # predict() writes signal columns in place, keep the labeled frame intact
+        predictions, is_new = self._stage('predict', label_key, lambda: model.predict(labeled.copy()))
+        if is_new: fresh.add('predict')
+
+        backtest_key = label_key + (risk_size, sl_pct, tp_pct)
+        backtest, is_new = self._stage('backtest', backtest_key,
+                                       lambda: self._backtest(predictions, symbol, risk_size, sl_pct, tp_pct))
+        if is_new: fresh.add('backtest')
+
+        return {
+            'data': labeled,
+            'model': model,
+            'accuracy': acc,
+            'predictions': predictions,
+            'trader': backtest['trader'],
+            'results': backtest['results'],
+            'final_value': backtest['final_value'],
+            'fresh': fresh,
+        }
+
+    def _features(self, raw, symbol, interval, lookback, market_features):
+        df = self.fe.add_technical_indicators(raw)
+        if market_features:
+            benchmark = raw if symbol == BENCHMARK else self.loader.get_data(BENCHMARK, interval, lookback)
+            if benchmark is None or benchmark.empty:
+                raise ValueError(f"Failed to fetch {BENCHMARK} data for the correlation features.")
+            df = self.fe.add_market_features(df, benchmark)
+        return df
+
+    def _label(self, df, sensitivity):
+        df = self.fe.create_labels(df.copy(), threshold=sensitivity)
+        df.dropna(inplace=True)
+        return df
+
+    def _backtest(self, df_pred, symbol, risk_size, sl_pct, tp_pct):
+        trader = Trader(initial_capital=self.initial_capital)
+        trader.set_risk_params(risk_size, sl_pct, tp_pct)
+        results = trader.run_backtest(df_pred, symbol)
+        final_val = trader.get_portfolio_value({symbol: df_pred.iloc[-1]['close']})
+        return {'trader': trader, 'results': results, 'final_value': final_val}
+
+    def timings_table(self):
+        """Stage timings from the last run() as rows for st.dataframe."""
+        return [
+            {
+                'Stage': name,
+                'Time (ms)': round(self.timings[name]['ms'], 2),
+                'Status': 'cached' if self.timings[name]['cached'] else 'computed'
+            } for name in self.STAGES if name in self.timings
+        ]
@@ -0,0 +1,56 @@
+import pandas as pd
+
+# Candle length of every interval the app offers
+INTERVAL_MINUTES = {'15m': 15, '1h': 60, '4h': 240, '1d': 1440}
+
+# Stored intervals each interval can be built from, coarsest (fewest rows) first
+SOURCE_INTERVALS = {
+    '1h': ['15m'],
+    '4h': ['1h', '15m'],
+    '1d': ['1h', '15m'],
+}
+
+def interval_delta(interval):
+    return pd.Timedelta(minutes=INTERVAL_MINUTES[interval])
+
+def resample_ohlcv(df: pd.DataFrame, source_interval: str, target_interval: str) -> pd.DataFrame:
+    """
+    Aggregates candles of source_interval into target_interval candles:
+    open=first, high=max, low=min, close=last, volume=sum.
+    Buckets are aligned to the UTC epoch, matching Binance (4h at 00/04/08...
+    UTC, 1d at 00:00 UTC). Buckets missing source candles are dropped, except
+    the newest one, which is the still-forming candle (as Binance returns it).
+    """
+    if df.empty:
+        return df
+    per_bucket = INTERVAL_MINUTES[target_interval] // INTERVAL_MINUTES[source_interval]
+
+    grouped = df.resample(interval_delta(target_interval), origin='epoch', label='left', closed='left')
+    out = grouped.agg({'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'})
+    counts = grouped['close'].count()
+
+    complete = counts == per_bucket
+    complete.iloc[-1] = counts.iloc[-1] > 0
+    return out[complete]
+
+def incomplete_ranges(df: pd.DataFrame, source_interval: str, target_interval: str):
+    """
+    (first, last) bucket start times of every run of consecutive
+    target_interval buckets that resample_ohlcv drops for missing source
+    candles (gaps in the finer data). The newest bucket is never included.
+    """
+    if df.empty:
+        return []
+    per_bucket = INTERVAL_MINUTES[target_interval] // INTERVAL_MINUTES[source_interval]
+    counts = df['close'].resample(interval_delta(target_interval), origin='epoch',
+                                  label='left', closed='left').count()
+    missing = (counts < per_bucket).to_numpy().copy()
+    missing[-1] = False
+    ranges, run_start = [], None
+    for i, flag in enumerate(missing):
+        if flag and run_start is None:
+            run_start = i
+        elif not flag and run_start is not None:
+            ranges.append((counts.index[run_start], counts.index[i - 1]))
+            run_start = None
+    return ranges
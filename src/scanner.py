@@ -0,0 +1,229 @@
+import os
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime
+import pandas as pd
+from src.features import FeatureEngineer
+from src.metrics import METRICS, incr
+from src.model import SignalModel
+from src.resample import INTERVAL_MINUTES, interval_delta
+
+SCAN_INTERVALS = ['15m', '1h', '4h', '1d']
+# Seconds to wait after a close so the exchange has finalized the candle
+CLOSE_DELAY = 5
+# Seconds after a candle close by which its signal must be logged
+JOB_DEADLINE = 120
+MAX_WORKERS = 4
+
+EPOCH = datetime(1970, 1, 1)
+
+def last_close(interval, now=None):
+    """Close time of the most recent closed candle (= open time of the current one), naive UTC."""
+    now = now or datetime.utcnow()
+    step = interval_delta(interval)
+    return EPOCH + ((now - EPOCH) // step) * step
+
+def next_close(interval, now=None):
+    return last_close(interval, now) + interval_delta(interval)
+
+def candles_behind(interval, candle_close, now=None):
+    """Closed candles since candle_close that have not been scanned yet."""
+    if candle_close is None:
+        return None
+    return int((last_close(interval, now) - candle_close) // interval_delta(interval))
+
+def scan_status(db, now=None):
+    """
+    Latest scan of every (symbol, interval) as a DataFrame for the UI and
+    the `status` command, including how far it lags behind the candle closes.
+    """
+    rows = []
+    for job in db.get_latest_scan_jobs():
+        rows.append({
+            'Symbol': job.symbol,
+            'Interval': job.interval,
+            'Candle Close': job.candle_close,
+            'Status': job.status,
+            'Signal': job.signal,
+            'Confidence': round(job.confidence * 100, 1) if job.confidence is not None else None,
+            'Price': job.price,
+            'Lag (s)': round(job.lag_seconds, 1) if job.lag_seconds is not None else None,
+            'Behind (candles)': candles_behind(job.interval, job.candle_close, now),
+            'Error': job.error,
+        })
+    return pd.DataFrame(rows)
+
+
+class ScanTimeout(Exception):
+    pass
+
+
+class Scanner:
+    """
+    Headless signal scanner. After every candle close it runs the
+    loader -> FeatureEngineer -> SignalModel -> signal log pipeline for each
+    watchlist symbol on a bounded thread pool. Every job is recorded in the
+    scan_jobs table; a job still unfinished JOB_DEADLINE seconds after its
+    candle closed is marked 'timeout' and its (stale) signal is not logged.
+    """
+    def __init__(self, loader, db=None, intervals=None, workers=MAX_WORKERS,
+                 deadline=JOB_DEADLINE, close_delay=CLOSE_DELAY):
+        self.loader = loader
+        self.db = db or loader.db
+        self.intervals = intervals or SCAN_INTERVALS
+        self.deadline = deadline
+        self.close_delay = close_delay
+        self.fe = FeatureEngineer()
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scan")
+        self._stop = threading.Event()
+        self._maintained_on = None
+
+    def stop(self):
+        self._stop.set()
+
+    def run_forever(self):
+        """
+        Catches up on the latest closes, then sleeps until each next close.
+        Old signal logs are rolled up once a day.
+        """
+        self.run_cycle(self.intervals)
+        self.maintain()
+        while not self._stop.is_set():
+            now = datetime.utcnow()
+            due_at = min(next_close(iv, now) for iv in self.intervals)
+            if self._stop.wait((due_at - now).total_seconds() + self.close_delay):
+                break
+            # Closes missed while a long cycle ran are skipped, not queued; they show up as lag
+            self.run_cycle([iv for iv in self.intervals if last_close(iv) == due_at])
+            self.maintain()
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+    def maintain(self, now=None):
+        """Applies signal log retention on the first call of each UTC day."""
+        today = (now or datetime.utcnow()).date()
+        if self._maintained_on == today:
+            return
+        self._maintained_on = today
+        try:
+            purged = self.db.rollup_signal_logs(now=now)
+            if purged:
+                print(f"Rolled {purged} old signal logs into daily summaries")
+        except Exception as e:
+            print(f"Signal log rollup failed: {e}")
+
+    def run_cycle(self, intervals, now=None):
+        """
+        Scans the latest closed candle of every watchlist symbol for the given
+        intervals. Returns {status: count} for the jobs of this cycle.
+        """
+        # 1. Queue one job per (symbol, interval) not scanned yet for this close
+        settings = self.db.get_settings()
+        lookback = int(settings.get('lookback', 30))
+        sensitivity = settings.get('sensitivity', 0.5) / 100
+        jobs = {}
+        for interval in intervals:
+            close = last_close(interval, now)
+            for symbol in self.db.get_watchlist():
+                job_id = self.db.claim_scan_job(symbol, interval, close)
+                if job_id is not None:
+                    deadline = time.time() + self.deadline - (datetime.utcnow() - close).total_seconds()
+                    future = self.pool.submit(self._run_job, job_id, symbol, interval, close,
+                                              lookback, sensitivity, deadline)
+                    jobs[future] = (job_id, deadline)
+        if not jobs:
+            return {}
+
+        # 2. Wait until the last deadline; anything still queued or running has missed it
+        last_deadline = max(deadline for _, deadline in jobs.values())
+        done, pending = wait(jobs, timeout=max(last_deadline - time.time(), 0))
+        for future in pending:
+            future.cancel()
+            self.db.finish_scan_job(jobs[future][0], 'timeout', error="Deadline exceeded")
+
+        counts = {}
+        for future in jobs:
+            status = future.result() if future in done else 'timeout'
+            counts[status] = counts.get(status, 0) + 1
+        print(f"Scan cycle {', '.join(intervals)}: {counts}")
+        for status, n in counts.items():
+            incr(f"scan_jobs_{status}", n)
+        if METRICS.enabled:
+            METRICS.export()
+        return counts
+
+    def _run_job(self, job_id, symbol, interval, close, lookback, sensitivity, deadline):
+        try:
+            if time.time() > deadline:
+                raise ScanTimeout("Deadline exceeded before start")
+            self.db.start_scan_job(job_id)
+            row, version = self.evaluate(symbol, interval, close, lookback, sensitivity)
+            if time.time() > deadline:
+                raise ScanTimeout("Deadline exceeded")
+            self.db.log_signal(symbol, row['signal'], float(row['confidence']), float(row['close']), interval,
+                               candle_time=row.name.to_pydatetime(), model_version=version)
+            self.db.finish_scan_job(job_id, 'done', row['signal'], float(row['confidence']), float(row['close']))
+            return 'done'
+        except ScanTimeout as e:
+            self.db.finish_scan_job(job_id, 'timeout', error=str(e))
+            return 'timeout'
+        except Exception as e:
+            print(f"Scan {symbol} {interval} failed: {e}")
+            self.db.finish_scan_job(job_id, 'failed', error=str(e))
+            return 'failed'
+
+    def evaluate(self, symbol, interval, close, lookback, sensitivity):
+        """
+        Trains on the lookback window and predicts the candle that closed at
+        `close`. Returns (prediction row, model version).
+        """
+        df = self.loader.get_data(symbol, interval, lookback)
+        if df is None or df.empty:
+            raise ValueError("No data")
+        df = self.fe.add_technical_indicators(df)
+
+        labeled = self.fe.create_labels(df.copy(), threshold=sensitivity)
+        labeled.dropna(inplace=True)
+        model = SignalModel(threshold=sensitivity)
+        model.model_path = None  # concurrent jobs must not share model.joblib
+        if model.train(labeled) is None:
+            raise ValueError("Not enough data to train")
+
+        # The scanned candle opened one interval before its close; the
+        # still-forming candle after it is never scored
+        opened = close - interval_delta(interval)
+        if opened not in df.index:
+            raise ValueError(f"Candle {opened} not available yet")
+        return model.predict(df.loc[[opened]].copy()).iloc[-1], model.version
+
+
+if __name__ == "__main__":
+    import argparse
+    from src.data_loader import BinanceLoader
+    from src.database import DatabaseManager
+
+    parser = argparse.ArgumentParser(description="Headless watchlist signal scanner")
+    parser.add_argument("command", choices=["run", "once", "status"], nargs="?", default="run")
+    parser.add_argument("--intervals", nargs="+", default=SCAN_INTERVALS, choices=list(INTERVAL_MINUTES))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("SCAN_WORKERS", MAX_WORKERS)))
+    parser.add_argument("--deadline", type=float, default=JOB_DEADLINE,
+                        help="seconds after a candle close by which its scan must finish")
+    parser.add_argument("--delay", type=float, default=CLOSE_DELAY,
+                        help="seconds to wait after a close before scanning")
+    args = parser.parse_args()
+
+    db = DatabaseManager()
+    if args.command == "status":
+        status = scan_status(db)
+        print(status.to_string(index=False) if not status.empty else "No scans recorded yet.")
+    else:
+        scanner = Scanner(BinanceLoader(db=db), db, args.intervals, args.workers, args.deadline, args.delay)
+        if args.command == "once":
+            scanner.run_cycle(args.intervals)
+        else:
+            signal.signal(signal.SIGTERM, lambda *_: scanner.stop())
+            try:
+                scanner.run_forever()
+            except KeyboardInterrupt:
+                scanner.stop()
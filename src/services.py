@@ -0,0 +1,127 @@
+import os
+import threading
+import time
+from src.archive import CandleArchive
+from src.database import DatabaseManager
+from src.data_loader import BinanceLoader
+from src.metadata_cache import MetadataCache
+from src.writer import WriteBehindWriter
+
+class TTLCache:
+    """
+    Thread-safe read-through cache with per-entry expiry.
+    Concurrent misses on the same key are coalesced: one caller loads,
+    the others wait for its result instead of hitting the API again.
+    """
+    def __init__(self, default_ttl=60):
+        self.default_ttl = default_ttl
+        self._lock = threading.Lock()
+        self._entries = {}  # key -> (expires_at, value)
+        self._key_locks = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                return entry[1]
+        return None
+
+    def get_or_load(self, key, load, ttl=None):
+        value = self.get(key)
+        if value is not None:
+            with self._lock: self.hits += 1
+            return value
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            try:
+                # Another thread may have filled it while we waited
+                value = self.get(key)
+                if value is not None:
+                    with self._lock: self.hits += 1
+                    return value
+
+                value = load()
+                ttl = self.default_ttl if ttl is None else ttl
+                with self._lock:
+                    self.misses += 1
+                    self._entries[key] = (time.monotonic() + ttl, value)
+                return value
+            finally:
+                # Waiters still hold the lock object; later callers find the entry
+                with self._lock:
+                    if self._key_locks.get(key) is key_lock:
+                        del self._key_locks[key]
+
+    def invalidate(self, key=None, prefix=None):
+        """Drops one key, every tuple key starting with prefix, or everything."""
+        with self._lock:
+            if key is not None:
+                self._entries.pop(key, None)
+            elif prefix is not None:
+                for k in [k for k in self._entries if isinstance(k, tuple) and k and k[0] == prefix]:
+                    del self._entries[k]
+            else:
+                self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+# Process-wide singletons shared by every Streamlit session (and script)
+_lock = threading.RLock()
+_instances = {}
+
+# A loader that failed to reach Binance is rebuilt after this many seconds
+LOADER_RETRY_SECONDS = 60
+
+def _shared(name, factory):
+    with _lock:
+        if name not in _instances:
+            _instances[name] = factory()
+        return _instances[name]
+
+def get_database():
+    """One DatabaseManager (and so one pooled engine) per process; MySQL is probed in the background."""
+    return _shared('db', lambda: DatabaseManager(defer_probe=True))
+
+def get_cache():
+    """Shared read-through cache for candles and exchange metadata."""
+    return _shared('cache', TTLCache)
+
+def get_archive():
+    """Columnar cold-storage tier for candles (CANDLE_ARCHIVE_DIR, default data/archive)."""
+    return _shared('archive', lambda: CandleArchive(os.getenv("CANDLE_ARCHIVE_DIR", "data/archive")))
+
+def get_metadata_cache():
+    """Persisted exchange metadata (METADATA_CACHE_PATH, default data/exchange_metadata.json)."""
+    return _shared('metadata', lambda: MetadataCache(os.getenv("METADATA_CACHE_PATH", "data/exchange_metadata.json")))
+
+def _new_loader():
+    return BinanceLoader(db=get_database(), cache=get_cache(), archive=get_archive(), metadata=get_metadata_cache(),
+                         defer_connect=True)
+
+def get_loader():
+    """One BinanceLoader (one API client, one ping) per process."""
+    with _lock:
+        loader = _shared('loader', _new_loader)
+        created = _instances.setdefault('loader_created', time.monotonic())
+        if not loader.connected and not loader.connecting and time.monotonic() - created > LOADER_RETRY_SECONDS:
+            loader = _new_loader()
+            _instances['loader'] = loader
+            _instances['loader_created'] = time.monotonic()
+        return loader
+
+def get_writer():
+    """Shared write-behind writer for signal logs and performance stats."""
+    return _shared('writer', lambda: WriteBehindWriter(get_database()))
+
+def reset():
+    """Drops all shared instances (tests and benchmarks)."""
+    with _lock:
+        _instances.clear()
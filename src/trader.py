@@ -1,5 +1,6 @@
 import pandas as pd
 from datetime import datetime
+from src.metrics import timed
 
 class Trader:
     def __init__(self, initial_capital=10000):
@@ -8,8 +9,10 @@ class Trader:
         self.trades = []
         self.position = None # Current position: None, 'LONG'
         self.entry_price = 0
+        self.entry_time = None
         self.stop_loss = 0
         self.take_profit = 0
+        self.equity_curve = pd.Series(dtype=float)
         
         # Risk Params
         self.risk_per_trade = 0.10 # 10% of portfolio
@@ -59,6 +62,8 @@ class Trader:
                         'symbol': symbol,
                         'action': 'SELL',
                         'price': current_price,
+                        'entry_time': self.entry_time,
+                        'entry_price': self.entry_price,
                         'amount': amount,
                         'reason': reason,
                         'profit_pct': profit,
@@ -80,6 +85,7 @@ class Trader:
                     
                     self.position = 'LONG'
                     self.entry_price = current_price
+                    self.entry_time = timestamp
                     self.stop_loss = current_price * (1 - self.sl_pct)
                     self.take_profit = current_price * (1 + self.tp_pct)
                     
@@ -95,6 +101,46 @@ class Trader:
                     print(f"BOUGHT {coin} at {current_price}. SL: {self.stop_loss}, TP: {self.take_profit}")
         return None
 
+    @timed('backtest', rows=lambda results, self, df, symbol: len(df))
+    def run_backtest(self, df, symbol):
+        """
+        Replays a predicted dataframe (needs 'signal' and 'close') through
+        execute_trade. Returns the closed-trade results in order; the
+        portfolio value after every candle is kept in self.equity_curve.
+        """
+        results = []
+        equity = []
+        for time_idx, signal, close in zip(df.index, df['signal'], df['close']):
+            result = self.execute_trade(signal, symbol, close, time_idx)
+            if result:
+                results.append(result)
+            equity.append(self.get_portfolio_value({symbol: close}))
+        self.equity_curve = pd.Series(equity, index=df.index, dtype=float)
+        return results
+
+    def strategy_key(self, model_version):
+        """Identifies trades of one model with these risk settings in the trade ledger."""
+        return f"{model_version}/{self.risk_per_trade * 100:g}/{self.sl_pct * 100:g}/{self.tp_pct * 100:g}"
+
+    def ledger_rows(self, interval, strategy):
+        """
+        Closed trades as trade ledger rows (see DatabaseManager.log_trades).
+        An open position is not realized yet and is left out.
+        """
+        return [{
+            'symbol': t['symbol'],
+            'interval': interval,
+            'strategy': strategy,
+            'entry_time': pd.Timestamp(t['entry_time']).to_pydatetime(),
+            'exit_time': pd.Timestamp(t['time']).to_pydatetime(),
+            'entry_price': float(t['entry_price']),
+            'exit_price': float(t['price']),
+            'amount': float(t['amount']),
+            'pnl': float(t['pnl']),
+            'profit_pct': float(t['profit_pct']),
+            'reason': t['reason'],
+        } for t in self.trades if t['action'] == 'SELL']
+
     def get_portfolio_value(self, current_prices):
         val = self.portfolio["USDT"]
         for coin, amount in self.portfolio.items():
@@ -0,0 +1,121 @@
+import atexit
+import threading
+import time
+from datetime import datetime
+
+class WriteBehindWriter:
+    """
+    Buffers signal logs and closed trades and writes them to the
+    database in batches from a background thread. A batch is flushed when it
+    reaches max_batch items or max_delay seconds after its first item.
+    Pending writes are flushed on close(), which is registered with atexit.
+    """
+    def __init__(self, db, max_batch=500, max_delay=1.0):
+        self.db = db
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._buffer = []
+        self._first_at = None
+        self._cond = threading.Condition()
+        # Held while a batch is taken from the buffer and written, so flush()
+        # returns only after everything queued before it is in the database
+        self._write_lock = threading.Lock()
+        self._retry = []  # items from a failed batch, retried first
+        self._closed = False
+        self.batches_written = 0
+        self.items_written = 0
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def log_signal(self, symbol, signal, confidence, price, interval, candle_time=None, model_version=None):
+        self._put(('signal', {
+            'timestamp': datetime.utcnow(),
+            'symbol': symbol,
+            'signal': signal,
+            'confidence': float(confidence),
+            'price': float(price),
+            'interval': interval,
+            'candle_time': candle_time,
+            'model_version': model_version
+        }))
+
+    def log_trades(self, rows):
+        """Queues trade ledger rows (see Trader.ledger_rows)."""
+        for row in rows:
+            self._put(('trade', row))
+
+    def _put(self, item):
+        with self._cond:
+            self._buffer.append(item)
+            if self._first_at is None:
+                self._first_at = time.monotonic()
+            closed = self._closed
+            self._cond.notify()
+        if closed:
+            # After shutdown, write through so nothing is lost
+            self.flush()
+
+    def _take(self):
+        with self._cond:
+            batch, self._buffer, self._first_at = self._buffer, [], None
+        return batch
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._closed:
+                    if self._first_at is not None:
+                        due = self._first_at + self.max_delay - time.monotonic()
+                        if len(self._buffer) >= self.max_batch or due <= 0:
+                            break
+                        self._cond.wait(due)
+                    else:
+                        self._cond.wait(0.5)
+                if self._closed:
+                    return
+            self.flush()
+
+    def _write(self, batch):
+        batch = self._retry + batch
+        self._retry = []
+        signals = [payload for kind, payload in batch if kind == 'signal']
+        trades = [payload for kind, payload in batch if kind == 'trade']
+
+        try:
+            self.db.log_signals(signals)
+            signals = []
+            # Trades are booked once and aggregated from the ledger in the database
+            self.db.log_trades(trades)
+        except Exception as e:
+            print(f"Write-behind flush failed, will retry: {e}")
+            # Signals already committed must not be retried
+            self._retry = [('signal', row) for row in signals] + [('trade', row) for row in trades]
+            return False
+
+        self.batches_written += 1
+        self.items_written += len(batch)
+        return True
+
+    def flush(self):
+        """Synchronously writes everything queued so far (read-your-writes)."""
+        with self._write_lock:
+            batch = self._take()
+            if batch or self._retry:
+                return self._write(batch)
+            return True
+
+    def pending(self):
+        with self._cond:
+            return len(self._buffer) + len(self._retry)
+
+    def close(self):
+        """Stops the background thread and flushes all pending writes."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout=5)
+        if not self.flush():
+            print(f"Write-behind: {self.pending()} writes could not be flushed on shutdown.")
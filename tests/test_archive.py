@@ -0,0 +1,136 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'benchmarks')))
+
+import multiprocessing
+import tempfile
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from common import FakeClient
+from src.archive import CandleArchive
+from src.data_loader import BinanceLoader
+from src.database import DatabaseManager
+
+def make_candles(start, periods, base=100.0, freq="h"):
+    index = pd.date_range(start, periods=periods, freq=freq)
+    close = base + np.arange(periods, dtype=float)
+    return pd.DataFrame({'open': close, 'high': close + 1, 'low': close - 1, 'close': close, 'volume': 1.0}, index=index)
+
+def test_append_grow_and_range_read():
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = CandleArchive(tmp)
+        archive.append("BTCUSDT", "1h", make_candles("2024-01-01", 3000))
+        archive.append("BTCUSDT", "1h", make_candles("2024-05-05", 10, base=5000.0))
+
+        info = archive.info("BTCUSDT", "1h")
+        assert info['rows'] == 3010 and info['sorted']
+
+        df = archive.read("BTCUSDT", "1h", start="2024-01-02", end="2024-01-03")
+        assert len(df) == 24
+        assert df.index[0] == pd.Timestamp("2024-01-02")
+        assert df['close'].iloc[0] == 124.0
+
+        ts, cols = archive.arrays("BTCUSDT", "1h")
+        assert isinstance(ts, np.memmap) and isinstance(cols['close'], np.memmap)
+
+def test_unsorted_append_then_compact():
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = CandleArchive(tmp)
+        archive.append("ETHUSDT", "1h", make_candles("2024-01-01", 48))
+        # Overlapping rewrite of the last day: last write wins
+        archive.append("ETHUSDT", "1h", make_candles("2024-01-02", 24, base=900.0))
+        assert not archive.info("ETHUSDT", "1h")['sorted']
+
+        df = archive.read("ETHUSDT", "1h")
+        assert len(df) == 48 and df['close'].iloc[-1] == 923.0
+
+        assert archive.compact("ETHUSDT", "1h") > 0
+        info = archive.info("ETHUSDT", "1h")
+        assert info['sorted'] and info['rows'] == info['capacity'] == 48
+        assert archive.read("ETHUSDT", "1h").equals(df)
+
+def test_sql_round_trip():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(db_url=f"sqlite:///{os.path.join(tmp, 'store.db')}")
+        db.save_ohlcv("SOLUSDT", "1h", make_candles("2024-01-01", 50))
+        archive = CandleArchive(os.path.join(tmp, "archive"))
+
+        assert archive.import_from_db(db, "SOLUSDT", "1h") == 50
+        assert archive.import_from_db(db, "SOLUSDT", "1h") == 0
+
+        db.clear_ohlcv()
+        assert archive.export_to_db(db, "SOLUSDT", "1h") == 50
+        assert len(db.get_ohlcv("SOLUSDT", "1h")) == 50
+        db.engine.dispose()
+
+def append_hours(root, first, step, count):
+    """One process of the concurrent-writer test: `count` single-candle appends."""
+    archive = CandleArchive(root)
+    start = pd.Timestamp("2024-01-01")
+    for i in range(first, first + step * count, step):
+        archive.append("BTCUSDT", "1h", make_candles(start + pd.Timedelta(hours=i), 1, base=float(i)))
+        if i % 50 == first:
+            archive.compact("BTCUSDT", "1h")
+
+def test_concurrent_processes_do_not_lose_rows():
+    with tempfile.TemporaryDirectory() as tmp:
+        # Like the app and the headless scanner writing the same archive
+        context = multiprocessing.get_context("spawn")
+        writers = [context.Process(target=append_hours, args=(tmp, first, 2, 300)) for first in (0, 1)]
+        for p in writers: p.start()
+        for p in writers: p.join()
+        assert all(p.exitcode == 0 for p in writers)
+
+        df = CandleArchive(tmp).read("BTCUSDT", "1h")
+        assert len(df) == 600 and df.index.is_unique
+        assert (df['close'].to_numpy() == np.arange(600)).all()
+
+def test_candle_forming_at_a_fetch_is_archived_once_final():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(db_url=f"sqlite:///{os.path.join(tmp, 'store.db')}")
+        archive = CandleArchive(os.path.join(tmp, "archive"))
+        loader = BinanceLoader(client=FakeClient(latency=0), db=db, archive=archive)
+        now = pd.Timestamp(datetime.utcnow()).floor("15min")
+        candles = make_candles(now - timedelta(minutes=15 * 200), 200, freq="15min")
+
+        # 1. A fetch 5 minutes into candle 149 stores it while forming
+        first = candles.iloc[:150].copy()
+        first.iloc[-1, first.columns.get_loc('close')] = -1.0
+        loader._save("BTCUSDT", "15m", first, fetched_at=(first.index[-1] + timedelta(minutes=5)).to_pydatetime())
+        assert archive.last_timestamp("BTCUSDT", "15m") == candles.index[148]
+        # 2. The next fetch refetches from it and archives its final values
+        loader._save("BTCUSDT", "15m", candles.iloc[149:], replace_from=candles.index[149])
+
+        stored = loader._read_stored("BTCUSDT", "15m", 3)
+        assert (stored.index.to_series().diff().dropna() == pd.Timedelta(minutes=15)).all()
+        assert archive.read("BTCUSDT", "15m").equals(candles) and stored.equals(candles)
+        db.engine.dispose()
+        db.read_engine.dispose()
+
+def test_sql_rows_fill_holes_in_the_archive():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(db_url=f"sqlite:///{os.path.join(tmp, 'store.db')}")
+        archive = CandleArchive(os.path.join(tmp, "archive"))
+        loader = BinanceLoader(client=FakeClient(latency=0), db=db, archive=archive)
+        now = pd.Timestamp(datetime.utcnow()).floor("h")
+        candles = make_candles(now - timedelta(hours=100), 100)
+        db.save_ohlcv("BTCUSDT", "1h", candles)
+        # Rows the archive never received, e.g. gaps filled later from the exchange
+        archive.append("BTCUSDT", "1h", candles.drop(candles.index[[20, 21, 60]]))
+
+        stored = loader._read_stored("BTCUSDT", "1h", 10)
+        assert stored.equals(candles)
+        db.engine.dispose()
+        db.read_engine.dispose()
+
+if __name__ == "__main__":
+    test_append_grow_and_range_read()
+    test_unsorted_append_then_compact()
+    test_sql_round_trip()
+    test_concurrent_processes_do_not_lose_rows()
+    test_candle_forming_at_a_fetch_is_archived_once_final()
+    test_sql_rows_fill_holes_in_the_archive()
@@ -0,0 +1,129 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'benchmarks')))
+
+import tempfile
+import zipfile
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from common import FakeClient
+from src.archive import CandleArchive
+from src.candle_io import import_file, export_candles, to_timestamps
+from src.data_loader import BinanceLoader
+from src.database import DatabaseManager
+
+HOUR_MS = 3_600_000
+START_MS = 1_704_067_200_000  # 2024-01-01
+
+def kline_lines(n, micro_from=None):
+    """Binance dump rows; from row micro_from on, times are in µs like 2025+ spot dumps."""
+    lines = []
+    for i in range(n):
+        t = START_MS + i * HOUR_MS
+        scale = 1000 if micro_from is not None and i >= micro_from else 1
+        price = 100 + i
+        lines.append(f"{t * scale},{price},{price + 1},{price - 1},{price + 0.5},{10 + i},"
+                     f"{(t + HOUR_MS - 1) * scale},1000,5,1,100,0")
+    return lines
+
+def test_epoch_units_are_detected_per_value():
+    stamps = to_timestamps([1_704_067_200, 1_704_067_200_000, 1_704_067_200_000_000, 1_704_067_200_000_000_000])
+    assert (stamps == pd.Timestamp("2024-01-01")).all()
+    assert (to_timestamps(["2024-01-01T00:00:00Z"]) == pd.Timestamp("2024-01-01")).all()
+
+def test_binance_dump_import_validates_and_dedupes():
+    with tempfile.TemporaryDirectory() as tmp:
+        lines = kline_lines(250, micro_from=200)
+        lines[10] = lines[10].replace(",110,111,", ",110,100,")  # high below open
+        lines[20] = lines[20].replace(",120,", ",-120,", 1)      # negative price
+        lines.append(lines[5])                                    # repeated row
+        path = os.path.join(tmp, "BTCUSDT-1h-2024-01.zip")
+        with zipfile.ZipFile(path, "w") as z:
+            z.writestr("BTCUSDT-1h-2024-01.csv", "\n".join(lines) + "\n")
+
+        db = DatabaseManager(db_url=f"sqlite:///{os.path.join(tmp, 'seed.db')}")
+        seen = []
+        stats = import_file(db, path, chunk_size=64, progress=lambda s: seen.append(s['rows']))
+        assert (stats['symbol'], stats['interval']) == ("BTCUSDT", "1h")
+        assert stats['rows'] == 251 and stats['inserted'] == 248 and stats['duplicates'] == 1
+        assert stats['rejected'] == {'non-positive price': 1, 'high/low outside open/close': 1}
+        assert seen == [64, 128, 192, 251]
+
+        stored = db.get_ohlcv("BTCUSDT", "1h", limit=None)
+        assert len(stored) == 248 and stored.index.is_unique
+        assert stored.index[-1] == pd.Timestamp("2024-01-11 09:00")  # µs rows land on the same grid
+
+        # Re-importing the same dump inserts nothing
+        assert import_file(db, path)['inserted'] == 0
+        db.engine.dispose()
+        db.read_engine.dispose()
+
+def test_export_round_trips_through_csv_binance_and_parquet():
+    with tempfile.TemporaryDirectory() as tmp:
+        source = DatabaseManager(db_url=f"sqlite:///{os.path.join(tmp, 'source.db')}")
+        index = pd.date_range("2024-01-01", periods=500, freq="15min")
+        close = np.linspace(100, 200, len(index))
+        source.save_ohlcv("ETHUSDT", "15m", pd.DataFrame(
+            {'open': close, 'high': close + 1, 'low': close - 1, 'close': close, 'volume': 1.0}, index=index))
+        expected = source.get_ohlcv("ETHUSDT", "15m", limit=None)
+
+        for name, fmt in [("eth.csv", None), ("ETHUSDT-15m-dump.csv", "binance"), ("eth.parquet", None)]:
+            path = os.path.join(tmp, name)
+            assert export_candles(source, "ETHUSDT", "15m", path, fmt, chunk_size=128)['rows'] == 500
+            target = DatabaseManager(db_url=f"sqlite:///{os.path.join(tmp, name + '.db')}")
+            assert import_file(target, path, "ETHUSDT", "15m")['inserted'] == 500
+            pd.testing.assert_frame_equal(target.get_ohlcv("ETHUSDT", "15m", limit=None), expected, check_freq=False)
+            target.engine.dispose()
+            target.read_engine.dispose()
+        source.engine.dispose()
+        source.read_engine.dispose()
+
+def test_imported_history_before_the_archive_is_read():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(db_url=f"sqlite:///{os.path.join(tmp, 'seed.db')}")
+        archive = CandleArchive(os.path.join(tmp, "archive"))
+        now = pd.Timestamp(datetime.utcnow()).floor("h")
+        index = pd.date_range(now - timedelta(days=400), now - timedelta(hours=1), freq="h")
+        close = 100 + np.arange(len(index)) % 50
+        candles = pd.DataFrame({'open': close, 'high': close + 1, 'low': close - 1, 'close': close,
+                                'volume': 1.0}, index=index.rename('timestamp'))
+        # The app has archived the last 20 days; 400 days are then imported offline
+        archive.append("BTCUSDT", "1h", candles[candles.index >= now - timedelta(days=20)])
+        path = os.path.join(tmp, "btc.csv")
+        candles.to_csv(path)
+        import_file(db, path, symbol="BTCUSDT", interval="1h")
+
+        loader = BinanceLoader(client=FakeClient(latency=0), db=db, archive=archive)
+        stored = loader._read_stored("BTCUSDT", "1h", 365)
+        assert len(stored) >= 365 * 24 - 1 and stored.index.is_monotonic_increasing and stored.index.is_unique
+        db.engine.dispose()
+        db.read_engine.dispose()
+
+def test_imports_on_the_fallback_are_not_journaled():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "BTCUSDT-1h-2024-01.csv")
+        with open(path, "w") as f:
+            f.write("\n".join(kline_lines(300)) + "\n")
+        db = DatabaseManager(db_url=f"sqlite:///{os.path.join(tmp, 'fallback.db')}")
+        db.fallback_active = True  # as if MySQL had been unreachable
+
+        assert import_file(db, path, chunk_size=64)['inserted'] == 300
+        assert db.health_state()['pending_replay'] == 0
+        # Writes made by the app on the fallback are still queued for MySQL
+        db.save_ohlcv("ETHUSDT", "1h", db.get_ohlcv("BTCUSDT", "1h", limit=10))
+        assert db.health_state()['pending_replay'] == 1
+        db.engine.dispose()
+        db.read_engine.dispose()
+        db.outbox_engine.dispose()
+
+if __name__ == "__main__":
+    test_epoch_units_are_detected_per_value()
+    test_binance_dump_import_validates_and_dedupes()
+    test_export_round_trips_through_csv_binance_and_parquet()
+    test_imported_history_before_the_archive_is_read()
+    test_imports_on_the_fallback_are_not_journaled()
+    print("Candle import/export tests passed.")
@@ -0,0 +1,62 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+
+from src import charting
+
+def candles(n, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    df = pd.DataFrame({'open': close, 'high': close * 1.01, 'low': close * 0.99, 'close': close,
+                       'volume': rng.uniform(1, 2, n)}, index=pd.date_range("2024-01-01", periods=n, freq="15min"))
+    df['sma_20'] = df['close'].rolling(20).mean()
+    return df
+
+def test_ohlc_buckets_keep_extremes():
+    df = candles(10_000)
+    df.iloc[1234, df.columns.get_loc('high')] = 1e6
+    merged = charting.bucket_ohlc(df, 500)
+    assert len(merged) <= 500
+    assert merged['high'].max() == 1e6 and merged['low'].min() == df['low'].min()
+    assert merged['open'].iloc[0] == df['open'].iloc[0] and merged['close'].iloc[-1] == df['close'].iloc[-1]
+    assert np.isclose(merged['volume'].sum(), df['volume'].sum())
+    assert len(charting.bucket_ohlc(df.iloc[:100], 500)) == 100
+
+def test_lttb_keeps_endpoints_and_spikes():
+    y = np.sin(np.linspace(0, 20, 50_000))
+    y[31_337] = 50.0
+    kept = charting.lttb(np.arange(len(y)), y, 800)
+    assert len(kept) == 800 and kept[0] == 0 and kept[-1] == len(y) - 1
+    assert (np.diff(kept) > 0).all() and 31_337 in kept
+    assert len(charting.lttb(np.arange(10), np.arange(10), 800)) == 10
+
+def test_markers_cluster_per_bucket():
+    starts = pd.date_range("2024-01-01", periods=3, freq="1D").to_numpy()
+    times = pd.to_datetime(["2024-01-01 01:00", "2024-01-01 05:00", "2024-01-03 02:00"]).to_numpy()
+    markers = charting.cluster_markers(times, [10.0, 20.0, 30.0], starts)
+    assert list(markers['count']) == [2, 1]
+    assert list(markers['y']) == [15.0, 30.0]
+    assert markers['x'].iloc[1] == starts[2]
+
+def test_payload_is_bounded_and_zoom_is_full_resolution():
+    df = candles(100_000)
+    signals = df[['close']].assign(signal=np.where(np.arange(len(df)) % 7 == 0, 'BUY', 'HOLD'))
+    fig, info = charting.price_chart(df, signals)
+    assert info['rows'] == 100_000 and info['candles'] <= charting.CANDLE_BUDGET
+    assert info['points'] <= charting.CANDLE_BUDGET * 3 + charting.LINE_BUDGET
+    assert fig.data[1].type == 'scattergl'  # the SMA line is above the WebGL threshold
+
+    start, end = df.index[5000], df.index[5299]
+    fig, info = charting.price_chart(df, signals, start, end)
+    assert info['rows'] == info['candles'] == 300 and info['per_bucket'] == 1
+    assert fig.data[1].type == 'scatter' and sum(fig.data[2].customdata) == (signals.loc[start:end, 'signal'] == 'BUY').sum()
+
+if __name__ == "__main__":
+    test_ohlc_buckets_keep_extremes()
+    test_lttb_keeps_endpoints_and_spikes()
+    test_markers_cluster_per_bucket()
+    test_payload_is_bounded_and_zoom_is_full_resolution()
+    print("Charting tests passed.")
@@ -0,0 +1,69 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from src.correlation import RollingCorrelation, add_market_features
+from src.database import DatabaseManager
+
+def make_closes(symbols, n, seed=11):
+    rng = np.random.default_rng(seed)
+    market = rng.normal(0, 0.01, n)
+    index = pd.date_range("2024-01-01", periods=n, freq="h")
+    return pd.DataFrame({
+        s: 100 * np.exp(np.cumsum((i + 1) * 0.5 * market + rng.normal(0, 0.005, n)))
+        for i, s in enumerate(symbols)
+    }, index=index)
+
+def test_incremental_matches_full_recompute():
+    rng = np.random.default_rng(5)
+    returns = rng.normal(0, 0.01, (500, 4))
+    rolling = RollingCorrelation(["BTCUSDT", "A", "B", "C"], window=50)
+    # Uneven batches, wrapping the ring buffer several times
+    for start, stop in [(0, 7), (7, 40), (40, 41), (41, 130), (130, 500)]:
+        rolling.extend(returns[start:stop])
+        window = returns[max(0, stop - 50):stop]
+        assert np.allclose(rolling.correlation().values, np.corrcoef(window.T))
+        cov = np.cov(window.T)
+        assert np.allclose(rolling.betas().values, cov[:, 0] / cov[0, 0])
+
+def test_refresh_reads_only_new_candles_from_store():
+    symbols = ["BTCUSDT", "ETHUSDT", "SOLUSDT"]
+    closes = make_closes(symbols, 300)
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(db_url=f"sqlite:///{os.path.join(tmp, 'corr.db')}")
+
+        def store(rows):
+            for s in symbols:
+                c = closes[s].iloc[rows]
+                db.save_ohlcv(s, "1h", pd.DataFrame({'open': c, 'high': c, 'low': c, 'close': c, 'volume': 1.0}))
+
+        store(slice(0, 250))
+        rolling = RollingCorrelation(symbols, window=100)
+        assert rolling.refresh(db, "1h") == 100
+        store(slice(250, 300))
+        assert rolling.refresh(db, "1h") == 50
+        assert rolling.refresh(db, "1h") == 0
+
+        expected = np.log(closes).diff().iloc[-100:]
+        assert np.allclose(rolling.correlation().values, expected.corr().values)
+        assert np.isclose(rolling.betas()['BTCUSDT'], 1.0)
+        db.engine.dispose()
+
+def test_market_features_against_itself():
+    closes = make_closes(["BTCUSDT"], 200)
+    df = pd.DataFrame({'close': closes['BTCUSDT']})
+    out = add_market_features(df.copy(), df, window=50)
+    assert np.allclose(out['corr_btc'].iloc[30:], 1.0)
+    assert np.allclose(out['beta_btc'].iloc[30:], 1.0)
+    assert (out['corr_btc'].iloc[:20] == 0).all()
+
+if __name__ == "__main__":
+    test_incremental_matches_full_recompute()
+    test_refresh_reads_only_new_candles_from_store()
+    test_market_features_against_itself()
+    print("Correlation tests passed.")
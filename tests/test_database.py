@@ -0,0 +1,325 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from sqlalchemy import create_engine, event
+
+from src import database
+from src.database import Base, DatabaseManager, DatabaseHealthMonitor, TradeLedger
+from src.trader import Trader
+from src.writer import WriteBehindWriter
+
+def fallback_db(tmp):
+    """A manager that behaves as if it fell back to SQLite."""
+    db = DatabaseManager(db_url=f"sqlite:///{os.path.join(tmp, 'fallback.db')}")
+    db.db_url = None
+    db.fallback_active = True
+    db.connection_type = "SQLite (Local)"
+    return db
+
+def test_fallback_writes_replay_on_upgrade():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = fallback_db(tmp)
+        db.log_signal("BTCUSDT", "BUY", 0.8, 100.0, "1h")
+        db.save_setting("lookback", 60)
+        assert db.health_state()['pending_replay'] == 2
+        db.engine.dispose()
+        db.read_engine.dispose()
+
+        # The outbox is in the SQLite file: a restart during the outage keeps it
+        db = fallback_db(tmp)
+        assert db.health_state()['pending_replay'] == 2
+
+        def connect_mysql():
+            engine = create_engine(f"sqlite:///{os.path.join(tmp, 'primary.db')}")
+            Base.metadata.create_all(engine)
+            return engine
+        db._connect_mysql = connect_mysql
+
+        generation = db.generation
+        assert db.upgrade_to_mysql()
+        assert db.connection_type == "MySQL"
+        assert db.generation == generation + 1
+        assert db.get_settings() == {"lookback": 60.0}
+        assert db.get_stats()["signals"] == 1
+        assert db.health_state()['pending_replay'] == 0
+        db.engine.dispose()
+
+def test_full_outbox_drops_oldest_writes():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = fallback_db(tmp)
+        db.MAX_FALLBACK_WRITES = 3
+        for value in range(5):
+            db.save_setting("lookback", value)
+        state = db.health_state()
+        assert state['pending_replay'] == 3 and state['dropped_writes'] == 2
+
+        db.fallback_active = False
+        replayed = []
+        db.save_setting = lambda key, value: replayed.append(value)
+        assert db.replay_fallback_writes() == 3
+        assert replayed == [2, 3, 4]
+        db.engine.dispose()
+        db.read_engine.dispose()
+
+def test_deferred_probe_uses_healthy_mysql_from_the_first_session():
+    with tempfile.TemporaryDirectory() as tmp:
+        def connect_mysql(self):
+            time.sleep(0.2)
+            engine = create_engine(f"sqlite:///{os.path.join(tmp, 'primary.db')}")
+            Base.metadata.create_all(engine)
+            return engine
+        sqlite_path, original_connect = database.SQLITE_PATH, DatabaseManager._connect_mysql
+        database.SQLITE_PATH = os.path.join(tmp, 'local.db')
+        DatabaseManager._connect_mysql = connect_mysql
+        try:
+            db = DatabaseManager(defer_probe=True)
+            # The first write waits for the background probe instead of going to SQLite
+            db.save_setting("lookback", 60)
+            assert db.connection_type == "MySQL"
+            assert db.health_state()['pending_replay'] == 0
+            assert db.get_settings() == {"lookback": 60.0}
+            db.monitor.stop()
+            db.engine.dispose()
+            db.outbox_engine.dispose()
+        finally:
+            database.SQLITE_PATH, DatabaseManager._connect_mysql = sqlite_path, original_connect
+
+def test_monitor_backs_off_while_unreachable():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = fallback_db(tmp)
+        def unreachable():
+            raise ConnectionError("down")
+        db._connect_mysql = unreachable
+
+        monitor = DatabaseHealthMonitor(db, base_delay=1, max_delay=4)
+        delays = []
+        for _ in range(4):
+            assert not monitor.probe()
+            delays.append(monitor._delay())
+        assert delays == [1, 2, 4, 4]
+        assert db.connection_type == "SQLite (Local)"
+        db.engine.dispose()
+
+def trade(symbol, hour, pnl, strategy="v1"):
+    entry = datetime(2024, 1, 1) + timedelta(hours=hour)
+    return {'symbol': symbol, 'interval': "1h", 'strategy': strategy, 'entry_time': entry,
+            'exit_time': entry + timedelta(hours=1), 'exit_price': 100.0 + pnl, 'pnl': pnl}
+
+def test_write_behind_batches_and_aggregates():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(db_url=f"sqlite:///{os.path.join(tmp, 'writer.db')}")
+        db.log_trades([trade("BTCUSDT", 0, 10.0)])
+
+        writer = WriteBehindWriter(db, max_batch=1000, max_delay=60)
+        writer.log_trades([trade("BTCUSDT", hour, pnl) for hour, pnl in [(2, 5.0), (4, -2.0), (6, 3.0)]])
+        writer.log_trades([trade("ETHUSDT", 0, -1.0)])
+        writer.log_signal("BTCUSDT", "BUY", 0.7, 100.0, "1h")
+        assert writer.pending() == 5
+
+        writer.close()
+        assert writer.pending() == 0
+        assert writer.batches_written == 1
+
+        perf = db.get_performance().set_index('Symbol')
+        assert perf.loc['BTCUSDT', 'Trades'] == 4
+        assert perf.loc['BTCUSDT', 'Wins'] == 3
+        assert perf.loc['BTCUSDT', 'P/L ($)'] == 16.0
+        assert perf.loc['BTCUSDT', 'Win Rate (%)'] == 75.0
+        assert perf.loc['ETHUSDT', 'Losses'] == 1
+        assert db.get_stats()["signals"] == 1
+        db.engine.dispose()
+
+def test_trade_ledger_is_booked_once_and_aggregated_incrementally():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(db_url=f"sqlite:///{os.path.join(tmp, 'ledger.db')}")
+        backtest = [trade("BTCUSDT", 2 * i, pnl) for i, pnl in enumerate([10.0, -4.0, -8.0, 6.0, 20.0])]
+        db.log_trades(backtest)
+        # Replaying the same backtest (e.g. on a rerun) books nothing new
+        db.log_trades(backtest)
+        # Another risk setting on the same candles is a different strategy
+        db.log_trades([trade("BTCUSDT", 0, 1.0, strategy="v1/20")])
+        assert db.get_stats()["trades"] == 6
+
+        # Aggregated per strategy, not mixed into one curve per symbol
+        perf = db.get_performance().set_index(['Symbol', 'Interval', 'Strategy'])
+        assert perf.loc[('BTCUSDT', '1h', 'v1/20'), 'Trades'] == 1
+        v1 = perf.loc[('BTCUSDT', '1h', 'v1')]
+        assert v1['Trades'] == 5 and v1['P/L ($)'] == 24.0
+        assert v1['Profit Factor'] == 3.0
+        assert v1['Max Drawdown ($)'] == 12.0 and v1['Drawdown ($)'] == 0.0
+
+        equity = db.get_equity_curve("BTCUSDT", "1h", "v1")
+        assert equity.tolist() == [10.0, 6.0, -2.0, 4.0, 24.0]
+        assert db.get_equity_curve("BTCUSDT", "1h", "v1", limit=2).tolist() == [4.0, 24.0]
+
+        # Aggregates only move past the watermark: nothing is re-read or re-applied
+        assert db.refresh_trade_stats() == 0
+        session = db.get_write_session()
+        try:
+            session.execute(TradeLedger.__table__.insert(), [trade("ETHUSDT", 0, -3.0)])
+            session.commit()
+        finally:
+            session.close()
+        assert db.refresh_trade_stats() == 1
+        assert db.get_performance().set_index('Symbol').loc['ETHUSDT', 'Max Drawdown ($)'] == 3.0
+
+        assert db.clear_performance()
+        assert db.get_performance().empty and db.get_stats()["trades"] == 0
+        db.engine.dispose()
+        db.read_engine.dispose()
+
+def test_shifted_backtest_windows_do_not_book_overlapping_trades():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(db_url=f"sqlite:///{os.path.join(tmp, 'shifted.db')}")
+        db.log_trades([trade("BTCUSDT", hour, 1.0) for hour in (0, 2, 4)])
+        # Retrained over a window starting an hour later: the same moves are
+        # traded again an hour apart, and one new trade follows the last exit
+        db.log_trades([trade("BTCUSDT", hour, 1.0) for hour in (1, 3, 5, 7)])
+        # Two overlapping runs queued in one write-behind batch
+        writer = WriteBehindWriter(db, max_batch=1000, max_delay=60)
+        writer.log_trades([trade("BTCUSDT", hour, 1.0) for hour in (9, 11)])
+        writer.log_trades([trade("BTCUSDT", hour, 1.0) for hour in (10, 12, 14)])
+        writer.close()
+
+        assert db.get_stats()["trades"] == 7
+        equity = db.get_equity_curve("BTCUSDT", "1h", "v1")
+        assert equity.index.is_monotonic_increasing
+        assert [t.hour for t in equity.index] == [1, 3, 5, 8, 10, 12, 15]
+        db.engine.dispose()
+        db.read_engine.dispose()
+
+def test_ledger_rows_committed_out_of_id_order_are_applied():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(db_url=f"sqlite:///{os.path.join(tmp, 'ids.db')}")
+        db.log_trades([{**trade("BTCUSDT", 0, 1.0), 'id': 100}])
+        # MySQL assigns ids at insert: a row with a lower id can commit after
+        # higher ones of another strategy were aggregated
+        session = db.get_write_session()
+        try:
+            session.execute(TradeLedger.__table__.insert(), [{**trade("ETHUSDT", 0, -2.0), 'id': 50}])
+            session.commit()
+        finally:
+            session.close()
+        db.log_trades([trade("BTCUSDT", 2, 1.0)])
+        assert db.refresh_trade_stats() == 1
+        perf = db.get_performance().set_index('Symbol')
+        assert perf.loc['ETHUSDT', 'P/L ($)'] == -2.0 and perf.loc['BTCUSDT', 'Trades'] == 2
+        assert db.refresh_trade_stats() == 0
+        db.engine.dispose()
+        db.read_engine.dispose()
+
+def test_first_booking_of_a_strategy_locks_a_stats_row():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(db_url=f"sqlite:///{os.path.join(tmp, 'first.db')}")
+        statements = []
+        event.listen(db.engine, "before_cursor_execute",
+                     lambda conn, cursor, statement, *args: statements.append(statement.split("(")[0].strip()))
+
+        # Two writers booking overlapping runs of a new strategy at once
+        runs = [[trade("BTCUSDT", hour, 1.0) for hour in hours] for hours in ([0, 2, 4], [1, 3, 5])]
+        threads = [threading.Thread(target=db.log_trades, args=(run,)) for run in runs]
+        for t in threads: t.start()
+        for t in threads: t.join()
+
+        # The stats row exists before the ledger insert, so there is a row to lock
+        inserts = [s for s in statements if s.startswith("INSERT")]
+        assert inserts[:2] == ["INSERT OR IGNORE INTO strategy_stats", "INSERT OR IGNORE INTO trade_ledger"]
+        assert inserts.count("INSERT OR IGNORE INTO strategy_stats") == 1
+        assert db.get_stats()["trades"] == 3 and db.get_stats()["performance"] == 1
+        assert db.get_performance().loc[0, 'Trades'] == 3
+        db.engine.dispose()
+        db.read_engine.dispose()
+
+def test_backtest_reruns_are_not_double_counted():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(db_url=f"sqlite:///{os.path.join(tmp, 'rerun.db')}")
+        index = pd.date_range("2024-01-01", periods=8, freq="1h")
+        df = pd.DataFrame({'close': [100, 101, 106, 104, 103, 97, 99, 100],
+                           'signal': ["BUY", "HOLD", "HOLD", "BUY", "SELL", "BUY", "HOLD", "HOLD"]}, index=index)
+        for _ in range(3):
+            trader = Trader()
+            results = trader.run_backtest(df, "BTCUSDT")
+            db.log_trades(trader.ledger_rows("1h", trader.strategy_key("abc")))
+
+        # Two round trips closed; the position opened at 97 is still open
+        perf = db.get_performance().set_index('Symbol')
+        assert len(results) == 2 and perf.loc['BTCUSDT', 'Trades'] == 2
+        assert perf.loc['BTCUSDT', 'P/L ($)'] == round(sum(r['pnl'] for r in results), 2)
+        db.engine.dispose()
+        db.read_engine.dispose()
+
+def test_tuned_sqlite_uses_wal_and_read_only_readers():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(db_url=f"sqlite:///{os.path.join(tmp, 'tuned.db')}")
+        with db.engine.connect() as conn:
+            assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        with db.read_engine.connect() as conn:
+            assert conn.exec_driver_sql("PRAGMA query_only").scalar() == 1
+
+        db.save_setting("sl_pct", 2.0)
+        assert db.get_settings() == {"sl_pct": 2.0}
+        db.engine.dispose()
+        db.read_engine.dispose()
+
+def test_signal_outcomes_and_keyset_history():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(db_url=f"sqlite:///{os.path.join(tmp, 'outcomes.db')}")
+        start = datetime(2024, 1, 1)
+        index = pd.date_range(start, periods=10, freq='1h')
+        closes = [100, 101, 102, 101, 99, 98, 99, 100, 101, 102]
+        db.save_ohlcv("BTCUSDT", "1h", pd.DataFrame(
+            {'open': closes, 'high': closes, 'low': closes, 'close': closes, 'volume': 1.0}, index=index))
+
+        hour = timedelta(hours=1)
+        db.log_signals([
+            # Scored against the next candle's close
+            {'timestamp': start, 'symbol': "BTCUSDT", 'interval': "1h", 'signal': "BUY", 'confidence': 0.72, 'price': 100.0},  # 101: hit
+            {'timestamp': start + 2 * hour, 'symbol': "BTCUSDT", 'interval': "1h", 'signal': "BUY", 'confidence': 0.75, 'price': 102.0},  # 101: miss
+            {'timestamp': start + 3 * hour, 'symbol': "BTCUSDT", 'interval': "1h", 'signal': "SELL", 'confidence': 0.55, 'price': 101.0},  # 99: hit
+            {'timestamp': start + 5 * hour, 'symbol': "BTCUSDT", 'interval': "1h", 'signal': "HOLD", 'confidence': 0.90, 'price': 98.0},
+            {'timestamp': start + 9 * hour, 'symbol': "BTCUSDT", 'interval': "1h", 'signal': "BUY", 'confidence': 1.0, 'price': 102.0},  # no next candle
+        ])
+
+        outcomes = db.get_signal_outcomes(horizon=1).set_index('Confidence')
+        assert list(outcomes.index) == ["90-100%", "70-80%", "50-60%"]
+        assert outcomes.loc["70-80%", 'Signals'] == 2 and outcomes.loc["70-80%", 'Hit Rate (%)'] == 50.0
+        assert outcomes.loc["50-60%", 'Hit Rate (%)'] == 100.0
+        assert outcomes.loc["90-100%", 'Scored'] == 0 and pd.isna(outcomes.loc["90-100%", 'Hit Rate (%)'])
+        # Three candles later: 100 -> 99, 102 -> 98, SELL 101 -> 99
+        later = db.get_signal_outcomes(horizon=3, since=start + hour).set_index('Confidence')
+        assert later.loc["70-80%", 'Hit Rate (%)'] == 0.0 and later.loc["50-60%", 'Hit Rate (%)'] == 100.0
+
+        pages, cursor = [], None
+        while True:
+            page, cursor = db.get_signal_history(limit=2, cursor=cursor)
+            pages.append(page)
+            if cursor is None:
+                break
+        assert [len(p) for p in pages] == [2, 2, 1]
+        times = pd.concat(pages)['Time']
+        assert times.is_monotonic_decreasing and times.is_unique
+        assert pages[-1].iloc[0]['Forward Return (%)'] == 1.0
+        db.engine.dispose()
+        db.read_engine.dispose()
+
+if __name__ == "__main__":
+    test_fallback_writes_replay_on_upgrade()
+    test_full_outbox_drops_oldest_writes()
+    test_deferred_probe_uses_healthy_mysql_from_the_first_session()
+    test_monitor_backs_off_while_unreachable()
+    test_write_behind_batches_and_aggregates()
+    test_trade_ledger_is_booked_once_and_aggregated_incrementally()
+    test_shifted_backtest_windows_do_not_book_overlapping_trades()
+    test_ledger_rows_committed_out_of_id_order_are_applied()
+    test_first_booking_of_a_strategy_locks_a_stats_row()
+    test_backtest_reruns_are_not_double_counted()
+    test_tuned_sqlite_uses_wal_and_read_only_readers()
+    test_signal_outcomes_and_keyset_history()
@@ -0,0 +1,66 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+
+from src.features import FeatureEngineer, INDICATOR_COLUMNS
+from src.model import SignalModel
+
+def make_candles(n=400, seed=7):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    index = pd.date_range("2024-01-01", periods=n, freq="h")
+    return pd.DataFrame({
+        'open': close, 'high': close * 1.01, 'low': close * 0.99,
+        'close': close, 'volume': rng.uniform(100, 200, n)
+    }, index=index)
+
+def test_multi_horizon_labels_match_single_pass():
+    fe = FeatureEngineer()
+    df = make_candles()
+    multi = fe.create_multi_horizon_labels(df, horizons=[1, 4], thresholds=[0.005, 0.01])
+
+    for h in [1, 4]:
+        for thr in [0.005, 0.01]:
+            single = fe.create_labels(df.copy(), horizon=h, threshold=thr)
+            assert np.array_equal(multi[fe.target_column(h, thr)].to_numpy(), single['target'].to_numpy())
+            assert np.allclose(multi[fe.return_column(h)], single['return'], equal_nan=True)
+
+def test_per_horizon_heads():
+    fe = FeatureEngineer()
+    df = fe.add_technical_indicators(make_candles())
+    df = fe.create_multi_horizon_labels(df, horizons=[1, 3], thresholds=[0.005])
+
+    model = SignalModel()
+    scores = model.train_horizons(df, [1, 3], threshold=0.005)
+    assert set(scores) == {1, 3}
+
+    df = model.predict_horizons(df)
+    assert {'signal_h1', 'confidence_h3'} <= set(df.columns)
+
+def test_compact_matches_dataframe_path():
+    fe = FeatureEngineer()
+    raw = make_candles()
+    df = fe.create_labels(fe.add_technical_indicators(raw), threshold=0.005).dropna()
+    frame = fe.compact_features(raw, threshold=0.005)
+
+    assert len(frame) == len(df)
+    assert np.array_equal(frame.target, df['target'].to_numpy())
+    assert np.allclose(frame.features(INDICATOR_COLUMNS), df[INDICATOR_COLUMNS].to_numpy(), rtol=1e-5, atol=1e-4)
+
+    model = SignalModel()
+    model.model_path = None  # don't overwrite the app's model.joblib
+    X, y = model.prepare_data(frame)
+    assert X.dtype == np.float32 and y.dtype == np.int8
+    assert np.shares_memory(X, frame.buffer)
+
+    assert model.train(frame) is not None
+    signals, confidence = model.predict_compact(frame)
+    assert len(signals) == len(frame) and set(np.unique(signals)) <= {-1, 0, 1}
+
+if __name__ == "__main__":
+    test_multi_horizon_labels_match_single_pass()
+    test_per_horizon_heads()
+    test_compact_matches_dataframe_path()
@@ -0,0 +1,125 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import sqlite3
+import tempfile
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from src.database import DatabaseManager, SignalDaily
+from src.maintenance import run_maintenance
+from src.model import SignalModel
+
+def test_signal_logs_are_idempotent_per_candle_and_model():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(db_url=f"sqlite:///{os.path.join(tmp, 'idem.db')}")
+        candle = datetime(2024, 1, 1, 12)
+        for _ in range(3):
+            db.log_signal("BTCUSDT", "BUY", 0.7, 100.0, "1h", candle_time=candle, model_version="abc")
+        db.log_signals([
+            {'timestamp': datetime.utcnow(), 'symbol': "BTCUSDT", 'signal': "BUY", 'confidence': 0.7,
+             'price': 100.0, 'interval': "1h", 'candle_time': candle, 'model_version': "abc"},
+            {'timestamp': datetime.utcnow(), 'symbol': "BTCUSDT", 'signal': "SELL", 'confidence': 0.6,
+             'price': 100.0, 'interval': "1h", 'candle_time': candle, 'model_version': "def"},
+        ])
+        # Without a candle key nothing is deduplicated
+        db.log_signal("BTCUSDT", "HOLD", 0.5, 100.0, "1h")
+        db.log_signal("BTCUSDT", "HOLD", 0.5, 100.0, "1h")
+        assert db.get_stats()['signals'] == 4
+
+        # Another sensitivity is another model: its signal for the candle is kept
+        low, high = SignalModel(threshold=0.005).version, SignalModel(threshold=0.01).version
+        assert low != high and low == SignalModel(threshold=0.005).version
+        for version in (low, high):
+            db.log_signal("BTCUSDT", "BUY", 0.7, 100.0, "1h", candle_time=candle, model_version=version)
+        assert db.get_stats()['signals'] == 6
+        db.engine.dispose()
+        db.read_engine.dispose()
+
+def test_legacy_signal_table_is_migrated():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'legacy.db')
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE signal_logs (id INTEGER PRIMARY KEY, timestamp DATETIME, symbol VARCHAR(20), "
+                     "signal VARCHAR(10), confidence FLOAT, price FLOAT, interval VARCHAR(10))")
+        conn.execute("INSERT INTO signal_logs (timestamp, symbol, signal, confidence, price, interval) "
+                     "VALUES ('2024-01-01 00:00:00.000000', 'BTCUSDT', 'BUY', 0.7, 100.0, '1h')")
+        conn.commit()
+        conn.close()
+
+        db = DatabaseManager(db_url=f"sqlite:///{path}")
+        db.log_signal("BTCUSDT", "BUY", 0.7, 100.0, "1h", candle_time=datetime(2024, 1, 1), model_version="abc")
+        db.log_signal("BTCUSDT", "BUY", 0.7, 100.0, "1h", candle_time=datetime(2024, 1, 1), model_version="abc")
+        assert db.get_stats()['signals'] == 2
+        db.engine.dispose()
+        db.read_engine.dispose()
+
+def test_rollup_purges_in_batches_and_reports_space():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(db_url=f"sqlite:///{os.path.join(tmp, 'retention.db')}")
+        now = datetime(2024, 6, 1)
+        rows = []
+        for i in range(500):
+            rows.append({'timestamp': now - timedelta(days=100) + timedelta(hours=i % 48), 'symbol': "BTCUSDT",
+                         'signal': "BUY" if i % 2 else "SELL", 'confidence': 0.5 + (i % 5) / 10,
+                         'price': 100.0 + i, 'interval': "1h", 'candle_time': None, 'model_version': None})
+        rows.append({'timestamp': now - timedelta(days=1), 'symbol': "BTCUSDT", 'signal': "BUY",
+                     'confidence': 0.9, 'price': 1.0, 'interval': "1h"})
+        db.log_signals(rows)
+
+        report = run_maintenance(db, retention_days=90, batch_size=64, vacuum=True, now=now)
+        assert report['rows_purged'] == 500
+        assert report['signals_after'] == 1
+        assert report['reclaimed_bytes'] > 0
+        assert report['file_bytes_after'] < report['file_bytes_before']
+
+        session = db.get_session()
+        try:
+            days = session.query(SignalDaily).all()
+            # 48 hours from a midnight span two days; BUY/SELL each day
+            assert len(days) == 4
+            assert sum(d.signals for d in days) == 500
+            assert min(d.min_price for d in days) == 100.0 and max(d.max_price for d in days) == 599.0
+        finally:
+            session.close()
+
+        # Nothing left past retention: a second run is a no-op
+        assert run_maintenance(db, retention_days=90, now=now)['rows_purged'] == 0
+        db.engine.dispose()
+        db.read_engine.dispose()
+
+def test_outcomes_survive_retention():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(db_url=f"sqlite:///{os.path.join(tmp, 'outcomes.db')}")
+        now = datetime(2024, 6, 1)
+        start = now - timedelta(days=120)
+        index = pd.date_range(start, periods=24 * 25, freq="1h")
+        close = 100 + np.sin(np.arange(len(index)) / 5) * 5
+        db.save_ohlcv("BTCUSDT", "1h", pd.DataFrame({'open': close, 'high': close + 1, 'low': close - 1,
+                                                     'close': close, 'volume': 1.0}, index=index))
+        rows = []
+        for i in range(0, len(index), 7):
+            rows.append({'timestamp': index[i].to_pydatetime() + timedelta(minutes=5), 'symbol': "BTCUSDT",
+                         'signal': "BUY" if i % 2 else "SELL", 'confidence': 0.45 + (i % 5) / 10,
+                         'price': float(close[i]), 'interval': "1h", 'candle_time': index[i].to_pydatetime(),
+                         'model_version': "abc"})
+        db.log_signals(rows)
+
+        since = now - timedelta(days=365)
+        before = {h: db.get_signal_outcomes(horizon=h, since=since) for h in (1, 3)}
+        assert run_maintenance(db, retention_days=90, now=now)['rows_purged'] == len(rows)
+        assert db.get_stats()['signals'] == 0
+        for horizon, frame in before.items():
+            pd.testing.assert_frame_equal(db.get_signal_outcomes(horizon=horizon, since=since), frame)
+        db.engine.dispose()
+        db.read_engine.dispose()
+
+if __name__ == "__main__":
+    test_signal_logs_are_idempotent_per_candle_and_model()
+    test_legacy_signal_table_is_migrated()
+    test_rollup_purges_in_batches_and_reports_space()
+    test_outcomes_survive_retention()
+    print("Maintenance tests passed.")
@@ -0,0 +1,48 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from src.market_scan import MarketScanner
+
+class StubLoader:
+    """Random-walk hourly candles, a different price level and walk per symbol."""
+    def __init__(self, symbols):
+        self.symbols = symbols
+
+    def get_all_symbols(self):
+        return list(self.symbols)
+
+    def get_data(self, symbol, interval, lookback_days):
+        if symbol == "EMPTYUSDT":
+            return pd.DataFrame()
+        rng = np.random.default_rng(zlib.crc32(symbol.encode()))
+        index = pd.date_range("2024-01-01", periods=300, freq="h")
+        close = rng.uniform(1, 1000) * np.exp(np.cumsum(rng.normal(0, 0.01, len(index))))
+        return pd.DataFrame({
+            'open': close, 'high': close * 1.01, 'low': close * 0.99,
+            'close': close, 'volume': rng.uniform(100, 200, len(index))
+        }, index=index)
+
+def test_market_scan_ranks_every_symbol():
+    symbols = [f"C{i:02d}USDT" for i in range(8)] + ["EMPTYUSDT"]
+    for processes in (1, 2):
+        scanner = MarketScanner(StubLoader(symbols), fetch_workers=4, processes=processes)
+        ranked = scanner.scan('1h', lookback=30, threshold=0.005)
+
+        assert sorted(ranked['Symbol']) == symbols[:-1]
+        assert set(scanner.failed) == {"EMPTYUSDT"}
+        assert ranked['Confidence (%)'].between(0, 100).all()
+        # Actionable signals come first, each group by descending confidence
+        actionable = (ranked['Signal'] != 'HOLD').to_numpy()
+        assert not np.any(np.diff(actionable.astype(int)) > 0)
+        for group in (ranked[actionable], ranked[~actionable]):
+            assert group['Confidence (%)'].is_monotonic_decreasing
+
+if __name__ == "__main__":
+    test_market_scan_ranks_every_symbol()
+    print("Market scan test passed.")
@@ -0,0 +1,70 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import tempfile
+
+from src.metrics import METRICS, timed, span, incr, profiled
+
+@timed('double', rows=lambda result, values: len(values))
+def double(values):
+    if values is None:
+        raise ValueError("no values")
+    return [v * 2 for v in values]
+
+def stage(name):
+    return {row['Stage']: row for row in METRICS.snapshot()}.get(name)
+
+def test_spans_counters_and_prometheus_export():
+    METRICS.reset()
+    enabled, METRICS.enabled = METRICS.enabled, True
+    try:
+        double([1, 2, 3])
+        double([4])
+        try:
+            double(None)
+        except ValueError:
+            pass
+        with span('block') as s:
+            s.rows = 7
+        incr('widgets', 3)
+
+        row = stage('double')
+        assert (row['Calls'], row['Errors'], row['Rows']) == (3, 1, 4)
+        assert row['p95 (ms)'] >= row['p50 (ms)'] >= 0
+        assert stage('block')['Rows'] == 7
+
+        text = METRICS.to_prometheus()
+        assert 'trading_bot_stage_seconds_count{stage="double"} 3' in text
+        assert 'trading_bot_stage_seconds{stage="double",quantile="0.95"}' in text
+        assert 'trading_bot_stage_errors_total{stage="double"} 1' in text
+        assert 'trading_bot_widgets_total 3' in text
+        with tempfile.TemporaryDirectory() as tmp:
+            path = METRICS.export(os.path.join(tmp, "metrics", "bot.prom"))
+            assert open(path).read() == text
+    finally:
+        METRICS.reset()
+        METRICS.enabled = enabled
+
+def test_disabled_records_nothing():
+    METRICS.reset()
+    enabled, METRICS.enabled = METRICS.enabled, False
+    try:
+        assert double([1]) == [2]
+        with span('block') as s:
+            s.rows = 1
+        incr('widgets')
+        assert METRICS.snapshot() == [] and METRICS.counters() == {}
+    finally:
+        METRICS.enabled = enabled
+
+def test_profiled_captures_a_report():
+    with profiled(limit=5) as capture:
+        double(list(range(1000)))
+    assert 'double' in capture['report']
+
+if __name__ == "__main__":
+    test_spans_counters_and_prometheus_export()
+    test_disabled_records_nothing()
+    test_profiled_captures_a_report()
+    print("Metrics tests passed.")
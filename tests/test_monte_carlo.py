@@ -0,0 +1,44 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from src.monte_carlo import simulate, summarize, trade_returns, bootstrap_indices
+
+def test_trade_returns_compound_to_backtest_pnl():
+    results = [{'pnl': 100.0}, {'pnl': -50.0}, {'pnl': 200.0}]
+    returns = trade_returns(results, initial_capital=1000)
+    assert np.isclose(1000 * np.prod(1 + returns), 1250.0)
+
+def test_block_indices_are_consecutive_runs():
+    idx = bootstrap_indices(np.random.default_rng(0), 3, 10, method='block', block_size=4)
+    assert idx.shape == (3, 10)
+    for row in idx:
+        for block in (row[0:4], row[4:8]):
+            assert np.array_equal(np.diff(block) % 10, np.ones(3))
+
+def test_simulation_is_reproducible_across_process_counts():
+    returns = np.random.default_rng(1).normal(0.001, 0.02, 200)
+    serial = simulate(returns, n_paths=3000, method='block', seed=42, processes=1, chunk_size=1000)
+    parallel = simulate(returns, n_paths=3000, method='block', seed=42, processes=2, chunk_size=1000)
+    for key in ('final_value', 'max_drawdown', 'sharpe'):
+        assert len(serial[key]) == 3000
+        assert np.array_equal(serial[key], parallel[key])
+    assert (serial['max_drawdown'] >= 0).all() and (serial['max_drawdown'] <= 1).all()
+
+    table, prob_loss = summarize(serial)
+    assert list(table['Metric']) == ['Final Value ($)', 'Max Drawdown (%)', 'Sharpe Ratio']
+    assert 0 <= prob_loss <= 1
+
+def test_constant_returns_have_no_spread():
+    result = simulate(np.full(10, 0.01), n_paths=100, seed=0, processes=1)
+    assert np.allclose(result['final_value'], 10000 * 1.01 ** 10)
+    assert np.allclose(result['max_drawdown'], 0)
+
+if __name__ == "__main__":
+    test_trade_returns_compound_to_backtest_pnl()
+    test_block_indices_are_consecutive_runs()
+    test_simulation_is_reproducible_across_process_counts()
+    test_constant_returns_have_no_spread()
+    print("Monte Carlo tests passed.")
@@ -0,0 +1,85 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'benchmarks')))
+
+import tempfile
+import tracemalloc
+
+import numpy as np
+
+import synthetic
+from common import INTERVAL_MS
+from src.database import DatabaseManager
+from src.features import FeatureEngineer
+from src.out_of_core import OutOfCoreTrainer, feature_matrix, WARMUP_ROWS, EDGE_SAMPLE_ROWS
+
+SYMBOLS = ["BTCUSDT", "ETHUSDT", "SOLUSDT"]
+ROWS = 4000
+
+def seeded_db(tmp):
+    db = DatabaseManager(db_url=f"sqlite:///{os.path.join(tmp, 'history.db')}")
+    for symbol in SYMBOLS:
+        db.save_ohlcv(symbol, '15m', synthetic.ohlcv_frame(symbol, INTERVAL_MS['15m'], ROWS))
+    return db
+
+def test_chunks_match_the_in_memory_features():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = seeded_db(tmp)
+        trainer = OutOfCoreTrainer(db, SYMBOLS[:1], '15m')
+        trainer.chunk_rows = 1000
+        X = np.concatenate([X for X, _ in trainer.chunks()])
+        y = np.concatenate([y for _, y in trainer.chunks()])
+
+        full = FeatureEngineer().compact_features(db.get_ohlcv("BTCUSDT", '15m', limit=None), threshold=0.005)
+        expected = feature_matrix(full, trainer.feature_cols)[WARMUP_ROWS:]
+        # Every labeled row once; indicators agree with the full-history ones
+        assert len(X) == ROWS - 1 - WARMUP_ROWS
+        assert np.array_equal(y, full.target[WARMUP_ROWS:] + 1)
+        assert np.allclose(X, expected, rtol=1e-3, atol=1e-3)
+        db.engine.dispose()
+        db.read_engine.dispose()
+
+def test_sgd_and_budgeted_hist_models_predict():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = seeded_db(tmp)
+        cutoff = db.get_ohlcv("BTCUSDT", '15m', limit=None).index[3000]
+        for method in ['sgd', 'hist']:
+            trainer = OutOfCoreTrainer(db, SYMBOLS, '15m', method=method, memory_budget_mb=0.05)
+            trainer.chunk_rows = 1000
+            model = trainer.fit(end=cutoff)
+            assert trainer.stats['rows'] == len(SYMBOLS) * (3000 - WARMUP_ROWS)
+            if method == 'hist':
+                # The budget holds fewer rows than were streamed: a reservoir sample is fitted
+                assert trainer.stats['fitted_rows'] == trainer.fit_capacity() < trainer.stats['rows']
+            accuracy = trainer.score(model, start=cutoff)
+            assert 0.2 < accuracy <= 1.0
+
+            latest = db.get_ohlcv("ETHUSDT", '15m', limit=500)
+            from src.market_scan import relative_features
+            df = relative_features(FeatureEngineer().add_technical_indicators(latest))
+            assert set(model.predict(df)['signal']) <= {'BUY', 'SELL', 'HOLD'}
+        db.engine.dispose()
+        db.read_engine.dispose()
+
+def test_hist_fit_stays_within_the_memory_budget():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = seeded_db(tmp)
+        import sklearn.ensemble  # imported lazily by the fit; not part of its footprint
+        trainer = OutOfCoreTrainer(db, SYMBOLS, '15m', method='hist', memory_budget_mb=6)
+        tracemalloc.start()
+        try:
+            trainer.fit()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        assert trainer.edge_capacity() < EDGE_SAMPLE_ROWS
+        assert peak <= trainer.budget, f"peak {peak:,} B over the {trainer.budget:,} B budget"
+        db.engine.dispose()
+        db.read_engine.dispose()
+
+if __name__ == "__main__":
+    test_chunks_match_the_in_memory_features()
+    test_sgd_and_budgeted_hist_models_predict()
+    test_hist_fit_stays_within_the_memory_budget()
+    print("Out-of-core training tests passed.")
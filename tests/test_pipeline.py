@@ -1,10 +1,15 @@
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'benchmarks')))
+
+import synthetic
+from common import INTERVAL_MS
 
 from src.data_loader import BinanceLoader
 from src.features import FeatureEngineer
 from src.model import SignalModel
+from src.pipeline import AnalysisPipeline
 
 def test_pipeline():
     print("Testing Data Loader...")
@@ -25,10 +30,68 @@ def test_pipeline():
 
     print("Testing Model Training...")
     model = SignalModel()
+    model.model_path = None  # don't overwrite the app's model.joblib
     acc = model.train(df)
     assert acc is not None, "Training failed"
     print("Pipeline Verified Successfully.")
 
+class StubLoader:
+    """Synthetic candles instead of Binance; counts the loads and refreshes."""
+    def __init__(self):
+        self.calls = 0
+        self.refreshes = 0
+
+    def get_data(self, symbol, interval, lookback_days, refresh=False):
+        self.calls += 1
+        self.refreshes += refresh
+        return synthetic.ohlcv_frame(symbol, INTERVAL_MS[interval], 600)
+
+def test_widget_changes_recompute_only_downstream_stages():
+    loader = StubLoader()
+    pipeline = AnalysisPipeline(loader, model_path=None)
+    calls = {'_features': 0, '_label': 0, '_backtest': 0}
+    for name in calls:
+        def counted(*args, _compute=getattr(pipeline, name), _name=name):
+            calls[_name] += 1
+            return _compute(*args)
+        setattr(pipeline, name, counted)
+    params = dict(symbol="BTCUSDT", interval="1h", lookback=30, sensitivity=0.005,
+                  risk_size=0.1, sl_pct=0.02, tp_pct=0.05)
+
+    result = pipeline.run(**params)
+    assert result['fresh'] == set(AnalysisPipeline.STAGES)
+
+    # Same parameters (a plain rerun): nothing is recomputed, so nothing gets logged again
+    result = pipeline.run(**params)
+    assert result['fresh'] == set()
+    assert all(t['cached'] for t in pipeline.timings.values())
+
+    # Stop loss / take profit: only the backtest
+    result = pipeline.run(**{**params, 'sl_pct': 0.03, 'tp_pct': 0.08})
+    assert result['fresh'] == {'backtest'}
+
+    # Sensitivity: labels, train, predict and backtest, but not the load or features
+    result = pipeline.run(**{**params, 'sl_pct': 0.03, 'tp_pct': 0.08, 'sensitivity': 0.01})
+    assert result['fresh'] == {'labels', 'train', 'predict', 'backtest'}
+
+    # Switching back to an earlier setting only keeps the last key per stage
+    result = pipeline.run(**params)
+    assert result['fresh'] == {'labels', 'train', 'predict', 'backtest'}
+
+    assert loader.calls == 1 and calls['_features'] == 1
+    assert calls['_label'] == 3 and calls['_backtest'] == 4
+
+    # A different symbol starts over from the load
+    assert pipeline.run(**{**params, 'symbol': "ETHUSDT"})['fresh'] == set(AnalysisPipeline.STAGES)
+    assert loader.calls == 2
+
+    # The Fetch button: reloads past the loader's shared candle cache, once
+    pipeline.invalidate('load')
+    assert pipeline.run(**params)['fresh'] == set(AnalysisPipeline.STAGES)
+    pipeline.run(**{**params, 'symbol': "ETHUSDT"})
+    assert loader.calls == 4 and loader.refreshes == 1
+
 if __name__ == "__main__":
     test_pipeline()
+    test_widget_changes_recompute_only_downstream_stages()
     # Clean up dummy cache file if needed, but keeping it is fine.
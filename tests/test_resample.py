@@ -0,0 +1,90 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'benchmarks')))
+
+import tempfile
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from common import FakeClient, INTERVAL_MS, make_klines
+from src.data_loader import BinanceLoader
+from src.database import DatabaseManager
+from src.resample import resample_ohlcv, incomplete_ranges
+
+def make_15m(start, periods):
+    index = pd.date_range(start, periods=periods, freq="15min")
+    close = np.arange(periods, dtype=float) + 100
+    return pd.DataFrame({
+        'open': close - 0.5, 'high': close + 1, 'low': close - 1,
+        'close': close, 'volume': np.ones(periods)
+    }, index=index)
+
+def test_resample_aggregates_ohlcv():
+    df = make_15m("2024-01-01 00:00", 8)  # two full hours
+    hourly = resample_ohlcv(df, '15m', '1h')
+
+    assert list(hourly.index) == list(pd.to_datetime(["2024-01-01 00:00", "2024-01-01 01:00"]))
+    first = hourly.iloc[0]
+    assert first['open'] == 99.5
+    assert first['high'] == 104.0
+    assert first['low'] == 99.0
+    assert first['close'] == 103.0
+    assert first['volume'] == 4.0
+
+def test_resample_aligns_to_utc_and_drops_partial_head():
+    # Starts mid-bucket (02:30): the 00:00-04:00 bucket is incomplete and dropped,
+    # the newest bucket is the forming candle and is kept
+    df = make_15m("2024-01-01 02:30", 6 + 16 + 3)
+    four_hourly = resample_ohlcv(df, '15m', '4h')
+
+    assert list(four_hourly.index) == list(pd.to_datetime(["2024-01-01 04:00", "2024-01-01 08:00"]))
+    assert four_hourly.iloc[-1]['volume'] == 3.0
+
+def test_incomplete_ranges_group_gaps():
+    df = make_15m("2024-01-01 00:00", 4 * 10)
+    # 02:15 missing, 05:00-06:59 missing entirely
+    df = df.drop(pd.to_datetime(["2024-01-01 02:15"]))
+    df = df[(df.index < "2024-01-01 05:00") | (df.index >= "2024-01-01 07:00")]
+    assert incomplete_ranges(df, '15m', '1h') == [
+        (pd.Timestamp("2024-01-01 02:00"), pd.Timestamp("2024-01-01 02:00")),
+        (pd.Timestamp("2024-01-01 05:00"), pd.Timestamp("2024-01-01 06:00")),
+    ]
+
+def test_derived_series_fills_gaps_at_the_target_interval():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(db_url=f"sqlite:///{os.path.join(tmp, 'gaps.db')}")
+        step = INTERVAL_MS['15m']
+        now_ms = int(datetime.utcnow().timestamp() * 1000) // step * step
+        open_times = now_ms - step * np.arange(40 * 96)[::-1]
+        candles = BinanceLoader._process_candles(make_klines("BTCUSDT", open_times, step))
+        # Six whole hours of 15m candles never made it into the store
+        gap_start = candles.index[1000].ceil("h")
+        gap = candles.index[(candles.index >= gap_start) & (candles.index < gap_start + pd.Timedelta(hours=6))]
+        db.save_ohlcv("BTCUSDT", "15m", candles.drop(gap))
+
+        loader = BinanceLoader(client=FakeClient(latency=0), db=db)
+        requested = []
+        klines = loader._klines
+        loader._klines = lambda *args: requested.append(args[1]) or klines(*args)
+
+        hourly = loader.get_data("BTCUSDT", "1h", 30)
+        # No holes: one candle per hour from the window start to the forming candle
+        assert (hourly.index.to_series().diff().dropna() == pd.Timedelta(hours=1)).all()
+        assert requested.count("1h") == 1
+        gap_hours = pd.date_range(gap[0], gap[-1], freq="1h")
+        assert len(db.get_ohlcv("BTCUSDT", "1h", limit=None).loc[gap_hours[0]:gap_hours[-1]]) == 6
+
+        # Next time the gap is served from the stored 1h candles
+        loader.get_data("BTCUSDT", "1h", 30)
+        assert requested.count("1h") == 1
+        db.engine.dispose()
+        db.read_engine.dispose()
+
+if __name__ == "__main__":
+    test_resample_aggregates_ohlcv()
+    test_resample_aligns_to_utc_and_drops_partial_head()
+    test_incomplete_ranges_group_gaps()
+    test_derived_series_fills_gaps_at_the_target_interval()
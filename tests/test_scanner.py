@@ -0,0 +1,96 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'benchmarks')))
+
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from common import FakeClient, make_klines, INTERVAL_MS
+from src.data_loader import BinanceLoader
+from src.database import DatabaseManager
+from src.scanner import Scanner, last_close, next_close, candles_behind, scan_status
+
+class StubLoader:
+    """Serves a random walk of hourly candles ending with the still-forming candle."""
+    def __init__(self, close, delay=0.0):
+        self.close = close
+        self.delay = delay
+
+    def get_data(self, symbol, interval, lookback_days):
+        time.sleep(self.delay)
+        rng = np.random.default_rng(3)
+        index = pd.date_range(end=self.close, periods=400, freq="h")
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(index))))
+        return pd.DataFrame({
+            'open': close, 'high': close * 1.01, 'low': close * 0.99,
+            'close': close, 'volume': rng.uniform(100, 200, len(index))
+        }, index=index)
+
+def test_close_alignment():
+    now = datetime(2024, 3, 5, 13, 47, 10)
+    assert last_close('1h', now) == datetime(2024, 3, 5, 13)
+    assert next_close('4h', now) == datetime(2024, 3, 5, 16)
+    assert last_close('1d', now) == datetime(2024, 3, 5)
+    assert candles_behind('15m', datetime(2024, 3, 5, 13), now) == 3
+
+def test_cycle_logs_signals_once_and_times_out_slow_jobs():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(db_url=f"sqlite:///{os.path.join(tmp, 'scan.db')}")
+        db.update_watchlist(["BTCUSDT", "ETHUSDT"])
+        close = last_close('1h')
+
+        scanner = Scanner(StubLoader(close), db, intervals=['1h'], workers=2, deadline=3600)
+        assert scanner.run_cycle(['1h']) == {'done': 2}
+        assert db.get_stats()['signals'] == 2
+        # A restart does not rescan closes that already succeeded
+        assert scanner.run_cycle(['1h']) == {}
+
+        status = scan_status(db)
+        assert set(status['Status']) == {'done'}
+        assert (status['Behind (candles)'] == 0).all()
+        assert (status['Lag (s)'] >= 0).all()
+
+        db.update_watchlist(["SOLUSDT"])
+        slow = Scanner(StubLoader(close, delay=1.0), db, intervals=['1h'], workers=1,
+                       deadline=(datetime.utcnow() - close).total_seconds() + 0.2)
+        assert slow.run_cycle(['1h']) == {'timeout': 1}
+        slow.pool.shutdown(wait=True)
+        # The late job neither logs its stale signal nor overwrites the timeout
+        assert db.get_stats()['signals'] == 2
+        assert scan_status(db).set_index('Symbol').loc['SOLUSDT', 'Status'] == 'timeout'
+        db.engine.dispose()
+
+def test_candle_stored_while_forming_is_scanned_with_its_final_values():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(db_url=f"sqlite:///{os.path.join(tmp, 'forming.db')}")
+        db.update_watchlist(["BTCUSDT"])
+        close = last_close('1h')
+        opened = close - timedelta(hours=1)
+        step = INTERVAL_MS['1h']
+        open_times = int((opened - datetime(1970, 1, 1)).total_seconds() * 1000) - step * np.arange(40 * 24)[::-1]
+        candles = BinanceLoader._process_candles(make_klines("BTCUSDT", open_times, step))
+        final = candles.loc[opened, 'close']
+        # The previous cycle stored the scanned candle while it was still forming
+        forming = candles.copy()
+        forming.loc[opened, 'close'] = 12345.0
+        db.save_ohlcv("BTCUSDT", "1h", forming)
+
+        scanner = Scanner(BinanceLoader(client=FakeClient(latency=0), db=db), db, intervals=['1h'], workers=1,
+                          deadline=3600)
+        assert scanner.run_cycle(['1h']) == {'done': 1}
+        scanner.pool.shutdown(wait=True)
+        assert db.get_ohlcv("BTCUSDT", "1h", limit=None).loc[opened, 'close'] == final
+        assert scan_status(db).loc[0, 'Price'] == final
+        db.engine.dispose()
+        db.read_engine.dispose()
+
+if __name__ == "__main__":
+    test_close_alignment()
+    test_cycle_logs_signals_once_and_times_out_slow_jobs()
+    test_candle_stored_while_forming_is_scanned_with_its_final_values()
+    print("Scanner tests passed.")
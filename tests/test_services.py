@@ -0,0 +1,99 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'benchmarks')))
+
+import threading
+import time
+
+import tempfile
+
+import pandas as pd
+
+from common import FakeClient
+from src.data_loader import BinanceLoader
+from src.database import DatabaseManager
+from src.metadata_cache import MetadataCache
+from src.services import TTLCache
+
+def test_concurrent_misses_load_once():
+    cache = TTLCache(default_ttl=60)
+    calls = []
+
+    def load():
+        calls.append(1)
+        time.sleep(0.05)
+        return ["BTCUSDT"]
+
+    threads = [threading.Thread(target=cache.get_or_load, args=(('all_symbols', 'USDT'), load)) for _ in range(10)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+
+    assert len(calls) == 1
+    assert cache.get(('all_symbols', 'USDT')) == ["BTCUSDT"]
+    # Per-key locks go away with the load, they don't pile up per key
+    assert cache._key_locks == {}
+
+def test_expiry_and_prefix_invalidation():
+    cache = TTLCache()
+    cache.get_or_load(('candles', 'BTCUSDT'), lambda: 1, ttl=0.01)
+    cache.get_or_load(('top_symbols', 10), lambda: 2)
+    time.sleep(0.02)
+    assert cache.get(('candles', 'BTCUSDT')) is None
+
+    cache.get_or_load(('candles', 'ETHUSDT'), lambda: 3)
+    cache.invalidate(prefix='candles')
+    assert cache.get(('candles', 'ETHUSDT')) is None
+    assert cache.get(('top_symbols', 10)) == 2
+
+    # ttl=0 means "don't keep", not "use the default"
+    cache.get_or_load(('ticker', 'BTCUSDT'), lambda: 4, ttl=0)
+    assert cache.get(('ticker', 'BTCUSDT')) is None
+
+def test_metadata_cache_serves_stale_and_persists():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "metadata.json")
+        cache = MetadataCache(path)
+
+        # Missing with a default: caller gets the default, fetch runs in the background
+        def wait_for_refresh():
+            for _ in range(200):
+                if not cache.is_refreshing("all_symbols:USDT"):
+                    return
+                time.sleep(0.01)
+
+        assert cache.get("all_symbols:USDT", lambda: ["BTCUSDT", "ETHUSDT"], ttl=60, default=["BTCUSDT"]) == ["BTCUSDT"]
+        wait_for_refresh()
+        assert cache.peek("all_symbols:USDT") == ["BTCUSDT", "ETHUSDT"]
+
+        # Stale: old value now, refreshed value on a later read
+        assert cache.get("all_symbols:USDT", lambda: ["SOLUSDT"], ttl=0) == ["BTCUSDT", "ETHUSDT"]
+        wait_for_refresh()
+        assert cache.peek("all_symbols:USDT") == ["SOLUSDT"]
+
+        # Persisted for the next process
+        assert MetadataCache(path).peek("all_symbols:USDT") == ["SOLUSDT"]
+
+def test_explicit_fetch_skips_the_shared_candle_cache():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(db_url=f"sqlite:///{os.path.join(tmp, 'cache.db')}")
+        loader = BinanceLoader(client=FakeClient(latency=0), db=db, cache=TTLCache())
+        loads = []
+        loader._load_data = lambda *args: loads.append(args) or pd.DataFrame({'close': [1.0]})
+
+        loader.get_data("BTCUSDT", "1h", 30)
+        loader.get_data("BTCUSDT", "1h", 30)
+        assert len(loads) == 1
+        loader.get_data("BTCUSDT", "1h", 30, refresh=True)
+        assert len(loads) == 2
+        # The refetched frame is shared again
+        loader.get_data("BTCUSDT", "1h", 30)
+        assert len(loads) == 2
+        db.engine.dispose()
+        db.read_engine.dispose()
+
+if __name__ == "__main__":
+    test_concurrent_misses_load_once()
+    test_expiry_and_prefix_invalidation()
+    test_metadata_cache_serves_stale_and_persists()
+    test_explicit_fetch_skips_the_shared_candle_cache()
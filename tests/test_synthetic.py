@@ -0,0 +1,49 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'benchmarks')))
+
+import numpy as np
+
+import synthetic
+from common import FakeClient, RateLimitExceeded, INTERVAL_MS
+
+HOUR = INTERVAL_MS['1h']
+
+def test_series_are_seeded_and_window_independent():
+    short = synthetic.generate("BTCUSDT", HOUR, 3000)
+    long = synthetic.generate("BTCUSDT", HOUR, 9000)
+    for key in short:
+        assert np.array_equal(short[key], long[key][:3000])
+    assert not np.array_equal(short['close'], synthetic.generate("BTCUSDT", HOUR, 3000, seed=1)['close'])
+
+    start = synthetic.ORIGIN_MS + 100 * HOUR
+    window = synthetic.window("BTCUSDT", HOUR, start, start + 50 * HOUR)
+    assert np.array_equal(window['close'], long['close'][100:150])
+
+def test_candles_are_valid_with_regimes_and_spikes():
+    series = synthetic.generate("ETHUSDT", HOUR, 20000)
+    assert (series['high'] >= np.maximum(series['open'], series['close'])).all()
+    assert (series['low'] <= np.minimum(series['open'], series['close'])).all()
+    assert (series['low'] > 0).all()
+    assert len(np.unique(synthetic.regimes("ETHUSDT", 20000, HOUR))) == len(synthetic.REGIMES)
+    assert series['volume'].max() > 5 * np.median(series['volume'])
+
+def test_fake_client_paginates_and_rate_limits():
+    client = FakeClient(latency=0, symbols=["BTCUSDT"], weight_limit=6, on_limit='raise')
+    klines = client.get_historical_klines("BTCUSDT", "1h", "1 Jan, 2023", "2 Mar, 2023")
+    # 60 days of 1h candles fit in two 1000-candle pages (weight 2 each)
+    assert len(klines) == 24 * 60 + 1 and client.calls['get_historical_klines'] == 2
+    client.ping()
+    client.ping()
+    try:
+        client.ping()
+        assert False, "Expected the weight limit to be hit"
+    except RateLimitExceeded:
+        pass
+
+if __name__ == "__main__":
+    test_series_are_seeded_and_window_independent()
+    test_candles_are_valid_with_regimes_and_spikes()
+    test_fake_client_paginates_and_rate_limits()
+    print("Synthetic data tests passed.")